@@ -2,10 +2,13 @@
 from flask import Blueprint, request, Response, stream_with_context, jsonify
 from backend.services.conversation_service import ConversationService
 from backend.infrastructure.logger import get_logger
+from backend.db.sqlalchemy_manager import register_session_scope
+from shared.errors import ValidationError
 
 logger = get_logger('chat_routes')
 
 chat_routes = Blueprint('chat_routes', __name__)
+register_session_scope(chat_routes)
 conversation_service = ConversationService()
 
 @chat_routes.route('/api/nodes/<node_id>/conversations', methods=['GET'])
@@ -20,8 +23,17 @@ def create_conversation(node_id):
 
 @chat_routes.route('/api/conversations/<conversation_id>/messages', methods=['GET'])
 def get_messages(conversation_id):
-    messages = conversation_service.get_messages(conversation_id)
-    return {"messages": messages}, 200
+    # Keyset pagination: ?before=<cursor> for older messages, ?after=<cursor> for newer
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    try:
+        page = conversation_service.get_message_page(
+            conversation_id, limit,
+            before=request.args.get('before'),
+            after=request.args.get('after')
+        )
+    except ValidationError as e:
+        return jsonify({"error": e.message}), 400
+    return page, 200
 
 @chat_routes.route('/api/conversations/<conversation_id>/messages', methods=['POST'])
 def send_message(conversation_id):
@@ -29,13 +41,17 @@ def send_message(conversation_id):
     if not content:
         return jsonify({"error": "Message content required"}), 400
     message = conversation_service.add_message(conversation_id, role='user', content=content)
+    if message is None:
+        return jsonify({"error": "Conversation not found"}), 404
     return jsonify(message), 201
 
 @chat_routes.route('/api/conversations/<conversation_id>/messages/stream', methods=['GET'])
 def stream_messages(conversation_id):
     return Response(
         stream_with_context(conversation_service.stream_conversation(conversation_id)),
-        mimetype='text/event-stream'
+        mimetype='text/event-stream',
+        # Keep proxies from buffering the stream so each token is delivered as it arrives
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
     )
 
 # backend/api/blueprints/chat_routes.py - Add this endpoint
@@ -2,38 +2,89 @@
 from flask import Blueprint, request, jsonify
 from backend.services.graph_service import GraphService
 from backend.services.execution_service import ExecutionService
+from backend.services.graph_analysis_service import GraphAnalysisService
+from backend.services.search_service import SearchService
+from backend.services.snapshot_service import SnapshotService
 from backend.infrastructure.logger import get_logger
+from shared.errors import ValidationError, ConflictError
+from backend.db.sqlalchemy_manager import register_session_scope
 
 logger = get_logger('graph_routes')
 graph_routes = Blueprint('graph_routes', __name__)
+register_session_scope(graph_routes)
 
 graph_service = GraphService()
 execution_service = ExecutionService()
+analysis_service = GraphAnalysisService()
+search_service = SearchService()
+snapshot_service = SnapshotService()
+
+def _expected_version():
+    """The version from an If-Match header (ETag of an earlier GET), or None"""
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    for tag in request.if_match.as_set():
+        if tag.isdigit():
+            return int(tag)
+    raise ValidationError("If-Match must be an ETag returned by this API")
+
+def _conflict(e):
+    return jsonify({"error": e.message, "current_version": e.current_version}), 412
+
+def _versioned(payload, status=200):
+    response = jsonify(payload)
+    response.status_code = status
+    response.set_etag(str(payload['version']))
+    return response
 
 @graph_routes.route('/api/graphs', methods=['GET'])
 def get_graphs():
-    filters = request.args.to_dict()
-    graphs = graph_service.get_graphs(filters)
-    return jsonify({"graphs": graphs}), 200
+    # Summaries only; ?include=layout adds layout_data and graph_metadata
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    try:
+        page = graph_service.list_graphs(
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            sort=request.args.get('sort', 'updated_at'),
+            order=request.args.get('order', 'desc'),
+            name=request.args.get('name'),
+            include_layout=request.args.get('include') == 'layout'
+        )
+    except ValidationError as e:
+        return jsonify({"error": e.message}), 400
+    return jsonify(page), 200
 
 @graph_routes.route('/api/graphs/<graph_id>', methods=['GET'])
 def get_graph(graph_id):
-    graph = graph_service.get_graph_by_id(graph_id)
+    # ?include=content hydrates nodes and edges so the canvas opens in one request
+    include_content = request.args.get('include') == 'content'
+    graph = graph_service.get_graph_by_id(graph_id, include_content)
     if not graph:
         return jsonify({"error": "Graph not found"}), 404
-    return jsonify(graph), 200
+    response = _versioned(graph)
+    # Node drags don't bump the version, so only the graph alone may be served as 304
+    if not include_content:
+        response.make_conditional(request)
+    return response
 
 @graph_routes.route('/api/graphs', methods=['POST'])
 def create_graph():
     graph_data = request.get_json()
     graph = graph_service.create_graph(graph_data)
-    return jsonify(graph), 201
+    return _versioned(graph, 201)
 
 @graph_routes.route('/api/graphs/<graph_id>', methods=['PUT'])
 def update_graph(graph_id):
     updates = request.get_json()
-    updated_graph = graph_service.update_graph(graph_id, updates)
-    return jsonify(updated_graph), 200
+    try:
+        updated_graph = graph_service.update_graph(graph_id, updates, _expected_version())
+    except ValidationError as e:
+        return jsonify({"error": e.message}), 400
+    except ConflictError as e:
+        return _conflict(e)
+    if not updated_graph:
+        return jsonify({"error": "Graph not found"}), 404
+    return _versioned(updated_graph)
 
 @graph_routes.route('/api/graphs/<graph_id>', methods=['DELETE'])
 def delete_graph(graph_id):
@@ -46,17 +97,45 @@ def create_node(graph_id):
     node = graph_service.create_node(graph_id, node_data)
     return jsonify(node), 201
 
+@graph_routes.route('/api/graphs/<graph_id>/positions', methods=['PATCH'])
+def move_nodes(graph_id):
+    # Compact drag updates: {"positions": [[node_id, x, y], ...]}; the websocket
+    # 'node_positions' message is the preferred channel for live drags
+    positions = (request.get_json() or {}).get('positions')
+    try:
+        queued = graph_service.move_nodes(graph_id, positions)
+    except ValidationError as e:
+        return jsonify({"error": e.message}), 400
+    if queued is None:
+        return jsonify({"error": "Graph not found"}), 404
+    return jsonify({"queued": queued}), 202
+
 @graph_routes.route('/api/nodes/<node_id>', methods=['PUT'])
 def update_node(node_id):
     updates = request.get_json()
-    node = graph_service.update_node(node_id, updates)
-    return jsonify(node), 200
+    try:
+        node = graph_service.update_node(node_id, updates, _expected_version())
+    except ValidationError as e:
+        return jsonify({"error": e.message}), 400
+    except ConflictError as e:
+        return _conflict(e)
+    if not node:
+        return jsonify({"error": "Node not found"}), 404
+    return _versioned(node)
 
 
 @graph_routes.route('/api/graphs/<graph_id>/edges', methods=['POST'])
 def create_edge(graph_id):
-    edge_data = request.get_json()
-    edge = graph_service.create_edge(edge_data['source_id'], edge_data['target_id'], edge_data['edge_type'])
+    edge_data = request.get_json() or {}
+    try:
+        edge = graph_service.create_edge(edge_data.get('source_id'), edge_data.get('target_id'), edge_data.get('edge_type'), graph_id)
+    except ValidationError as e:
+        return jsonify({"error": e.message}), 400
+    except ConflictError as e:
+        # The graph kept changing under the edge's validation
+        return _conflict(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
     return jsonify(edge), 201
 
 @graph_routes.route('/api/edges/<edge_id>', methods=['DELETE'])
@@ -64,6 +143,81 @@ def delete_edge(edge_id):
     graph_service.delete_edge(edge_id)
     return jsonify({"message": "Edge deleted successfully"}), 200
 
+@graph_routes.route('/api/graphs/<graph_id>/batch', methods=['POST'])
+def apply_batch(graph_id):
+    batch = request.get_json() or {}
+    try:
+        result = graph_service.apply_batch(graph_id, batch, _expected_version())
+    except ValidationError as e:
+        return jsonify({"error": e.message}), 400
+    except ConflictError as e:
+        return _conflict(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    return _versioned(result)
+
+@graph_routes.route('/api/graphs/<graph_id>/snapshots', methods=['POST'])
+def create_snapshot(graph_id):
+    # Returns the newest snapshot instead when the graph hasn't changed since
+    snapshot = snapshot_service.create_snapshot(graph_id)
+    if not snapshot:
+        return jsonify({"error": "Graph not found"}), 404
+    return jsonify(snapshot), 201
+
+@graph_routes.route('/api/graphs/<graph_id>/snapshots', methods=['GET'])
+def list_snapshots(graph_id):
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    page = snapshot_service.list_snapshots(graph_id, limit=limit, before=request.args.get('before', type=int))
+    return jsonify(page), 200
+
+@graph_routes.route('/api/graphs/<graph_id>/snapshots/<int:number>', methods=['GET'])
+def get_snapshot(graph_id, number):
+    snapshot = snapshot_service.get_snapshot(graph_id, number)
+    if not snapshot:
+        return jsonify({"error": "Snapshot not found"}), 404
+    return jsonify(snapshot), 200
+
+@graph_routes.route('/api/snapshots/<snapshot_id>', methods=['GET'])
+def get_snapshot_by_id(snapshot_id):
+    # Resolves an execution's snapshot_id to the graph state it ran against
+    snapshot = snapshot_service.get_snapshot_by_id(snapshot_id)
+    if not snapshot:
+        return jsonify({"error": "Snapshot not found"}), 404
+    return jsonify(snapshot), 200
+
+@graph_routes.route('/api/graphs/<graph_id>/cycles', methods=['GET'])
+def list_cycles(graph_id):
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    offset = request.args.get('offset', 0, type=int)
+    try:
+        # Fetch one extra cycle to tell whether another page exists
+        cycles = analysis_service.detect_cycles(graph_id, limit=limit + 1, offset=offset)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    return jsonify({
+        "cycles": cycles[:limit],
+        "offset": offset,
+        "limit": limit,
+        "has_more": len(cycles) > limit
+    }), 200
+
+@graph_routes.route('/api/search', methods=['GET'])
+def search():
+    # ?q=<text>&types=graph,node,message&limit=&offset=
+    types = request.args.get('types')
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    try:
+        page = search_service.search(
+            request.args.get('q'),
+            kinds=types.split(',') if types else None,
+            limit=limit,
+            offset=offset
+        )
+    except ValidationError as e:
+        return jsonify({"error": e.message}), 400
+    return jsonify(page), 200
+
 @graph_routes.route('/api/graphs/<graph_id>/executions', methods=['GET'])
 def execution_history(graph_id):
     history = execution_service.get_execution_history(graph_id)
@@ -2,8 +2,11 @@
 from flask import Blueprint, request, jsonify
 from backend.services.execution_service import ExecutionService
 from backend.infrastructure.logger import get_logger
+from backend.integrations.http_session import http_pool
+from backend.db.sqlalchemy_manager import register_session_scope
 
 workflow_routes = Blueprint('workflow_routes', __name__)
+register_session_scope(workflow_routes)
 logger = get_logger('workflow_routes')
 execution_service = ExecutionService()  # Create an instance
 
@@ -48,4 +51,9 @@ def stop_execution(execution_id):
         return {"message": "Execution stopped successfully"}, 200
     except Exception as e:
         logger.error(f"Error stopping execution: {e}")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@workflow_routes.route('/api/integrations/http-pools', methods=['GET'])
+def http_pool_stats():
+    # Connection reuse per upstream host; 'reused' close to 'requests' means keep-alive works
+    return jsonify({"pools": http_pool.stats()}), 200
@@ -5,10 +5,19 @@ import traceback
 from websockets import serve, exceptions
 from backend.infrastructure.logger import get_logger
 from backend.infrastructure.security import Security
+from backend.services.graph_service import GraphService
+from backend.services.llm_service import LLMService, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS
+from backend.integrations.async_http import close_async_http_session
+from shared.errors import ValidationError
 
 logger = get_logger('websocket_server')
 
 connected_clients = {}
+graph_service = GraphService()
+llm_service = LLMService()
+# Strong references to each connection's running chat streams (the loop only
+# keeps weak ones), so they can be cancelled when the connection closes
+chat_streams = {}
 
 async def handle_client(websocket, path):
     client_id = None
@@ -60,6 +69,8 @@ async def handle_client(websocket, path):
                 pass
     finally:
         # Clean up client connection
+        for task in chat_streams.pop(websocket, ()):
+            task.cancel()
         if client_id:
             connected_clients.pop(client_id, None)
             logger.info(f"Client '{client_id}' disconnected")
@@ -79,10 +90,51 @@ async def process_message(client_id, message, websocket):
         await websocket.send(json.dumps({"type": "pong"}))
     elif message_type == 'echo':
         await websocket.send(json.dumps({"type": "echo", "message": data.get('message', '')}))
+    elif message_type == 'node_positions':
+        # {"type": "node_positions", "graph_id": ..., "positions": [[node_id, x, y], ...]}
+        # Queuing only takes a lock; the write happens on the position writer thread
+        try:
+            queued = graph_service.move_nodes(data.get('graph_id'), data.get('positions'))
+        except ValidationError as e:
+            await websocket.send(json.dumps({"error": e.message}))
+        else:
+            if queued is None:
+                await websocket.send(json.dumps({"error": f"Graph {data.get('graph_id')} not found"}))
+    elif message_type == 'chat_stream':
+        # {"type": "chat_stream", "request_id": ..., "provider": ..., "model": ..., "messages": [...]}
+        # Runs as its own task so the client's other messages aren't held up by the stream
+        task = asyncio.create_task(stream_chat(websocket, data))
+        streams = chat_streams.setdefault(websocket, set())
+        streams.add(task)
+        task.add_done_callback(streams.discard)
     else:
         logger.warning(f"Unknown message type: {message_type}")
         await websocket.send(json.dumps({"error": f"Unknown message type: {message_type}"}))
 
+async def stream_chat(websocket, data):
+    """Relay a model's reply as chat_chunk messages, then chat_done or chat_error"""
+    request_id = data.get('request_id')
+    try:
+        async for content in llm_service.astream_chat_completion(
+            data.get('provider'),
+            data.get('model'),
+            data.get('messages') or [],
+            data.get('temperature', DEFAULT_TEMPERATURE),
+            data.get('max_tokens', DEFAULT_MAX_TOKENS)
+        ):
+            await websocket.send(json.dumps({"type": "chat_chunk", "request_id": request_id, "content": content}))
+        await websocket.send(json.dumps({"type": "chat_done", "request_id": request_id}))
+    except exceptions.ConnectionClosed:
+        logger.info(f"Client went away during chat stream {request_id}")
+    except Exception as e:
+        # Any failure (HTTP errors, timeouts, an open circuit) must reach the client as chat_error
+        error = str(e) or type(e).__name__
+        logger.error(f"Chat stream {request_id} failed: {error}")
+        try:
+            await websocket.send(json.dumps({"type": "chat_error", "request_id": request_id, "error": error}))
+        except exceptions.ConnectionClosed:
+            logger.info(f"Client went away before the error of chat stream {request_id} was sent")
+
 async def send_to_client(client_id, message):
     """Send a message to a specific client"""
     websocket = connected_clients.get(client_id)
@@ -121,6 +173,8 @@ async def main():
             await asyncio.Future()  # Run forever
     except Exception as e:
         logger.error(f"WebSocket server error: {e}")
+    finally:
+        await close_async_http_session()
 
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,257 @@
+# backend/cache/graph_topology_cache.py
+import threading
+from collections import OrderedDict, deque
+
+class CycleError(ValueError):
+    def __init__(self, path):
+        super().__init__("Edge would create a cycle: " + " -> ".join(path))
+        self.path = path
+
+class GraphTopology:
+    """
+    Compact adjacency of one graph: string node IDs, successor and
+    predecessor maps with edge multiplicities, and the edge endpoints by
+    edge ID.
+
+    While the graph is acyclic it also keeps a topological position per
+    node, maintained online on edge insertion (Pearce-Kelly), so checking
+    a new edge only visits the nodes positioned between its endpoints.
+    """
+
+    def __init__(self, node_ids, edges, version=None):
+        self.version = version
+        self.lock = threading.RLock()
+        self.successors = {}
+        self.predecessors = {}
+        self.edges = {}
+        self.positions = {}
+        self._next_position = 0
+        self._order = None
+        for node_id in node_ids:
+            self.add_node(node_id)
+        for edge_id, source_id, target_id in edges:
+            self.add_edge(edge_id, source_id, target_id)
+
+    @property
+    def is_acyclic(self):
+        self._ensure_positions()
+        return self.positions is not None
+
+    def add_node(self, node_id):
+        node_id = str(node_id)
+        if node_id not in self.successors:
+            self.successors[node_id] = {}
+            self.predecessors[node_id] = {}
+            if self.positions is not None:
+                # A new node has no edges, so it can go last
+                self.positions[node_id] = self._next_position
+                self._next_position += 1
+            self._order = None
+
+    def remove_node(self, node_id):
+        node_id = str(node_id)
+        if node_id not in self.successors:
+            return
+        incident = [edge_id for edge_id, (source_id, target_id) in self.edges.items()
+                    if node_id in (source_id, target_id)]
+        for edge_id in incident:
+            self.remove_edge(edge_id)
+        del self.successors[node_id]
+        del self.predecessors[node_id]
+        if self.positions is not None:
+            self.positions.pop(node_id, None)
+        self._order = None
+
+    def add_edge(self, edge_id, source_id, target_id):
+        """Record an edge without checking it; cyclic input simply drops the ordering"""
+        source_id, target_id = str(source_id), str(target_id)
+        self.add_node(source_id)
+        self.add_node(target_id)
+        self.edges[str(edge_id)] = (source_id, target_id)
+        self.successors[source_id][target_id] = self.successors[source_id].get(target_id, 0) + 1
+        self.predecessors[target_id][source_id] = self.predecessors[target_id].get(source_id, 0) + 1
+        if self.positions is not None and self.positions[source_id] >= self.positions[target_id]:
+            # Recomputed from scratch on next use
+            self.positions = None
+        self._order = None
+
+    def insert_edge(self, edge_id, source_id, target_id):
+        """
+        Add an edge only if it keeps the graph acyclic, raising CycleError
+        (with the offending path) otherwise.
+        """
+        source_id, target_id = str(source_id), str(target_id)
+        self.add_node(source_id)
+        self.add_node(target_id)
+        self._ensure_positions()
+
+        if self.positions is None:
+            # Already cyclic (legacy data): fall back to a plain reachability check
+            path = self._find_path(target_id, source_id, lambda node_id: True)
+            if path:
+                raise CycleError(path + [target_id])
+        elif source_id == target_id:
+            raise CycleError([source_id, target_id])
+        elif self.positions[source_id] > self.positions[target_id]:
+            self._reorder(source_id, target_id)
+
+        self.add_edge(edge_id, source_id, target_id)
+
+    def remove_edge(self, edge_id):
+        endpoints = self.edges.pop(str(edge_id), None)
+        if not endpoints:
+            return
+        source_id, target_id = endpoints
+        for adjacency, key, other in ((self.successors, source_id, target_id),
+                                      (self.predecessors, target_id, source_id)):
+            count = adjacency[key][other] - 1
+            if count:
+                adjacency[key][other] = count
+            else:
+                del adjacency[key][other]
+        self._order = None
+
+    def copy(self):
+        """Independent copy for validating a batch of changes before committing them"""
+        clone = GraphTopology([], [], version=self.version)
+        clone.successors = {node_id: dict(targets) for node_id, targets in self.successors.items()}
+        clone.predecessors = {node_id: dict(sources) for node_id, sources in self.predecessors.items()}
+        clone.edges = dict(self.edges)
+        clone.positions = dict(self.positions) if self.positions is not None else None
+        clone._next_position = self._next_position
+        return clone
+
+    def node_ids(self):
+        return list(self.successors)
+
+    def topological_order(self):
+        """Nodes ordered by topological position; raises ValueError on cycles"""
+        with self.lock:
+            if self._order is None:
+                if not self.is_acyclic:
+                    raise ValueError("Graph contains cycles, cannot perform topological sort.")
+                self._order = sorted(self.positions, key=self.positions.get)
+            return list(self._order)
+
+    def _ensure_positions(self):
+        """Rebuild positions with Kahn's algorithm after they were dropped; None if cyclic"""
+        if self.positions is not None and len(self.positions) == len(self.successors):
+            return
+        in_degree = {node_id: len(preds) for node_id, preds in self.predecessors.items()}
+        ready = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
+        order = []
+        while ready:
+            node_id = ready.popleft()
+            order.append(node_id)
+            for target_id in self.successors[node_id]:
+                in_degree[target_id] -= 1
+                if in_degree[target_id] == 0:
+                    ready.append(target_id)
+        if len(order) != len(in_degree):
+            self.positions = None
+            return
+        self.positions = {node_id: index for index, node_id in enumerate(order)}
+        self._next_position = len(order)
+
+    def _reorder(self, source_id, target_id):
+        """
+        Pearce-Kelly repair for a new edge source -> target where target is
+        currently positioned before source. Only nodes between the two
+        positions are visited; raises CycleError if source is reachable.
+        """
+        lower, upper = self.positions[target_id], self.positions[source_id]
+
+        forward = self._find_path(target_id, source_id, lambda node_id: self.positions[node_id] <= upper, collect=True)
+        if forward and forward[-1] == source_id:
+            raise CycleError(forward + [target_id])
+        backward = self._collect(source_id, self.predecessors, lambda node_id: self.positions[node_id] > lower)
+
+        # Everything that reaches source must now precede everything target reaches
+        affected = sorted(backward, key=self.positions.get) + sorted(forward, key=self.positions.get)
+        slots = sorted(self.positions[node_id] for node_id in affected)
+        for node_id, position in zip(affected, slots):
+            self.positions[node_id] = position
+        self._order = None
+
+    def _find_path(self, start_id, goal_id, within, collect=False):
+        """
+        Depth-first search from start over successors restricted to nodes
+        accepted by within. Returns the path to goal if reached; otherwise
+        the visited nodes when collect is set, else None.
+        """
+        parents = {start_id: None}
+        stack = [start_id]
+        while stack:
+            node_id = stack.pop()
+            if node_id == goal_id:
+                path = []
+                while node_id is not None:
+                    path.append(node_id)
+                    node_id = parents[node_id]
+                return path[::-1]
+            for next_id in self.successors[node_id]:
+                if next_id not in parents and within(next_id):
+                    parents[next_id] = node_id
+                    stack.append(next_id)
+        return list(parents) if collect else None
+
+    def _collect(self, start_id, adjacency, within):
+        seen = {start_id}
+        stack = [start_id]
+        while stack:
+            node_id = stack.pop()
+            for next_id in adjacency[node_id]:
+                if next_id not in seen and within(next_id):
+                    seen.add(next_id)
+                    stack.append(next_id)
+        return list(seen)
+
+class GraphTopologyCache:
+    """Process-local LRU of GraphTopology entries keyed by graph ID and version"""
+
+    def __init__(self, max_graphs=256):
+        self.max_graphs = max_graphs
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, graph_id, version=None):
+        """Cached topology, or None if missing or built from a different version"""
+        with self.lock:
+            topology = self.entries.get(str(graph_id))
+            if topology is None or (version is not None and topology.version != version):
+                return None
+            self.entries.move_to_end(str(graph_id))
+            return topology
+
+    def put(self, graph_id, topology):
+        with self.lock:
+            self.entries[str(graph_id)] = topology
+            self.entries.move_to_end(str(graph_id))
+            while len(self.entries) > self.max_graphs:
+                self.entries.popitem(last=False)
+
+    def patch(self, graph_id, mutate=None, version=None):
+        """
+        Apply mutate(topology) and/or a new version to a cached entry in
+        place; no-op when not cached. An entry that is not at the version
+        just before the new one missed another process's change and is
+        dropped instead.
+        """
+        with self.lock:
+            topology = self.entries.get(str(graph_id))
+        if topology is None:
+            return
+        with topology.lock:
+            if version is not None and topology.version != version - 1:
+                self.invalidate(graph_id)
+                return
+            if mutate is not None:
+                mutate(topology)
+            if version is not None:
+                topology.version = version
+
+    def invalidate(self, graph_id):
+        with self.lock:
+            self.entries.pop(str(graph_id), None)
+
+graph_topology_cache = GraphTopologyCache()
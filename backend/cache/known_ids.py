@@ -0,0 +1,44 @@
+# backend/cache/known_ids.py
+import threading
+import time
+from collections import OrderedDict
+
+class KnownIds:
+    """
+    Process-local LRU of IDs recently confirmed to exist in the database.
+    A confirmation is trusted for ttl seconds, which bounds how long a
+    deletion made by another process goes unnoticed.
+    """
+
+    def __init__(self, ttl, max_ids=10000):
+        self.ttl = ttl
+        self.max_ids = max_ids
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self.lock:
+            confirmed_at = self.entries.get(str(key))
+            return confirmed_at is not None and time.monotonic() - confirmed_at < self.ttl
+
+    def add(self, key):
+        with self.lock:
+            self.entries[str(key)] = time.monotonic()
+            self.entries.move_to_end(str(key))
+            while len(self.entries) > self.max_ids:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(str(key), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+# Conversations that exist, so a buffered message is never queued for a row
+# its insert would reject after the caller was told it was saved. Cleared by
+# every conversation delete in this process.
+known_conversations = KnownIds(ttl=60.0)
+# Graphs that exist, so high-rate position updates skip the lookup
+known_graphs = KnownIds(ttl=60.0)
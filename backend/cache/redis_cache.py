@@ -1,9 +1,45 @@
 import redis
 import json
+import time
+
+# Stores a value under ARGV[1], records its size and recency in the index,
+# then evicts least recently used entries until the index is within budget.
+# Entries whose sliding TTL ran out are dropped from the index first.
+# KEYS: index zset, sizes hash, total bytes. ARGV: key, payload, ttl, now, max bytes
+_SET_LRU_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[4] - ARGV[3])
+for _, member in ipairs(expired) do
+  redis.call('DECRBY', KEYS[3], tonumber(redis.call('HGET', KEYS[2], member) or '0'))
+  redis.call('HDEL', KEYS[2], member)
+  redis.call('ZREM', KEYS[1], member)
+end
+local previous = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+local size = string.len(ARGV[2])
+redis.call('SET', ARGV[1], ARGV[2], 'EX', ARGV[3])
+redis.call('ZADD', KEYS[1], ARGV[4], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], size)
+local total = redis.call('INCRBY', KEYS[3], size - previous)
+local evicted = 0
+while total > tonumber(ARGV[5]) do
+  local oldest = redis.call('ZPOPMIN', KEYS[1])
+  if #oldest == 0 then break end
+  total = redis.call('DECRBY', KEYS[3], tonumber(redis.call('HGET', KEYS[2], oldest[1]) or '0'))
+  redis.call('HDEL', KEYS[2], oldest[1])
+  redis.call('DEL', oldest[1])
+  evicted = evicted + 1
+end
+return evicted
+"""
 
 class RedisCache:
-    def __init__(self, host='localhost', port=6379, db=0):
-        self.client = redis.Redis(host=host, port=port, db=db)
+    def __init__(self, host='localhost', port=6379, db=0, client=None):
+        self.client = client or redis.Redis(host=host, port=port, db=db)
+        self._set_lru = self.client.register_script(_SET_LRU_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url, timeout=None):
+        """Cache on the server at url; timeout (seconds) bounds connecting and each command"""
+        return cls(client=redis.Redis.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout))
 
     def get(self, key):
         value = self.client.get(key)
@@ -12,6 +48,26 @@ class RedisCache:
     def set(self, key, value, expiry=None):
         self.client.set(key, json.dumps(value), ex=expiry)
 
+    def get_lru(self, index, key, expiry):
+        """get() for entries stored with set_lru(); a hit refreshes the entry's TTL and recency"""
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.get(key)
+        pipeline.expire(key, expiry)
+        pipeline.zadd(index, {key: time.time()}, xx=True)
+        value = pipeline.execute()[0]
+        return json.loads(value) if value else None
+
+    def set_lru(self, index, key, value, expiry, max_bytes):
+        """
+        set() with a sliding TTL, tracked in the index so the entries under
+        it stay within max_bytes by evicting the least recently used ones.
+        Returns the number of evicted entries.
+        """
+        return self._set_lru(
+            keys=[index, f"{index}:sizes", f"{index}:bytes"],
+            args=[key, json.dumps(value), int(expiry), time.time(), int(max_bytes)]
+        )
+
     def delete(self, key):
         self.client.delete(key)
 
@@ -0,0 +1,41 @@
+# backend/db/bulk_operations.py
+from sqlalchemy import insert, update, delete, select
+
+def bulk_insert(session, model_class, rows):
+    """Insert many rows in one executemany and return them as dictionaries"""
+    if not rows:
+        return []
+    table = model_class.__table__
+    rows = _known_columns(table, rows)
+    result = session.execute(insert(table).returning(*table.columns), rows)
+    return [dict(row._mapping) for row in result]
+
+def bulk_update(session, model_class, rows):
+    """
+    Update many rows by primary key in one executemany. Each row is a dict
+    with 'id' plus the columns to change; unknown keys are ignored. Rows
+    with a version counter get it incremented.
+    """
+    if not rows:
+        return []
+    table = model_class.__table__
+    rows = [{key: value for key, value in row.items() if key != 'version'} for row in _known_columns(table, rows)]
+    session.execute(update(model_class), rows)
+    ids = [row['id'] for row in rows]
+    if 'version' in table.columns:
+        session.execute(
+            update(model_class).where(model_class.id.in_(ids)).values(version=model_class.version + 1),
+            execution_options={'synchronize_session': False}
+        )
+    result = session.execute(select(*table.columns).where(table.c.id.in_(ids)))
+    return [dict(row._mapping) for row in result]
+
+def bulk_delete(session, model_class, ids):
+    """Delete rows by primary key in one statement; returns the number removed"""
+    if not ids:
+        return 0
+    return session.execute(delete(model_class).where(model_class.id.in_(ids))).rowcount
+
+def _known_columns(table, rows):
+    column_names = set(table.columns.keys())
+    return [{key: value for key, value in row.items() if key in column_names} for row in rows]
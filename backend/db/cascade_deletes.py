@@ -0,0 +1,56 @@
+# backend/db/cascade_deletes.py
+from sqlalchemy import delete, update, select, or_
+from backend.cache.known_ids import known_conversations, known_graphs
+from backend.models.graph import Graph
+from backend.models.node import Node
+from backend.models.edge import Edge
+from backend.models.conversation import Conversation
+from backend.models.message import Message
+from backend.models.context import Context
+from backend.models.execution import Execution
+from backend.models.execution_result import ExecutionResult
+from backend.models.graph_snapshot import GraphSnapshot
+
+# Each helper removes rows matching a WHERE clause together with everything
+# that depends on them, one DELETE ... WHERE ... IN (subquery) per table and
+# without loading anything into the session. They run in the caller's
+# transaction; the caller commits.
+
+def delete_conversations(session, condition):
+    # Every conversation delete goes through here, nodes and graphs included
+    known_conversations.clear()
+    conversation_ids = select(Conversation.id).where(condition)
+    _delete(session, Message, Message.conversation_id.in_(conversation_ids))
+    _delete(session, Context, Context.conversation_id.in_(conversation_ids))
+    return _delete(session, Conversation, condition)
+
+def delete_nodes(session, condition):
+    node_ids = select(Node.id).where(condition)
+    _delete(session, Edge, or_(Edge.source_id.in_(node_ids), Edge.target_id.in_(node_ids)))
+    delete_conversations(session, Conversation.node_id.in_(node_ids))
+    # Past execution results outlive the node they were produced by
+    session.execute(
+        update(ExecutionResult).where(ExecutionResult.node_id.in_(node_ids)).values(node_id=None),
+        execution_options={'synchronize_session': False}
+    )
+    return _delete(session, Node, condition)
+
+def delete_executions(session, condition):
+    execution_ids = select(Execution.id).where(condition)
+    _delete(session, ExecutionResult, ExecutionResult.execution_id.in_(execution_ids))
+    return _delete(session, Execution, condition)
+
+def delete_graph(session, graph_id):
+    known_graphs.discard(graph_id)
+    delete_executions(session, Execution.graph_id == graph_id)
+    _delete(session, GraphSnapshot, GraphSnapshot.graph_id == graph_id)
+    _delete(session, Edge, Edge.graph_id == graph_id)
+    delete_nodes(session, Node.graph_id == graph_id)
+    return _delete(session, Graph, Graph.id == graph_id)
+
+def _delete(session, model_class, condition):
+    result = session.execute(
+        delete(model_class).where(condition),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount
@@ -0,0 +1,47 @@
+# backend/db/fulltext.py
+from sqlalchemy import func, literal_column, select, Index, Text, JSON, cast
+from sqlalchemy.dialects.postgresql import JSONB
+
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+# Inline constants rather than bound parameters, so the expression a query
+# sends is textually identical to the indexed one
+_EMPTY = literal_column("''")
+_SPACE = literal_column("' '")
+_EMPTY_OBJECT = literal_column("'{}'::jsonb")
+_STRING_VALUES = literal_column("'[\"string\"]'::jsonb")
+_STRING_VALUES_PATH = literal_column("'strict $.**?(@.type() == \"string\")'::jsonpath")
+
+def search_vector(*columns):
+    """
+    tsvector over one or more text-like columns. Only the string values of
+    JSON columns are indexed, so keys such as "model" or "prompt" do not
+    match every row. Queries must build the vector with this same helper so
+    Postgres matches it to the GIN index.
+    """
+    text_columns = [column for column in columns if not isinstance(column.type, JSON)]
+    vectors = []
+    if text_columns:
+        parts = [func.coalesce(cast(column, Text), _EMPTY) for column in text_columns]
+        document = parts[0]
+        for part in parts[1:]:
+            document = document.op('||')(_SPACE).op('||')(part)
+        vectors.append(func.to_tsvector(SEARCH_CONFIG, document))
+    for column in columns:
+        if isinstance(column.type, JSON):
+            document = func.coalesce(cast(column, JSONB), _EMPTY_OBJECT)
+            vectors.append(func.jsonb_to_tsvector(SEARCH_CONFIG, document, _STRING_VALUES))
+    vector = vectors[0]
+    for part in vectors[1:]:
+        vector = vector.op('||')(part)
+    return vector
+
+def json_strings(column):
+    """The string values found anywhere in a JSON column, space separated (e.g. for snippets)"""
+    values = func.jsonb_array_elements_text(
+        func.jsonb_path_query_array(cast(column, JSONB), _STRING_VALUES_PATH)
+    ).table_valued('value')
+    return select(func.coalesce(func.string_agg(values.c.value, _SPACE), _EMPTY)).scalar_subquery()
+
+def search_index(name, *columns):
+    """GIN expression index on search_vector(*columns); only created on Postgres"""
+    return Index(name, search_vector(*columns), postgresql_using='gin').ddl_if(dialect='postgresql')
@@ -1,4 +1,6 @@
 # backend/db/model_mappers.py
+from operator import attrgetter
+from sqlalchemy import select
 from backend.models.graph import Graph
 from backend.models.node import Node
 from backend.models.edge import Edge
@@ -6,24 +8,48 @@ from backend.models.conversation import Conversation
 from backend.models.message import Message
 from backend.models.execution import Execution
 from backend.models.execution_result import ExecutionResult
+from backend.models.graph_snapshot import GraphSnapshot
+
+_mappers = {}
+
+def _mapper_for(model_class):
+    """Column names and a compiled attrgetter for a model, built once per class"""
+    mapper = _mappers.get(model_class)
+    if mapper is None:
+        names = tuple(column.name for column in model_class.__table__.columns)
+        getter = attrgetter(*names)
+        if len(names) == 1:
+            # attrgetter with a single name returns the bare value
+            single = getter
+            getter = lambda instance: (single(instance),)
+        mapper = _mappers[model_class] = (names, getter)
+    return mapper
 
 def map_to_domain(db_model):
     """Convert SQLAlchemy model instance to domain dictionary."""
     if db_model is None:
         return None
-        
-    # Extract model attributes into a dictionary
-    result = {}
-    for column in db_model.__table__.columns:
-        result[column.name] = getattr(db_model, column.name)
-    
-    return result
+    names, getter = _mapper_for(type(db_model))
+    return dict(zip(names, getter(db_model)))
 
 def map_collection(models):
     """Convert a collection of models to dictionaries"""
-    if models is None:
+    if not models:
         return []
-    return [map_to_domain(model) for model in models]
+    names, getter = _mapper_for(type(models[0]))
+    return [dict(zip(names, getter(model))) for model in models]
+
+def select_columns(model_class):
+    """
+    SELECT of a model's columns as plain tuples. Read-only list queries use
+    this with map_rows to skip ORM instance construction and the identity map.
+    """
+    return select(*model_class.__table__.columns)
+
+def map_rows(result):
+    """Convert the rows of a column-tuple query to dictionaries"""
+    names = tuple(result.keys())
+    return [dict(zip(names, row)) for row in result]
 
 def map_to_db(model_class, data):
     """Convert dictionary to SQLAlchemy model instance."""
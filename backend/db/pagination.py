@@ -0,0 +1,51 @@
+# backend/db/pagination.py
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from sqlalchemy import tuple_, literal, DateTime
+from shared.errors import ValidationError
+
+def encode_cursor(value, row_id):
+    """Opaque cursor for a row's (sort value, id) position; the value is usually created_at"""
+    position = {"t": value.isoformat()} if isinstance(value, datetime) else {"v": value}
+    payload = json.dumps({**position, "id": str(row_id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """(sort value, id) from a cursor made by encode_cursor; ValidationError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = datetime.fromisoformat(payload["t"]) if "t" in payload else payload["v"]
+        return value, uuid.UUID(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValidationError(f"Invalid cursor: {cursor}")
+
+def keyset_page(query, created_column, id_column, limit=None, before=None, after=None):
+    """
+    Apply keyset pagination on (created_at, id) to a select.
+
+    before returns the rows just older than that cursor, after the rows
+    just newer; with neither, the newest rows. One extra row is fetched so
+    the caller can tell whether more remain in that direction; without a
+    limit every remaining row is returned. The rows come back newest first
+    for before/latest pages and oldest first for after pages.
+    """
+    position = tuple_(created_column, id_column)
+    if after:
+        query = query.where(position > cursor_position(after, created_column, id_column))
+        query = query.order_by(created_column.asc(), id_column.asc())
+    else:
+        if before:
+            query = query.where(position < cursor_position(before, created_column, id_column))
+        query = query.order_by(created_column.desc(), id_column.desc())
+    return query.limit(limit + 1) if limit is not None else query
+
+def cursor_position(cursor, value_column, id_column):
+    """Row value (sort value, id) decoded from a cursor, typed like the columns it is compared with"""
+    value, row_id = decode_cursor(cursor)
+    if isinstance(value_column.type, DateTime) and not isinstance(value, datetime):
+        raise ValidationError(f"Invalid cursor: {cursor}")
+    return tuple_(literal(value, value_column.type), literal(row_id, id_column.type))
@@ -1,36 +1,112 @@
 # backend/db/sqlalchemy_manager.py
+import threading
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
 from shared.config import config
 
 DATABASE_URL = config.get_config('DATABASE_URL')
 
-engine = create_engine(DATABASE_URL, echo=config.get_config('DEBUG_MODE'))
-SessionLocal = scoped_session(sessionmaker(bind=engine))
+def build_engine_options(database_url):
+    """Pool and connection settings for create_engine, taken from ConfigManager"""
+    options = {
+        'echo': config.get_config('DEBUG_MODE'),
+        'pool_pre_ping': config.get_config('DB_POOL_PRE_PING'),
+        'pool_recycle': config.get_config('DB_POOL_RECYCLE'),
+    }
+    if not database_url.startswith('sqlite'):
+        options['pool_size'] = config.get_config('DB_POOL_SIZE')
+        options['max_overflow'] = config.get_config('DB_MAX_OVERFLOW')
+        options['pool_timeout'] = config.get_config('DB_POOL_TIMEOUT')
+    statement_timeout = config.get_config('DB_STATEMENT_TIMEOUT_MS')
+    if database_url.startswith('postgresql') and statement_timeout:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+engine = create_engine(DATABASE_URL, **build_engine_options(DATABASE_URL))
+# Repositories map rows to dicts straight after commit, and request-scoped
+# sessions commit between operations, so reloading on commit is pure overhead
+SessionLocal = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
 
 Base = declarative_base()
 
+_scope = threading.local()
+
 def init_db():
     Base.metadata.create_all(bind=engine)
 
 def get_session():
     return SessionLocal()
 
+@contextmanager
+def session_scope():
+    """
+    Session for one repository operation. Rolls back on error.
+
+    Inside a request or task scope the thread's session is shared and only
+    its transaction is ended here, so the connection goes back to the pool
+    between operations instead of being held across slow work such as LLM
+    calls. Outside a scope the session is closed as before.
+    """
+    session = SessionLocal()
+    try:
+        yield session
+        if _in_scope():
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        if not _in_scope():
+            session.close()
+
+def begin_session_scope():
+    """Share one session across the repository calls of this request or task"""
+    _scope.depth = getattr(_scope, 'depth', 0) + 1
+
+def end_session_scope(exception=None):
+    """Leave the scope; the outermost exit removes the thread's session"""
+    _scope.depth = max(getattr(_scope, 'depth', 0) - 1, 0)
+    if not _scope.depth:
+        SessionLocal.remove()
+
+@contextmanager
+def session_context():
+    """Scope the sessions of one worker task"""
+    begin_session_scope()
+    try:
+        yield
+    finally:
+        end_session_scope()
+
+def register_session_scope(blueprint):
+    """Scope sessions to each request handled by a blueprint"""
+    blueprint.before_request(begin_session_scope)
+    blueprint.teardown_request(end_session_scope)
+
+def _in_scope():
+    return getattr(_scope, 'depth', 0) > 0
+
 # Add this class to make the test code work without changing it
 class SQLAlchemyManager:
     """Class wrapper for the existing SQLAlchemy functions"""
-    
+
     @classmethod
     def init_db(cls):
         """Initialize the database schema"""
         init_db()
-    
+
     @classmethod
     def get_session(cls):
         """Get a database session"""
         return get_session()
-    
+
+    @classmethod
+    def session_scope(cls):
+        """Get a session for one repository operation"""
+        return session_scope()
+
     @classmethod
     def get_base(cls):
         """Get the SQLAlchemy Base class"""
-        return Base
\ No newline at end of file
+        return Base
@@ -0,0 +1,39 @@
+# backend/db/versioning.py
+from sqlalchemy import update, select
+from shared.errors import ConflictError
+
+IMMUTABLE_COLUMNS = ('id', 'version', 'created_at')
+
+def versioned_update(session, model_class, row_id, updates, expected_version=None):
+    """
+    Optimistic update of one row with a `version` counter.
+
+    Applies the column values in updates and increments version in a
+    single UPDATE. With expected_version the statement also requires
+    `version = expected_version`, so a concurrent edit is detected without
+    locking. Returns the updated row as a dict, None if the row does not
+    exist, and raises ConflictError (with the current version) if it has
+    moved on. The caller commits.
+    """
+    table = model_class.__table__
+    values = {key: value for key, value in updates.items()
+              if key in table.columns and key not in IMMUTABLE_COLUMNS}
+    values['version'] = model_class.version + 1
+
+    statement = update(model_class).where(model_class.id == row_id)
+    if expected_version is not None:
+        statement = statement.where(model_class.version == expected_version)
+    row = session.execute(
+        statement.values(**values).returning(*table.columns),
+        execution_options={'synchronize_session': False}
+    ).first()
+    if row is not None:
+        return dict(row._mapping)
+
+    current_version = session.execute(select(model_class.version).where(model_class.id == row_id)).scalar()
+    if current_version is None:
+        return None
+    raise ConflictError(
+        f"{model_class.__name__} {row_id} is at version {current_version}, not {expected_version}",
+        current_version=current_version
+    )
@@ -0,0 +1,77 @@
+# backend/infrastructure/cancellation.py
+import threading
+from shared.errors import OperationCancelledError
+
+class CancellationToken:
+    """Thread-safe flag that long-running work polls, with hooks to abort blocking I/O"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def register(self, callback):
+        """
+        Run callback on cancellation (immediately if already cancelled).
+        Returns a function that unregisters it.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def wait(self, timeout=None):
+        """Sleep up to timeout seconds, waking early on cancellation; True if cancelled"""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise OperationCancelledError()
+
+    def _unregister(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+class CancellationRegistry:
+    """Tokens for in-flight work, keyed by e.g. execution ID"""
+
+    def __init__(self):
+        self.tokens = {}
+        self.lock = threading.Lock()
+
+    def create(self, key):
+        with self.lock:
+            return self.tokens.setdefault(str(key), CancellationToken())
+
+    def get(self, key):
+        with self.lock:
+            return self.tokens.get(str(key))
+
+    def cancel(self, key):
+        token = self.get(key)
+        if not token:
+            return False
+        token.cancel()
+        return True
+
+    def discard(self, key):
+        with self.lock:
+            self.tokens.pop(str(key), None)
+
+cancellation_registry = CancellationRegistry()
@@ -0,0 +1,86 @@
+# backend/infrastructure/task_queue.py
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from shared.config import config
+from backend.db.sqlalchemy_manager import session_context
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('task_queue')
+
+FINISHED_TASKS_KEPT = 1000
+
+class TaskQueue:
+    """In-process job queue drained by a fixed pool of daemon worker threads"""
+
+    def __init__(self, worker_count=None):
+        self.worker_count = worker_count or config.get_config('TASK_QUEUE_WORKERS', 4)
+        self.tasks = queue.Queue()
+        self.statuses = OrderedDict()
+        self.lock = threading.Lock()
+        self.workers = []
+
+    def start(self):
+        """Start the worker threads once; later calls are no-ops"""
+        with self.lock:
+            if self.workers:
+                return
+            for index in range(self.worker_count):
+                worker = threading.Thread(target=self.run_worker, name=f"task-worker-{index}", daemon=True)
+                worker.start()
+                self.workers.append(worker)
+        logger.info(f"Task queue started with {self.worker_count} workers")
+
+    def enqueue_task(self, func, *args, task_id=None, **kwargs):
+        """Queue func(*args, **kwargs) for a worker and return its task ID"""
+        self.start()
+        task_id = task_id or str(uuid.uuid4())
+        with self.lock:
+            self.statuses[task_id] = "PENDING"
+        self.tasks.put((task_id, func, args, kwargs))
+        return task_id
+
+    def run_worker(self):
+        while True:
+            task_id, func, args, kwargs = self.tasks.get()
+            try:
+                with self.lock:
+                    if self.statuses.get(task_id) == "CANCELLED":
+                        continue
+                    self.statuses[task_id] = "RUNNING"
+                # One session per task, removed when it ends
+                with session_context():
+                    func(*args, **kwargs)
+                self._finish(task_id, "COMPLETED")
+            except Exception as e:
+                logger.error(f"Task {task_id} failed: {e}")
+                self._finish(task_id, "FAILED")
+            finally:
+                self.tasks.task_done()
+
+    def get_task_status(self, task_id):
+        with self.lock:
+            return self.statuses.get(task_id)
+
+    def cancel_task(self, task_id):
+        """Cancel a task that has not started yet"""
+        with self.lock:
+            if self.statuses.get(task_id) != "PENDING":
+                return False
+            self.statuses[task_id] = "CANCELLED"
+            self.statuses.move_to_end(task_id)
+            return True
+
+    def _finish(self, task_id, status):
+        with self.lock:
+            self.statuses[task_id] = status
+            self.statuses.move_to_end(task_id)
+            # Keep the status table from growing with every task ever run
+            while len(self.statuses) > FINISHED_TASKS_KEPT:
+                oldest_id, oldest_status = next(iter(self.statuses.items()))
+                if oldest_status in ("PENDING", "RUNNING"):
+                    break
+                self.statuses.popitem(last=False)
+
+task_queue = TaskQueue()
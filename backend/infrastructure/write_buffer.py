@@ -0,0 +1,158 @@
+# backend/infrastructure/write_buffer.py
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import exc
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('write_buffer')
+
+MAX_RETRY_DELAY = 30.0
+
+def is_transient(error):
+    """Whether a failed write may succeed later: lost connections, pool or statement timeouts"""
+    if isinstance(error, (exc.OperationalError, exc.InterfaceError, exc.TimeoutError)):
+        return True
+    return isinstance(error, exc.DBAPIError) and error.connection_invalidated
+
+class WriteBuffer:
+    """
+    Groups row writes into batches made by a background thread once
+    max_size rows are waiting or max_delay seconds have passed.
+
+    Rows are grouped by a key (e.g. conversation ID) so readers can call
+    flush(key) before querying and see their own writes. A flush waits for
+    any batch already being written, so nothing is in flight when it returns.
+    With unique_by, a row replaces a pending row with the same value in that
+    field instead of being appended, so only the latest state is written.
+
+    Rows whose write fails transiently (see is_transient) are queued again
+    and retried with exponential backoff, up to max_attempts times; rows
+    that can never be written, such as constraint violations, are dropped.
+    """
+
+    def __init__(self, write_batch, max_size, max_delay, name='write-buffer', unique_by=None,
+                 max_attempts=5, retry_delay=0.5):
+        self.write_batch = write_batch
+        self.unique_by = unique_by
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.attempts = {}
+        self.retry_at = 0.0
+        self.pending = OrderedDict()
+        self.count = 0
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.flusher = None
+        atexit.register(self.flush)
+
+    def add(self, key, row):
+        with self.condition:
+            if self.flusher is None:
+                self.flusher = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.flusher.start()
+            if self.unique_by:
+                batch = self.pending.setdefault(str(key), {})
+                row_key = str(row[self.unique_by])
+                if row_key not in batch:
+                    self.count += 1
+                batch[row_key] = row
+            else:
+                self.pending.setdefault(str(key), []).append(row)
+                self.count += 1
+            if self.count == 1 or self.count >= self.max_size:
+                self.condition.notify()
+        return row
+
+    def flush(self, key=None):
+        """Write pending rows now: all of them, or only those under key"""
+        with self.write_lock:
+            with self.condition:
+                if key is None:
+                    entries = [(batch_key, row) for batch_key, batch in self.pending.items() for row in self._rows(batch)]
+                    self.pending.clear()
+                else:
+                    entries = [(str(key), row) for row in self._rows(self.pending.pop(str(key), []))]
+                self.count -= len(entries)
+            if entries:
+                self._write(entries)
+
+    def _rows(self, batch):
+        return list(batch.values()) if isinstance(batch, dict) else batch
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.count:
+                    self.condition.wait()
+                if self.count < self.max_size:
+                    self.condition.wait(self.max_delay)
+                # Back off after a transient failure
+                while self.count and self.retry_at > time.monotonic():
+                    self.condition.wait(self.retry_at - time.monotonic())
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"{self.name} flush failed: {e}")
+
+    def _write(self, entries):
+        try:
+            self.write_batch([row for _, row in entries])
+            self._done(entries)
+            return
+        except Exception as e:
+            if is_transient(e):
+                self._retry(entries, e)
+                return
+            # One bad row (e.g. a deleted parent) must not sink the whole batch
+            logger.warning(f"{self.name} batch of {len(entries)} failed, retrying row by row: {e}")
+        for index, (key, row) in enumerate(entries):
+            try:
+                self.write_batch([row])
+            except Exception as row_error:
+                if is_transient(row_error):
+                    self._retry(entries[index:], row_error)
+                    return
+                logger.error(f"{self.name} dropped row {row.get('id')}: {row_error}")
+            self._done([(key, row)])
+
+    def _done(self, entries):
+        with self.condition:
+            for _, row in entries:
+                self.attempts.pop(id(row), None)
+
+    def _retry(self, entries, error):
+        """Queue rows again after a transient failure, dropping those out of attempts"""
+        with self.condition:
+            attempts = 0
+            for key, row in reversed(entries):
+                attempt = self.attempts.pop(id(row), 0) + 1
+                if attempt >= self.max_attempts:
+                    logger.error(f"{self.name} dropped row {row.get('id')} after {attempt} attempts: {error}")
+                elif self._requeue(key, row):
+                    self.attempts[id(row)] = attempt
+                    attempts = max(attempts, attempt)
+            if not attempts:
+                return
+            delay = min(MAX_RETRY_DELAY, self.retry_delay * 2 ** (attempts - 1))
+            self.retry_at = time.monotonic() + delay
+            self.condition.notify()
+        logger.warning(f"{self.name} write of {len(entries)} rows failed, retrying in {delay:.1f}s: {error}")
+
+    def _requeue(self, key, row):
+        """Put a row back ahead of newer ones; False if a newer row replaced it meanwhile"""
+        if self.unique_by:
+            batch = self.pending.setdefault(key, {})
+            row_key = str(row[self.unique_by])
+            if row_key in batch:
+                return False
+            batch[row_key] = row
+        else:
+            self.pending.setdefault(key, []).insert(0, row)
+        self.pending.move_to_end(key, last=False)
+        self.count += 1
+        return True
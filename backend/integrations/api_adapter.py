@@ -2,9 +2,14 @@
 import requests
 from backend.infrastructure.logger import get_logger
 from .api_key_manager import APIKeyManager
+from .http_session import http_pool
+from .rate_limiter import rate_limiter
+from .resilience import retry_policy
 
 logger = get_logger('api_adapter')
 
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
 class APIAdapter:
     def __init__(self, service_name, base_url):
         self.service_name = service_name
@@ -22,18 +27,16 @@ class APIAdapter:
 
         url = f"{self.base_url}{endpoint}"
 
-        try:
-            response = requests.request(
-                method=method,
-                url=url,
-                json=data,
-                params=params,
-                headers=headers,
-                stream=stream
-            )
-            response.raise_for_status()
-            return response if stream else response.json()
-        except requests.RequestException as e:
-            logger.error(f"Error during request to {url}: {e}")
-            raise
+        # Limits for a service come from RATE_LIMITS under its service name
+        with rate_limiter.acquire(self.service_name) as permit:
+            try:
+                # Only idempotent methods are retried; a failed POST may already have taken effect.
+                # An open circuit raises CircuitOpenError to the caller like any other failure.
+                send = lambda: http_pool.send(method, url, json=data, params=params, headers=headers, stream=stream)
+                attempts = None if method.upper() in IDEMPOTENT_METHODS else 1
+                response = retry_policy.call(url, send, max_attempts=attempts)
+                return permit.wrap_response(response) if stream else response.json()
+            except requests.RequestException as e:
+                logger.error(f"Error during request to {url}: {e}")
+                raise
 
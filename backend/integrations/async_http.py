@@ -0,0 +1,52 @@
+# backend/integrations/async_http.py
+import asyncio
+import weakref
+import aiohttp
+from shared.config import config
+
+# aiohttp sessions belong to the event loop they were created on
+_sessions = weakref.WeakKeyDictionary()
+
+def async_http_session():
+    """
+    The running loop's shared aiohttp session. Its connector keeps up to
+    ASYNC_HTTP_MAX_CONNECTIONS keep-alive connections (ASYNC_HTTP_MAX_PER_HOST
+    per host), so hundreds of concurrent calls multiplex over a bounded set
+    of sockets without a thread each. Connect and per-read timeouts match
+    the synchronous pool.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=config.get_config('ASYNC_HTTP_MAX_CONNECTIONS', 256),
+                limit_per_host=config.get_config('ASYNC_HTTP_MAX_PER_HOST', 64)
+            ),
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=config.get_config('HTTP_CONNECT_TIMEOUT', 5.0),
+                sock_read=config.get_config('HTTP_READ_TIMEOUT', 300.0)
+            )
+        )
+        _sessions[loop] = session
+    return session
+
+async def close_async_http_session():
+    """Close the running loop's session; call before the loop shuts down"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+async def open_response(method, url, **kwargs):
+    """Start a request and return the response once its headers are in; raises for 4xx/5xx"""
+    response = await async_http_session().request(method, url, **kwargs)
+    # Releases the connection before raising
+    response.raise_for_status()
+    return response
+
+async def iter_async_lines(response):
+    """Yield the non-empty lines of a streaming aiohttp response as they arrive"""
+    async for line in response.content:
+        line = line.strip()
+        if line:
+            yield line
@@ -1,7 +1,17 @@
 # backend/integrations/groq_client.py
 import os
+import json
+import asyncio
+import aiohttp
 import requests
 from backend.infrastructure.logger import get_logger
+from .stream_utils import iter_response_lines
+from .http_session import http_pool
+from .async_http import async_http_session, open_response, iter_async_lines
+from .rate_limiter import rate_limiter, request_tokens
+from .resilience import retry_policy
+from .response_cache import response_cache
+from shared.errors import CircuitOpenError
 
 logger = get_logger('groq_client')
 
@@ -20,28 +30,142 @@ class GroqClient:
         ]
 
     @staticmethod
-    def chat(model, messages, temperature, max_tokens):
+    def chat(model, messages, temperature, max_tokens, stream=False, cancel_token=None):
+        if response_cache.applies(temperature):
+            return response_cache.chat(GroqClient, 'groq', model, messages, temperature, max_tokens, stream, cancel_token)
+        return GroqClient._chat(model, messages, temperature, max_tokens, stream, cancel_token)
+
+    @staticmethod
+    async def achat(model, messages, temperature, max_tokens):
+        """Async chat; returns the response JSON, or {"error": ...} like chat()"""
+        if response_cache.applies(temperature):
+            return await response_cache.achat(GroqClient, 'groq', model, messages, temperature, max_tokens)
+        return await GroqClient._achat(model, messages, temperature, max_tokens)
+
+    @staticmethod
+    def astream_chat(model, messages, temperature, max_tokens):
+        """Async iterator over the server-sent event lines of a streamed chat; raises RuntimeError on failure"""
+        if response_cache.applies(temperature):
+            return response_cache.astream_chat(GroqClient, 'groq', model, messages, temperature, max_tokens)
+        return GroqClient._astream_chat(model, messages, temperature, max_tokens)
+
+    @staticmethod
+    def _chat(model, messages, temperature, max_tokens, stream=False, cancel_token=None):
+        headers = GroqClient._headers()
+        if not headers:
+            return {"error": "GROQ_API_KEY not configured"}
+
+        data = GroqClient._payload(model, messages, temperature, max_tokens, stream)
+        with rate_limiter.acquire('groq', model, request_tokens(messages, max_tokens), cancel_token) as permit:
+            try:
+                response = retry_policy.call(
+                    GROQ_API_URL,
+                    lambda: http_pool.send('POST', GROQ_API_URL, headers=headers, json=data, stream=stream),
+                    cancel_token
+                )
+                if stream:
+                    return permit.wrap(iter_response_lines(response, cancel_token))
+                result = response.json()
+                permit.settle((result.get('usage') or {}).get('total_tokens'))
+                return result
+            except (requests.RequestException, CircuitOpenError) as e:
+                logger.error(f"Chat request to Groq failed: {e}")
+                return {"error": str(e)}
+
+    @staticmethod
+    async def _achat(model, messages, temperature, max_tokens):
+        headers = GroqClient._headers()
+        if not headers:
+            return {"error": "GROQ_API_KEY not configured"}
+
+        data = GroqClient._payload(model, messages, temperature, max_tokens, False)
+
+        async def fetch():
+            async with async_http_session().post(GROQ_API_URL, headers=headers, json=data) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+        with await rate_limiter.acquire_async('groq', model, request_tokens(messages, max_tokens)) as permit:
+            try:
+                result = await retry_policy.call_async(GROQ_API_URL, fetch)
+                permit.settle((result.get('usage') or {}).get('total_tokens'))
+                return result
+            except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+                logger.error(f"Chat request to Groq failed: {e}")
+                return {"error": str(e) or type(e).__name__}
+
+    @staticmethod
+    async def _astream_chat(model, messages, temperature, max_tokens):
+        headers = GroqClient._headers()
+        if not headers:
+            raise RuntimeError("GROQ_API_KEY not configured")
+
+        data = GroqClient._payload(model, messages, temperature, max_tokens, True)
+        with await rate_limiter.acquire_async('groq', model, request_tokens(messages, max_tokens)):
+            try:
+                # Only opening the stream is retried; a reply cut off midway is not replayed
+                response = await retry_policy.call_async(
+                    GROQ_API_URL, lambda: open_response('POST', GROQ_API_URL, headers=headers, json=data)
+                )
+                async with response:
+                    async for line in iter_async_lines(response):
+                        yield line
+            except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+                logger.error(f"Chat request to Groq failed: {e}")
+                raise RuntimeError(str(e) or type(e).__name__)
+
+    @staticmethod
+    def _headers():
         api_key = os.getenv('GROQ_API_KEY')
         if not api_key:
             logger.error("GROQ_API_KEY not found in environment variables.")
-            return {"error": "GROQ_API_KEY not configured"}
-
-        headers = {
+            return None
+        return {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
 
-        data = {
+    @staticmethod
+    def _payload(model, messages, temperature, max_tokens, stream):
+        return {
             "model": model,
             "messages": messages,
             "temperature": temperature,
-            "max_completion_tokens": max_tokens
+            "max_completion_tokens": max_tokens,
+            "stream": stream
         }
 
-        try:
-            response = requests.post(GROQ_API_URL, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            logger.error(f"Chat request to Groq failed: {e}")
-            return {"error": str(e)}
+    @staticmethod
+    def text_from_response(response):
+        choices = response.get('choices') or [{}]
+        return (choices[0].get('message') or {}).get('content', '')
+
+    @staticmethod
+    def response_from_text(text):
+        """A non-streaming chat response carrying text, for replies served from the cache"""
+        return {
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "cached": True
+        }
+
+    @staticmethod
+    def stream_lines_from_text(text):
+        """Server-sent event lines carrying text, for replies served from the cache"""
+        chunk = {"choices": [{"index": 0, "delta": {"content": text}}]}
+        return [f"data: {json.dumps(chunk)}".encode('utf-8'), b"data: [DONE]"]
+
+    @staticmethod
+    def parse_stream_line(line):
+        """Return the text carried by one server-sent event of a streamed chat response"""
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.startswith('data:'):
+            return ''
+        payload = line[len('data:'):].strip()
+        if payload == '[DONE]':
+            return ''
+        chunk = json.loads(payload)
+        if 'error' in chunk:
+            raise RuntimeError(chunk['error'])
+        choices = chunk.get('choices') or [{}]
+        return (choices[0].get('delta') or {}).get('content') or ''
@@ -0,0 +1,83 @@
+# backend/integrations/http_session.py
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from shared.config import config
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('http_session')
+
+class HTTPSessionPool:
+    """
+    Keep-alive HTTP connections shared by every integration and thread.
+
+    One HTTPAdapter holds a urllib3 pool per host (up to pool_connections
+    hosts, pool_maxsize sockets each), so repeated calls to Groq or Ollama
+    reuse open TCP/TLS connections instead of handshaking per request.
+    Each thread gets its own lightweight Session mounted on that adapter,
+    since Session state such as cookies is not safe to share. Every request
+    gets a (connect, read) timeout unless the caller passes its own; for
+    streamed responses the read timeout bounds the wait for each chunk.
+    """
+
+    def __init__(self, pool_connections, pool_maxsize, connect_timeout, read_timeout):
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.timeout = (connect_timeout, read_timeout)
+        self.local = threading.local()
+
+    def session(self):
+        """The calling thread's session"""
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            self.local.session = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session().request(method, url, **kwargs)
+
+    def send(self, method, url, **kwargs):
+        """request(), raising HTTPError for 4xx/5xx after freeing the connection"""
+        response = self.request(method, url, **kwargs)
+        if not response.ok:
+            response.close()
+        response.raise_for_status()
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """
+        Per host: requests sent, connections opened and requests that
+        reused an open connection, for the pools currently held.
+        """
+        pools = self.adapter.poolmanager.pools
+        with pools.lock:
+            items = [(key, pools[key]) for key in pools.keys()]
+        stats = {}
+        for key, pool in items:
+            host = f"{key.key_scheme}://{key.key_host}:{key.key_port}"
+            stats[host] = {
+                "requests": pool.num_requests,
+                "connections": pool.num_connections,
+                "reused": max(pool.num_requests - pool.num_connections, 0)
+            }
+        return stats
+
+    def close(self):
+        """Close every pooled connection"""
+        self.adapter.close()
+
+http_pool = HTTPSessionPool(
+    pool_connections=config.get_config('HTTP_POOL_CONNECTIONS', 10),
+    pool_maxsize=config.get_config('HTTP_POOL_MAXSIZE', 32),
+    connect_timeout=config.get_config('HTTP_CONNECT_TIMEOUT', 5.0),
+    read_timeout=config.get_config('HTTP_READ_TIMEOUT', 300.0)
+)
@@ -1,6 +1,16 @@
+import json
+import asyncio
+import aiohttp
 import requests
 import subprocess
 from backend.infrastructure.logger import get_logger
+from .stream_utils import iter_response_lines
+from .http_session import http_pool
+from .async_http import async_http_session, open_response, iter_async_lines
+from .rate_limiter import rate_limiter
+from .resilience import retry_policy
+from .response_cache import response_cache
+from shared.errors import CircuitOpenError
 
 logger = get_logger('ollama_client')
 OLLAMA_API_URL = "http://localhost:11434/api"
@@ -21,7 +31,7 @@ class OllamaClient:
     @staticmethod
     def get_available_models():
         try:
-            response = requests.get(f"{OLLAMA_API_URL}/tags")
+            response = http_pool.get(f"{OLLAMA_API_URL}/tags")
             response.raise_for_status()
             models = response.json().get('models', [])
             return [model['name'] for model in models]
@@ -30,8 +40,75 @@ class OllamaClient:
             return OllamaClient.AVAILABLE_MODELS
 
     @staticmethod
-    def chat(model, messages, temperature, max_tokens, stream=False):
-        data = {
+    def chat(model, messages, temperature, max_tokens, stream=False, cancel_token=None):
+        if response_cache.applies(temperature):
+            return response_cache.chat(OllamaClient, 'ollama', model, messages, temperature, max_tokens, stream, cancel_token)
+        return OllamaClient._chat(model, messages, temperature, max_tokens, stream, cancel_token)
+
+    @staticmethod
+    async def achat(model, messages, temperature, max_tokens):
+        """Async chat; returns the response JSON, or {"error": ...} like chat()"""
+        if response_cache.applies(temperature):
+            return await response_cache.achat(OllamaClient, 'ollama', model, messages, temperature, max_tokens)
+        return await OllamaClient._achat(model, messages, temperature, max_tokens)
+
+    @staticmethod
+    def astream_chat(model, messages, temperature, max_tokens):
+        """Async iterator over the JSON lines of a streamed chat; raises RuntimeError on failure"""
+        if response_cache.applies(temperature):
+            return response_cache.astream_chat(OllamaClient, 'ollama', model, messages, temperature, max_tokens)
+        return OllamaClient._astream_chat(model, messages, temperature, max_tokens)
+
+    @staticmethod
+    def _chat(model, messages, temperature, max_tokens, stream=False, cancel_token=None):
+        data = OllamaClient._payload(model, messages, temperature, max_tokens, stream)
+        logger.info(f"Chat request to Ollama model '{model}' (stream={stream})")
+        url = f"{OLLAMA_API_URL}/chat"
+        with rate_limiter.acquire('ollama', model, cancel_token=cancel_token) as permit:
+            try:
+                response = retry_policy.call(url, lambda: http_pool.send('POST', url, json=data, stream=stream), cancel_token)
+                return permit.wrap(iter_response_lines(response, cancel_token)) if stream else response.json()
+            except (requests.RequestException, CircuitOpenError) as e:
+                logger.error(f"Chat request failed: {e}")
+                return {"error": str(e)}
+
+    @staticmethod
+    async def _achat(model, messages, temperature, max_tokens):
+        data = OllamaClient._payload(model, messages, temperature, max_tokens, False)
+        logger.info(f"Async chat request to Ollama model '{model}'")
+        url = f"{OLLAMA_API_URL}/chat"
+
+        async def fetch():
+            async with async_http_session().post(url, json=data) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+        with await rate_limiter.acquire_async('ollama', model):
+            try:
+                return await retry_policy.call_async(url, fetch)
+            except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+                logger.error(f"Chat request failed: {e}")
+                return {"error": str(e) or type(e).__name__}
+
+    @staticmethod
+    async def _astream_chat(model, messages, temperature, max_tokens):
+        data = OllamaClient._payload(model, messages, temperature, max_tokens, True)
+        logger.info(f"Async chat request to Ollama model '{model}' (stream=True)")
+        url = f"{OLLAMA_API_URL}/chat"
+        with await rate_limiter.acquire_async('ollama', model):
+            try:
+                # Only opening the stream is retried; a reply cut off midway is not replayed
+                response = await retry_policy.call_async(url, lambda: open_response('POST', url, json=data))
+                async with response:
+                    async for line in iter_async_lines(response):
+                        yield line
+            except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+                logger.error(f"Chat request failed: {e}")
+                raise RuntimeError(str(e) or type(e).__name__)
+
+    @staticmethod
+    def _payload(model, messages, temperature, max_tokens, stream):
+        return {
             "model": model,
             "messages": messages,
             "stream": stream,
@@ -40,11 +117,25 @@ class OllamaClient:
                 "num_predict": max_tokens
             }
         }
-        logger.info(f"Chat request to Ollama model '{model}' (stream={stream})")
-        try:
-            response = requests.post(f"{OLLAMA_API_URL}/chat", json=data, stream=stream)
-            response.raise_for_status()
-            return response.iter_lines() if stream else response.json()
-        except requests.RequestException as e:
-            logger.error(f"Chat request failed: {e}")
-            return {"error": str(e)}
+
+    @staticmethod
+    def text_from_response(response):
+        return (response.get('message') or {}).get('content', '')
+
+    @staticmethod
+    def response_from_text(text):
+        """A non-streaming chat response carrying text, for replies served from the cache"""
+        return {"message": {"role": "assistant", "content": text}, "done": True, "cached": True}
+
+    @staticmethod
+    def stream_lines_from_text(text):
+        """Stream lines carrying text, for replies served from the cache"""
+        return [json.dumps({"message": {"role": "assistant", "content": text}, "done": True}).encode('utf-8')]
+
+    @staticmethod
+    def parse_stream_line(line):
+        """Return the text carried by one line of a streamed chat response"""
+        chunk = json.loads(line)
+        if 'error' in chunk:
+            raise RuntimeError(chunk['error'])
+        return (chunk.get('message') or {}).get('content', '')
@@ -0,0 +1,313 @@
+# backend/integrations/rate_limiter.py
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from shared.config import config
+from shared.utils import estimate_tokens
+from shared.errors import OperationCancelledError
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('rate_limiter')
+
+# Keys are a provider ("groq": shared by all its models), a provider and
+# model ("groq:llama3-70b-8192") or a provider's per-model default
+# ("groq:*"). rpm/tpm are requests and tokens per minute, concurrency the
+# number of calls in flight. RATE_LIMITS entries override these.
+DEFAULT_LIMITS = {
+    'groq:*': {'rpm': 30, 'tpm': 6000},
+    # Ollama serves a handful of parallel requests per loaded model and queues the rest
+    'ollama:*': {'concurrency': 4},
+}
+
+def request_tokens(messages, max_tokens):
+    """Tokens a chat call may use: the prompt estimate plus the completion budget"""
+    return sum(estimate_tokens(message.get('content')) for message in messages) + (max_tokens or 0)
+
+class TokenBucket:
+    """
+    Refills at per_minute / 60 per second up to capacity. reserve() always
+    succeeds but may drive the level below zero and returns how long the
+    caller has to wait for that debt to be paid off. Since later callers
+    inherit the debt, waiters are served in arrival order and a large
+    request cannot be starved by a stream of small ones.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount):
+        with self.lock:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            self.level -= amount
+            return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount):
+        """Give back (or, when negative, take) tokens once the real usage is known"""
+        with self.lock:
+            self.level = min(self.capacity, self.level + amount)
+
+class ConcurrencyGate:
+    """
+    Semaphore that admits waiters strictly first come, first served, for
+    threads and asyncio tasks alike. A released slot is handed directly to
+    the oldest waiter, so newcomers cannot overtake the queue.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self.waiters = deque()
+        self.lock = threading.Lock()
+
+    def acquire(self, cancel_token=None):
+        """Wait for a slot; raises OperationCancelledError if cancel_token fires first"""
+        with self.lock:
+            if self.active < self.limit and not self.waiters:
+                self.active += 1
+                return
+            event = threading.Event()
+            self.waiters.append(event)
+        if cancel_token is None:
+            event.wait()
+            return
+
+        unregister = cancel_token.register(event.set)
+        try:
+            event.wait()
+        finally:
+            unregister()
+        if not cancel_token.cancelled:
+            return
+        with self.lock:
+            if event in self.waiters:
+                self.waiters.remove(event)
+                raise OperationCancelledError()
+        # The slot was handed over while the caller was being cancelled
+        self.release()
+        raise OperationCancelledError()
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self.active < self.limit and not self.waiters:
+                self.active += 1
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self.waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self.lock:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+                    raise
+            # The slot was handed over while the task was being cancelled
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        with self.lock:
+            if not self.waiters:
+                self.active -= 1
+                return
+            waiter = self.waiters.popleft()
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            loop, future = waiter
+            loop.call_soon_threadsafe(self._hand_over, future)
+
+    def _hand_over(self, future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+class Permit:
+    """
+    Admission of one call. Release it when the call is done (or use it as a
+    context manager); settle() corrects the token reservation once the
+    provider reports actual usage.
+    """
+
+    def __init__(self, gates=(), token_reservations=()):
+        self.gates = list(gates)
+        self.token_reservations = list(token_reservations)
+        self.handed_off = False
+
+    def settle(self, tokens_used):
+        if tokens_used is None:
+            return
+        for bucket, reserved in self.token_reservations:
+            bucket.refund(reserved - tokens_used)
+        self.token_reservations = []
+
+    def release(self):
+        gates, self.gates = self.gates, []
+        for gate in reversed(gates):
+            gate.release()
+
+    def wrap(self, iterator):
+        """Hold the permit until a streamed response has been consumed or closed"""
+        self.handed_off = True
+        return _PermitIterator(iterator, self)
+
+    def wrap_response(self, response):
+        """Hold the permit until a streamed requests.Response has been read to the end or closed"""
+        self.handed_off = True
+        close, iter_content = response.close, response.iter_content
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                self.release()
+
+        response.close = close_and_release
+        # iter_lines() reads through iter_content() as well
+        response.iter_content = lambda *args, **kwargs: _PermitIterator(iter_content(*args, **kwargs), self)
+        weakref.finalize(response, self.release)
+        return response
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self.handed_off:
+            self.release()
+
+class _PermitIterator:
+    def __init__(self, iterator, permit):
+        self.iterator = iterator
+        self.permit = permit
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.iterator)
+        except BaseException:
+            self.permit.release()
+            raise
+
+    def close(self):
+        close = getattr(self.iterator, 'close', None)
+        if close:
+            close()
+        self.permit.release()
+
+    def __del__(self):
+        # A stream that is dropped unread must not keep its slot
+        self.permit.release()
+
+class RateLimiter:
+    """
+    Admission control for outbound model and API calls, per provider and
+    per model: token buckets for requests and tokens per minute, then a
+    FIFO concurrency gate. Callers wait their turn instead of failing, so
+    bursts from many workflows turn into steady throughput rather than
+    429s and server-side queue timeouts.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.buckets = {}
+        self.gates = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, provider, model=None, tokens=0, cancel_token=None):
+        """
+        Block until a call may start; returns its Permit. If cancel_token
+        fires while waiting, the reservations are given back and
+        OperationCancelledError is raised.
+        """
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        wait, gates, reservations, requests = self._reserve(provider, model, tokens)
+        acquired = []
+        try:
+            if wait and cancel_token:
+                if cancel_token.wait(wait):
+                    raise OperationCancelledError()
+            elif wait:
+                time.sleep(wait)
+            for gate in gates:
+                gate.acquire(cancel_token)
+                acquired.append(gate)
+        except OperationCancelledError:
+            Permit(acquired).release()
+            for bucket, amount in reservations + requests:
+                bucket.refund(amount)
+            raise
+        return Permit(gates, reservations)
+
+    async def acquire_async(self, provider, model=None, tokens=0):
+        """acquire() for asyncio callers; waits without blocking the loop"""
+        wait, gates, reservations, requests = self._reserve(provider, model, tokens)
+        acquired = []
+        try:
+            if wait:
+                await asyncio.sleep(wait)
+            for gate in gates:
+                await gate.acquire_async()
+                acquired.append(gate)
+        except asyncio.CancelledError:
+            Permit(acquired).release()
+            for bucket, amount in reservations + requests:
+                bucket.refund(amount)
+            raise
+        return Permit(gates, reservations)
+
+    def _reserve(self, provider, model, tokens):
+        wait = 0.0
+        gates = []
+        reservations = []
+        requests = []
+        for key, limits in self._limits_for(provider, model):
+            if limits.get('rpm'):
+                bucket = self._bucket(key, 'rpm', limits['rpm'])
+                wait = max(wait, bucket.reserve(1))
+                requests.append((bucket, 1))
+            if limits.get('tpm') and tokens:
+                bucket = self._bucket(key, 'tpm', limits['tpm'])
+                wait = max(wait, bucket.reserve(tokens))
+                reservations.append((bucket, tokens))
+            if limits.get('concurrency'):
+                gates.append(self._gate(key, limits['concurrency']))
+        if wait > 1:
+            logger.info(f"Waiting {wait:.1f}s for the {provider} rate limit (model {model})")
+        return wait, gates, reservations, requests
+
+    def _limits_for(self, provider, model):
+        scopes = [(provider, self.limits.get(provider))]
+        if model:
+            key = f"{provider}:{model}"
+            scopes.append((key, self.limits.get(key) or self.limits.get(f"{provider}:*")))
+        return [(key, limits) for key, limits in scopes if limits]
+
+    def _bucket(self, key, kind, per_minute):
+        with self.lock:
+            bucket = self.buckets.get((key, kind))
+            if bucket is None:
+                bucket = self.buckets[(key, kind)] = TokenBucket(per_minute)
+            return bucket
+
+    def _gate(self, key, limit):
+        with self.lock:
+            gate = self.gates.get(key)
+            if gate is None:
+                gate = self.gates[key] = ConcurrencyGate(limit)
+            return gate
+
+rate_limiter = RateLimiter(config.get_config('RATE_LIMITS'))
@@ -0,0 +1,201 @@
+# backend/integrations/resilience.py
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import aiohttp
+import requests
+from shared.config import config
+from shared.errors import CircuitOpenError, OperationCancelledError
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('resilience')
+
+# Worth retrying: the request may succeed later. Everything else in 4xx
+# (bad request, auth, unknown model, ...) fails the same way every time.
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+# Throttling and timeouts of a single request say nothing about the endpoint being down
+BREAKER_IGNORED_STATUSES = {408, 425, 429}
+
+def retry_after_seconds(headers):
+    """Seconds asked for by a Retry-After header (delta-seconds or HTTP date), or None"""
+    value = (headers or {}).get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def classify(error):
+    """
+    (retryable, counts_against_endpoint, retry_after) for an exception
+    raised by requests or aiohttp. Connection failures and timeouts are
+    retryable and count towards opening the endpoint's circuit; HTTP
+    errors are judged by status.
+    """
+    status = None
+    headers = None
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status, headers = error.response.status_code, error.response.headers
+    elif isinstance(error, aiohttp.ClientResponseError):
+        status, headers = error.status, error.headers
+    elif isinstance(error, (requests.ConnectionError, requests.Timeout,
+                            aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)):
+        return True, True, None
+    else:
+        return False, False, None
+    retryable = status in RETRYABLE_STATUSES
+    return retryable, retryable and status not in BREAKER_IGNORED_STATUSES, retry_after_seconds(headers)
+
+class CircuitBreaker:
+    """
+    Stops calls to an endpoint after failure_threshold consecutive
+    failures. While open, calls fail at once with CircuitOpenError; after
+    reset_timeout one trial call is let through (half-open) and its
+    outcome closes the circuit or opens it again.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self.probing:
+                raise CircuitOpenError(
+                    f"Circuit for {self.name} is open after {self.failures} failures",
+                    retry_after=max(remaining, 0.0)
+                )
+            self.probing = True
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit for {self.name} closed")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.probing:
+                    logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+    def record_release(self):
+        """A half-open trial ended without saying anything about the endpoint"""
+        with self.lock:
+            self.probing = False
+
+class RetryPolicy:
+    """
+    Retries retryable failures with capped exponential backoff and full
+    jitter (or the server's Retry-After, when it sent one), behind a
+    circuit breaker per endpoint (scheme://host:port).
+    """
+
+    def __init__(self, max_attempts, base_delay, max_delay, failure_threshold, reset_timeout):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def breaker(self, url):
+        parts = urlsplit(url)
+        endpoint = f"{parts.scheme}://{parts.netloc}"
+        with self.lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                breaker = self.breakers[endpoint] = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def call(self, url, func, cancel_token=None, max_attempts=None):
+        """Run func() until it succeeds, fails fatally or runs out of attempts"""
+        breaker = self.breaker(url)
+        max_attempts = max_attempts or self.max_attempts
+        for attempt in range(1, max_attempts + 1):
+            breaker.before_call()
+            try:
+                result = func()
+            except Exception as e:
+                delay = self._after_failure(breaker, url, e, attempt, max_attempts)
+                if cancel_token is None:
+                    time.sleep(delay)
+                elif cancel_token.wait(delay):
+                    raise OperationCancelledError()
+                continue
+            breaker.record_success()
+            return result
+
+    async def call_async(self, url, func, max_attempts=None):
+        """call() for coroutines; func() must return a new awaitable per attempt"""
+        breaker = self.breaker(url)
+        max_attempts = max_attempts or self.max_attempts
+        for attempt in range(1, max_attempts + 1):
+            breaker.before_call()
+            try:
+                result = await func()
+            except asyncio.CancelledError:
+                breaker.record_release()
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._after_failure(breaker, url, e, attempt, max_attempts))
+                continue
+            breaker.record_success()
+            return result
+
+    def _after_failure(self, breaker, url, error, attempt, max_attempts):
+        """Record a failed attempt and return the delay before the next one; re-raises when done"""
+        retryable, counts, retry_after = classify(error)
+        if counts:
+            breaker.record_failure()
+        else:
+            breaker.record_release()
+        if not retryable or attempt >= max_attempts:
+            raise error
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                logger.warning(f"{url} asked to retry after {retry_after:.0f}s; giving up")
+                raise error
+            delay = retry_after
+        else:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        logger.info(f"Attempt {attempt} at {url} failed ({error}); retrying in {delay:.2f}s")
+        return delay
+
+retry_policy = RetryPolicy(
+    max_attempts=config.get_config('RETRY_MAX_ATTEMPTS', 3),
+    base_delay=config.get_config('RETRY_BASE_DELAY', 0.5),
+    max_delay=config.get_config('RETRY_MAX_DELAY', 20.0),
+    failure_threshold=config.get_config('CIRCUIT_FAILURE_THRESHOLD', 5),
+    reset_timeout=config.get_config('CIRCUIT_RESET_TIMEOUT', 30.0)
+)
@@ -0,0 +1,236 @@
+# backend/integrations/response_cache.py
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import redis
+from shared.config import config
+from shared.errors import OperationCancelledError
+from backend.cache.redis_cache import RedisCache
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('response_cache')
+
+INDEX_KEY = 'llm:responses'
+# After a Redis failure, calls skip the cache this long instead of each paying a timeout
+UNAVAILABLE_BACKOFF = 30.0
+
+class _Flight:
+    """An upstream call that identical requests wait for instead of repeating it"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.text = None
+
+class ResponseCache:
+    """
+    Reply cache for deterministic (temperature 0) chat calls.
+
+    Keyed by a hash of provider, model, messages and generation options,
+    and stored in Redis with a sliding TTL under a byte budget (least
+    recently used replies are evicted first). Identical calls that arrive
+    while one is already running in this process wait for its reply
+    instead of calling the model again, streams included: the leading
+    stream is copied into the cache as it is consumed. Hits are replayed
+    in the provider's own response or stream format. If Redis is
+    unreachable, calls go straight upstream.
+    """
+
+    def __init__(self, store, ttl, max_bytes, max_wait, enabled=True):
+        self.store = store
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_wait = max_wait
+        self.enabled = enabled and store is not None
+        self.flights = {}
+        self.async_flights = {}
+        self.lock = threading.Lock()
+        self.unavailable_until = 0.0
+
+    def applies(self, temperature):
+        return self.enabled and temperature is not None and float(temperature) == 0.0
+
+    @staticmethod
+    def key(provider, model, messages, options):
+        payload = json.dumps([provider, model, messages, options], sort_keys=True, default=str)
+        return f"{INDEX_KEY}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def lookup(self, key):
+        """Cached reply text, or None"""
+        if time.monotonic() < self.unavailable_until:
+            return None
+        try:
+            entry = self.store.get_lru(INDEX_KEY, key, self.ttl)
+        except redis.RedisError as e:
+            self._unavailable(e)
+            return None
+        return entry and entry.get('text')
+
+    def save(self, key, text):
+        if not text or time.monotonic() < self.unavailable_until:
+            return
+        try:
+            evicted = self.store.set_lru(INDEX_KEY, key, {'text': text}, self.ttl, self.max_bytes)
+        except redis.RedisError as e:
+            self._unavailable(e)
+            return
+        if evicted:
+            logger.info(f"Evicted {evicted} cached replies to stay within {self.max_bytes} bytes")
+
+    def _unavailable(self, error):
+        logger.warning(f"Response cache unavailable for {UNAVAILABLE_BACKOFF:.0f}s: {error}")
+        self.unavailable_until = time.monotonic() + UNAVAILABLE_BACKOFF
+
+    # Threads
+
+    def chat(self, client, provider, model, messages, temperature, max_tokens, stream=False, cancel_token=None):
+        """client.chat() through the cache; client._chat() makes the upstream call"""
+        key = self.key(provider, model, messages, {'temperature': temperature, 'max_tokens': max_tokens})
+        text, flight = self._join(key, cancel_token)
+        if text is not None:
+            return client.stream_lines_from_text(text) if stream else client.response_from_text(text)
+
+        try:
+            response = client._chat(model, messages, temperature, max_tokens, stream, cancel_token)
+        except BaseException:
+            self._land(key, flight, None)
+            raise
+        if isinstance(response, dict):
+            self._land(key, flight, None if 'error' in response else client.text_from_response(response))
+            return response
+        return _TeeIterator(response, client, lambda text: self._land(key, flight, text), cancel_token)
+
+    def _join(self, key, cancel_token=None):
+        """
+        (text, None) for a cached reply or one produced by an identical call
+        in flight, else (None, flight) with the caller now leading that call,
+        or (None, None) when the leader failed or took too long.
+        """
+        text = self.lookup(key)
+        if text is not None:
+            return text, None
+        with self.lock:
+            flight = self.flights.get(key)
+            if flight is None:
+                flight = self.flights[key] = _Flight()
+                return None, flight
+
+        deadline = time.monotonic() + self.max_wait
+        while not flight.event.wait(0.25):
+            if cancel_token and cancel_token.cancelled:
+                raise OperationCancelledError()
+            if time.monotonic() > deadline:
+                return None, None
+        return flight.text, None
+
+    def _land(self, key, flight, text):
+        """Hand a finished call's reply (None if it failed) to its waiters and the cache"""
+        if flight is not None:
+            flight.text = text
+            with self.lock:
+                if self.flights.get(key) is flight:
+                    del self.flights[key]
+            flight.event.set()
+        self.save(key, text)
+
+    # asyncio
+
+    async def achat(self, client, provider, model, messages, temperature, max_tokens):
+        """client.achat() through the cache; client._achat() makes the upstream call"""
+        key = self.key(provider, model, messages, {'temperature': temperature, 'max_tokens': max_tokens})
+        text = await asyncio.to_thread(self.lookup, key)
+        if text is not None:
+            return client.response_from_text(text)
+
+        loop = asyncio.get_running_loop()
+        flight = self.async_flights.get((loop, key))
+        if flight is not None:
+            # shield: a cancelled waiter must not cancel the leader's call
+            text = await asyncio.shield(flight)
+            if text is not None:
+                return client.response_from_text(text)
+            return await client._achat(model, messages, temperature, max_tokens)
+
+        flight = self.async_flights[(loop, key)] = loop.create_future()
+        text = None
+        try:
+            response = await client._achat(model, messages, temperature, max_tokens)
+            if 'error' not in response:
+                text = client.text_from_response(response)
+            return response
+        finally:
+            del self.async_flights[(loop, key)]
+            flight.set_result(text)
+            if text is not None:
+                await asyncio.to_thread(self.save, key, text)
+
+    async def astream_chat(self, client, provider, model, messages, temperature, max_tokens):
+        """client.astream_chat() through the cache: replays hits and stores completed streams"""
+        key = self.key(provider, model, messages, {'temperature': temperature, 'max_tokens': max_tokens})
+        text = await asyncio.to_thread(self.lookup, key)
+        if text is not None:
+            for line in client.stream_lines_from_text(text):
+                yield line
+            return
+
+        chunks = []
+        async for line in client._astream_chat(model, messages, temperature, max_tokens):
+            chunks.append(client.parse_stream_line(line))
+            yield line
+        await asyncio.to_thread(self.save, key, "".join(chunks))
+
+class _TeeIterator:
+    """Passes a stream's lines through while collecting its text for the cache"""
+
+    def __init__(self, lines, client, on_done, cancel_token=None):
+        self.lines = lines
+        self.client = client
+        self.on_done = on_done
+        self.cancel_token = cancel_token
+        self.chunks = []
+        self.done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            line = next(self.lines)
+            self.chunks.append(self.client.parse_stream_line(line))
+            return line
+        except StopIteration:
+            # A stream cut short by cancellation also ends normally
+            cancelled = self.cancel_token is not None and self.cancel_token.cancelled
+            self._finish(None if cancelled else "".join(self.chunks))
+            raise
+        except BaseException:
+            self._finish(None)
+            raise
+
+    def close(self):
+        close = getattr(self.lines, 'close', None)
+        if close:
+            close()
+        self._finish(None)
+
+    def __del__(self):
+        # Waiters must not hang on a stream that was dropped unread
+        self._finish(None)
+
+    def _finish(self, text):
+        if not self.done:
+            self.done = True
+            self.on_done(text)
+
+def _build_store():
+    if not config.get_config('LLM_CACHE_ENABLED', True):
+        return None
+    return RedisCache.from_url(config.get_config('REDIS_URL'), timeout=config.get_config('LLM_CACHE_REDIS_TIMEOUT', 1.0))
+
+response_cache = ResponseCache(
+    _build_store(),
+    ttl=config.get_config('LLM_CACHE_TTL', 86400),
+    max_bytes=config.get_config('LLM_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+    max_wait=config.get_config('HTTP_READ_TIMEOUT', 300.0)
+)
@@ -0,0 +1,42 @@
+# backend/integrations/stream_utils.py
+import socket
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('stream_utils')
+
+def iter_response_lines(response, cancel_token=None):
+    """
+    Yield the non-empty lines of a streaming HTTP response.
+
+    Lines are handed over as soon as they arrive rather than in 512-byte
+    reads. With a cancel token the connection is shut down as soon as the
+    token fires, which unblocks a pending socket read instead of waiting
+    for the next chunk, and iteration simply stops.
+    """
+    unregister = cancel_token.register(lambda: abort_response(response)) if cancel_token else None
+    try:
+        for line in response.iter_lines(chunk_size=None):
+            if cancel_token and cancel_token.cancelled:
+                break
+            if line:
+                yield line
+    except Exception as e:
+        # Reads on a socket closed by cancel() fail in transport-specific ways
+        if not (cancel_token and cancel_token.cancelled):
+            raise
+        logger.info(f"Stream from {response.url} aborted by cancellation: {type(e).__name__}")
+    finally:
+        if unregister:
+            unregister()
+        response.close()
+
+def abort_response(response):
+    """Shut down the socket under a streaming response, waking any thread blocked reading it"""
+    connection = getattr(response.raw, '_connection', None)
+    sock = getattr(connection, 'sock', None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    response.close()
@@ -8,7 +8,7 @@ class Context(Base):
     __tablename__ = 'contexts'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    conversation_id = Column(UUID(as_uuid=True), ForeignKey('conversations.id'))
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey('conversations.id', ondelete='CASCADE'), index=True)
     source_type = Column(String, nullable=False)
     source_id = Column(UUID(as_uuid=True), nullable=True)
     context_metadata = Column(JSON, default={})
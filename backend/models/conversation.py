@@ -9,10 +9,10 @@ class Conversation(Base):
     __tablename__ = 'conversations'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    node_id = Column(UUID(as_uuid=True), ForeignKey('nodes.id'))
+    node_id = Column(UUID(as_uuid=True), ForeignKey('nodes.id', ondelete='CASCADE'), index=True)
     title = Column(String, nullable=True)
     conversation_metadata = Column(JSON, default={})
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    messages = relationship('Message', back_populates='conversation', cascade='all, delete-orphan')
+    messages = relationship('Message', back_populates='conversation', cascade='all, delete-orphan', passive_deletes=True)
@@ -10,9 +10,9 @@ class Edge(Base):
     __tablename__ = 'edges'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    graph_id = Column(UUID(as_uuid=True), ForeignKey('graphs.id'))  # <- explicitly added
-    source_id = Column(UUID(as_uuid=True), ForeignKey('nodes.id'))
-    target_id = Column(UUID(as_uuid=True), ForeignKey('nodes.id'))
+    graph_id = Column(UUID(as_uuid=True), ForeignKey('graphs.id', ondelete='CASCADE'), index=True)  # <- explicitly added
+    source_id = Column(UUID(as_uuid=True), ForeignKey('nodes.id', ondelete='CASCADE'), index=True)
+    target_id = Column(UUID(as_uuid=True), ForeignKey('nodes.id', ondelete='CASCADE'), index=True)
     edge_type = Column(String, nullable=False)
     edge_metadata = Column(JSON, default={})
     created_at = Column(DateTime, default=datetime.utcnow)
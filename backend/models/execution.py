@@ -3,6 +3,7 @@ from sqlalchemy import Column, String, DateTime, JSON, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from backend.db.sqlalchemy_manager import Base
+from backend.models.graph_snapshot import GraphSnapshot  # registers the table snapshot_id refers to
 import uuid
 from datetime import datetime
 
@@ -10,7 +11,9 @@ class Execution(Base):
     __tablename__ = 'executions'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # UUID type
-    graph_id = Column(UUID(as_uuid=True), ForeignKey('graphs.id'))         # clearly defined as UUID
+    graph_id = Column(UUID(as_uuid=True), ForeignKey('graphs.id', ondelete='CASCADE'), index=True)         # clearly defined as UUID
+    # The graph state the run was planned from
+    snapshot_id = Column(UUID(as_uuid=True), ForeignKey('graph_snapshots.id', ondelete='SET NULL'), nullable=True)
     status = Column(String)
     execution_metadata = Column(JSON, default={})
     started_at = Column(DateTime, default=datetime.utcnow)
@@ -19,4 +22,4 @@ class Execution(Base):
     # Relationship back to Graph (recommended for consistency)
     graph = relationship('Graph', back_populates='executions')  # clearly define relation here
     # executions.py
-    execution_results = relationship('ExecutionResult', back_populates='execution', cascade='all, delete-orphan')
+    execution_results = relationship('ExecutionResult', back_populates='execution', cascade='all, delete-orphan', passive_deletes=True)
@@ -1,5 +1,5 @@
 # backend/models/execution_result.py
-from sqlalchemy import Column, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from backend.db.sqlalchemy_manager import Base
@@ -10,12 +10,16 @@ class ExecutionResult(Base):
     __tablename__ = 'execution_results'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    execution_id = Column(UUID(as_uuid=True), ForeignKey('executions.id'))  # <- fixed datatype here
-    node_id = Column(UUID(as_uuid=True), ForeignKey('nodes.id'))
+    execution_id = Column(UUID(as_uuid=True), ForeignKey('executions.id', ondelete='CASCADE'), index=True)  # <- fixed datatype here
+    node_id = Column(UUID(as_uuid=True), ForeignKey('nodes.id', ondelete='SET NULL'), index=True)
     result = Column(JSON, default={})
-    error = Column(JSON)
+    # Store a missing error as SQL NULL, not JSON 'null', so `error IS NULL` finds successes
+    error = Column(JSON(none_as_null=True))
     execution_time_ms = Column(JSON, default={})
     started_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime)
+    # Content address of the node's inputs, so unchanged nodes can reuse this result
+    cache_key = Column(String(64), index=True)
+    output_hash = Column(String(64))
 
     execution = relationship('Execution', back_populates='execution_results')
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, DateTime, JSON
+from sqlalchemy import Column, String, DateTime, JSON, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from backend.db.sqlalchemy_manager import Base
+from backend.db.fulltext import search_index
 import uuid
 from datetime import datetime
 
@@ -15,9 +16,15 @@ class Graph(Base):
     graph_metadata = Column(JSON, default={})
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped on every change to the graph or its content; serves as ETag and cache version
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+
+    __table_args__ = (
+        search_index('ix_graphs_search', name, description),
+    )
 
     # backend/models/graph.py (already fixed earlier, but verify again)
-    edges = relationship('Edge', back_populates='graph', cascade='all, delete-orphan')
-    nodes = relationship('Node', back_populates='graph', cascade='all, delete-orphan')
-    executions = relationship('Execution', back_populates='graph', cascade='all, delete-orphan')  # explicitly added
+    edges = relationship('Edge', back_populates='graph', cascade='all, delete-orphan', passive_deletes=True)
+    nodes = relationship('Node', back_populates='graph', cascade='all, delete-orphan', passive_deletes=True)
+    executions = relationship('Execution', back_populates='graph', cascade='all, delete-orphan', passive_deletes=True)  # explicitly added
 
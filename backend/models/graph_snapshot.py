@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from backend.db.sqlalchemy_manager import Base
+import uuid
+from datetime import datetime
+
+class GraphSnapshot(Base):
+    __tablename__ = 'graph_snapshots'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    graph_id = Column(UUID(as_uuid=True), ForeignKey('graphs.id', ondelete='CASCADE'), nullable=False)
+    # Position in the graph's history, 1-based and gapless
+    number = Column(Integer, nullable=False)
+    # Graph.version the state was captured at
+    graph_version = Column(Integer, nullable=False)
+    # 'checkpoint' rows hold the full state, 'diff' rows the changes since the previous snapshot
+    kind = Column(String, nullable=False)
+    data = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('graph_id', 'number', name='uq_graph_snapshots_graph_number'),
+    )
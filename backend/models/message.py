@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from backend.db.sqlalchemy_manager import Base
+from backend.db.fulltext import search_index
 import uuid
 from datetime import datetime
 
@@ -9,10 +10,16 @@ class Message(Base):
     __tablename__ = 'messages'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    conversation_id = Column(UUID(as_uuid=True), ForeignKey('conversations.id'))
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey('conversations.id', ondelete='CASCADE'))
     role = Column(String, nullable=False)
     content = Column(String, nullable=False)
     message_metadata = Column(JSON, default={})
     created_at = Column(DateTime, default=datetime.utcnow)
 
     conversation = relationship('Conversation', back_populates='messages')
+
+    __table_args__ = (
+        # Serves keyset pagination of a conversation's history on (created_at, id)
+        Index('ix_messages_conversation_created', 'conversation_id', 'created_at', 'id'),
+        search_index('ix_messages_search', content),
+    )
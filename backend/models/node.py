@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Float, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, String, Float, ForeignKey, DateTime, JSON, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from backend.db.sqlalchemy_manager import Base
+from backend.db.fulltext import search_index
 import uuid
 from datetime import datetime
 
@@ -9,7 +10,7 @@ class Node(Base):
     __tablename__ = 'nodes'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    graph_id = Column(UUID(as_uuid=True), ForeignKey('graphs.id'))
+    graph_id = Column(UUID(as_uuid=True), ForeignKey('graphs.id', ondelete='CASCADE'), index=True)
     name = Column(String, nullable=False)
     node_type = Column(String, nullable=False)
     position_x = Column(Float, default=0.0)
@@ -18,5 +19,11 @@ class Node(Base):
     node_metadata = Column(JSON, default={})
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped on content edits (not on layout moves) for optimistic concurrency
+    version = Column(Integer, nullable=False, default=1, server_default='1')
 
     graph = relationship('Graph', back_populates='nodes')
+
+    __table_args__ = (
+        search_index('ix_nodes_search', name, properties),
+    )
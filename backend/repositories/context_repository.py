@@ -0,0 +1,30 @@
+from backend.db.sqlalchemy_manager import session_scope
+from backend.db.model_mappers import map_to_domain, map_to_db, select_columns, map_rows
+from backend.models.context import Context
+
+class ContextRepository:
+    def find_by_conversation_id(self, conversation_id):
+        with session_scope() as session:
+            result = session.execute(
+                select_columns(Context)
+                .where(Context.conversation_id == conversation_id)
+                .order_by(Context.created_at)
+            )
+            return map_rows(result)
+
+    def create(self, context_data):
+        with session_scope() as session:
+            db_context = map_to_db(Context, context_data)
+            session.add(db_context)
+            session.commit()
+            session.refresh(db_context)
+            return map_to_domain(db_context)
+
+    def delete(self, context_id):
+        with session_scope() as session:
+            context = session.get(Context, context_id)
+            if not context:
+                return False
+            session.delete(context)
+            session.commit()
+            return True
@@ -1,21 +1,43 @@
-from backend.db.sqlalchemy_manager import get_session
-from backend.db.model_mappers import map_to_domain, map_to_db
+import uuid
+from datetime import datetime
+from sqlalchemy import insert
+from shared.config import config
+from backend.db.sqlalchemy_manager import session_scope
+from backend.db.model_mappers import map_to_domain, map_to_db, select_columns, map_rows
+from backend.db.pagination import keyset_page
+from backend.db.cascade_deletes import delete_conversations
+from backend.cache.known_ids import known_conversations
 from backend.models.conversation import Conversation
 from backend.models.message import Message
+from backend.infrastructure.write_buffer import WriteBuffer
+
+def insert_messages(rows):
+    with session_scope() as session:
+        session.execute(insert(Message), rows)
+        session.commit()
+
+# Messages are written in batches; every read of a conversation's messages
+# flushes that conversation first so callers always see their own writes
+message_write_buffer = WriteBuffer(
+    insert_messages,
+    max_size=config.get_config('MESSAGE_BUFFER_MAX_SIZE', 200),
+    max_delay=config.get_config('MESSAGE_BUFFER_MAX_DELAY_MS', 50) / 1000,
+    name='message-writer'
+)
 
 class ConversationRepository:
     def find_by_node_id(self, node_id):
-        with get_session() as session:
-            conversations = session.query(Conversation).filter(Conversation.node_id == node_id).all()
-            return [map_to_domain(conv) for conv in conversations]
+        with session_scope() as session:
+            result = session.execute(select_columns(Conversation).where(Conversation.node_id == node_id))
+            return map_rows(result)
 
     def find_by_id(self, conversation_id):
-        with get_session() as session:
+        with session_scope() as session:
             conversation = session.get(Conversation, conversation_id)
             return map_to_domain(conversation) if conversation else None
 
     def create(self, conversation_data):
-        with get_session() as session:
+        with session_scope() as session:
             db_conversation = map_to_db(Conversation, conversation_data)
             session.add(db_conversation)
             session.commit()
@@ -23,49 +45,102 @@ class ConversationRepository:
             return map_to_domain(db_conversation)
 
     def find_messages(self, conversation_id):
-        with get_session() as session:
-            messages = session.query(Message).filter(Message.conversation_id == conversation_id).all()
-            return [map_to_domain(msg) for msg in messages]
+        message_write_buffer.flush(conversation_id)
+        with session_scope() as session:
+            result = session.execute(
+                select_columns(Message)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at, Message.id)
+            )
+            return map_rows(result)
+
+    def find_messages_after(self, conversation_id, after=None):
+        """Messages newer than a cursor (all of them without one), oldest first"""
+        message_write_buffer.flush(conversation_id)
+        with session_scope() as session:
+            query = keyset_page(
+                select_columns(Message).where(Message.conversation_id == conversation_id),
+                Message.created_at, Message.id, after=after
+            )
+            messages = map_rows(session.execute(query))
+        if not after:
+            messages.reverse()
+        return messages
+
+    def find_messages_page(self, conversation_id, limit, before=None, after=None):
+        """
+        One page of a conversation's messages in chronological order, plus
+        whether more exist beyond it in the direction paged (older for
+        before and the latest page, newer for after).
+        """
+        message_write_buffer.flush(conversation_id)
+        with session_scope() as session:
+            query = keyset_page(
+                select_columns(Message).where(Message.conversation_id == conversation_id),
+                Message.created_at, Message.id, limit, before=before, after=after
+            )
+            messages = map_rows(session.execute(query))
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if not after:
+            messages.reverse()
+        return messages, has_more
 
-    def add_message(self, message_data):
-        with get_session() as session:
-            db_message = map_to_db(Message, message_data)
-            session.add(db_message)
+    def update_metadata(self, conversation_id, updates):
+        """Merge keys into a conversation's metadata"""
+        with session_scope() as session:
+            conversation = session.get(Conversation, conversation_id)
+            if not conversation:
+                return None
+            # Reassign so the JSON column is flagged as modified
+            conversation.conversation_metadata = {**(conversation.conversation_metadata or {}), **updates}
             session.commit()
-            session.refresh(db_message)
-            return map_to_domain(db_message)
+            return map_to_domain(conversation)
+
+    def exists(self, conversation_id):
+        """Whether the conversation exists; positive answers are cached briefly"""
+        if conversation_id in known_conversations:
+            return True
+        with session_scope() as session:
+            found = session.query(Conversation.id).filter(Conversation.id == conversation_id).first() is not None
+        if found:
+            known_conversations.add(conversation_id)
+        return found
+
+    def add_message(self, message_data, buffered=True):
+        """
+        Record a message. By default it is queued for the next batch insert
+        and returned straight away with its ID and timestamp filled in;
+        returns None without queueing if the conversation does not exist.
+        """
+        message = {
+            "id": message_data.get("id") or str(uuid.uuid4()),
+            "conversation_id": message_data["conversation_id"],
+            "role": message_data["role"],
+            "content": message_data["content"],
+            "message_metadata": message_data.get("message_metadata") or {},
+            "created_at": message_data.get("created_at") or datetime.now()
+        }
+        if not buffered:
+            insert_messages([message])
+            return message
+        if not self.exists(message["conversation_id"]):
+            return None
+        return message_write_buffer.add(message["conversation_id"], message)
         
     def delete_by_node_id(self, node_id):
         """Delete all conversations for a node"""
-        session = get_session()
-        try:
-            conversations = session.query(Conversation).filter(Conversation.node_id == node_id).all()
-            for conversation in conversations:
-                # Delete all messages for this conversation first
-                session.query(Message).filter(Message.conversation_id == conversation.id).delete()
-                # Then delete the conversation
-                session.delete(conversation)
+        message_write_buffer.flush()
+        with session_scope() as session:
+            delete_conversations(session, Conversation.node_id == node_id)
             session.commit()
             return True
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
             
     # backend/repositories/conversation_repository.py - Add this method
     def delete(self, conversation_id):
         """Delete a conversation and its messages"""
-        with get_session() as session:
-            # Check if conversation exists
-            conversation = session.get(Conversation, conversation_id)
-            if not conversation:
-                return False
-                
-            # Delete all messages for this conversation
-            session.query(Message).filter(Message.conversation_id == conversation_id).delete()
-            
-            # Delete the conversation
-            session.delete(conversation)
+        message_write_buffer.flush(conversation_id)
+        with session_scope() as session:
+            deleted = delete_conversations(session, Conversation.id == conversation_id)
             session.commit()
-            return True
+            return deleted > 0
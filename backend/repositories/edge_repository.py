@@ -1,24 +1,56 @@
-from backend.db.sqlalchemy_manager import get_session
-from backend.db.model_mappers import map_to_domain, map_to_db
+from backend.db.sqlalchemy_manager import session_scope
+from backend.db.model_mappers import map_to_domain, map_to_db, select_columns, map_rows
+from backend.db.bulk_operations import bulk_insert, bulk_update, bulk_delete
 from backend.models.edge import Edge
 
 class EdgeRepository:
     def find_by_graph_id(self, graph_id):
-        with get_session() as session:
-            edges = session.query(Edge).filter(Edge.graph_id == graph_id).all()
-            return [map_to_domain(edge) for edge in edges]
+        with session_scope() as session:
+            result = session.execute(select_columns(Edge).where(Edge.graph_id == graph_id))
+            return map_rows(result)
+
+    def find_by_id(self, edge_id):
+        with session_scope() as session:
+            edge = session.get(Edge, edge_id)
+            return map_to_domain(edge)
+
+    def find_endpoints_by_graph_id(self, graph_id):
+        """
+        (id, source_id, target_id) tuples in creation order, without loading
+        full rows. Ties on created_at are broken by id so the order (and with
+        it the upstream order in execution cache keys) is the same every time.
+        """
+        with session_scope() as session:
+            rows = session.query(Edge.id, Edge.source_id, Edge.target_id).filter(
+                Edge.graph_id == graph_id
+            ).order_by(Edge.created_at, Edge.id).all()
+            return [tuple(row) for row in rows]
 
     def create(self, edge_data):
-        with get_session() as session:
-            db_edge = map_to_db(edge_data)
+        with session_scope() as session:
+            db_edge = map_to_db(Edge, edge_data)
             session.add(db_edge)
             session.commit()
             session.refresh(db_edge)
             return map_to_domain(db_edge)
 
     def delete(self, edge_id):
-        with get_session() as session:
-            edge = session.query(Edge).get(edge_id)
+        with session_scope() as session:
+            edge = session.get(Edge, edge_id)
+            if not edge:
+                return False
             session.delete(edge)
             session.commit()
             return True
+
+    def bulk_create(self, session, edges_data):
+        """Insert many edges inside the caller's transaction"""
+        return bulk_insert(session, Edge, edges_data)
+
+    def bulk_update(self, session, updates):
+        """Update many edges by ID inside the caller's transaction"""
+        return bulk_update(session, Edge, updates)
+
+    def bulk_delete(self, session, edge_ids):
+        """Delete many edges inside the caller's transaction"""
+        return bulk_delete(session, Edge, edge_ids)
@@ -1,9 +1,10 @@
 # backend/repositories/execution_repository.py
+from sqlalchemy import or_, cast, Text
 from sqlalchemy.orm import joinedload
 from backend.db.sqlalchemy_manager import SQLAlchemyManager
 from backend.models.execution import Execution
 from backend.models.execution_result import ExecutionResult
-from backend.db.model_mappers import map_to_domain, map_collection
+from backend.db.model_mappers import map_to_domain, select_columns, map_rows
 from datetime import datetime
 import uuid
 
@@ -13,11 +14,11 @@ class ExecutionRepository:
     
     def create(self, execution_data):
         """Create a new execution record"""
-        session = self.db_manager.get_session()
-        try:
+        with self.db_manager.session_scope() as session:
             execution = Execution(
                 id=execution_data["id"],
                 graph_id=execution_data["graph_id"],
+                snapshot_id=execution_data.get("snapshot_id"),
                 status=execution_data["status"],
                 execution_metadata=execution_data["execution_metadata"],
                 started_at=execution_data["started_at"],
@@ -26,80 +27,96 @@ class ExecutionRepository:
             session.add(execution)
             session.commit()
             return map_to_domain(execution)
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
     def find_by_id(self, execution_id):
         """Find an execution by ID"""
-        session = self.db_manager.get_session()
-        try:
+        with self.db_manager.session_scope() as session:
             execution = session.query(Execution).get(execution_id)
             return map_to_domain(execution) if execution else None
-        finally:
-            session.close()
     
     def find_by_graph_id(self, graph_id):
         """Find all executions for a graph"""
-        session = self.db_manager.get_session()
-        try:
-            executions = session.query(Execution).filter(Execution.graph_id == graph_id).all()
-            return map_collection(executions)
-        finally:
-            session.close()
+        with self.db_manager.session_scope() as session:
+            result = session.execute(select_columns(Execution).where(Execution.graph_id == graph_id))
+            return map_rows(result)
     
-    def update_status(self, execution_id, status):
-        """Update the status of an execution"""
-        session = self.db_manager.get_session()
-        try:
-            execution = session.query(Execution).get(execution_id)
+    def update_status(self, execution_id, status, error=None, expected_status=None):
+        """
+        Update the status of an execution. With expected_status, only an
+        execution still in that status is updated; the row is locked while
+        checking, so a status written meanwhile by another process is kept.
+        """
+        with self.db_manager.session_scope() as session:
+            query = session.query(Execution).filter(Execution.id == execution_id)
+            if expected_status is not None:
+                query = query.filter(Execution.status == expected_status).with_for_update()
+            execution = query.first()
             if not execution:
                 return False
             
             execution.status = status
             if status in ["COMPLETED", "FAILED", "STOPPED"]:
                 execution.completed_at = datetime.now()
+            if error is not None:
+                # Reassign so the JSON column is flagged as modified
+                execution.execution_metadata = {**(execution.execution_metadata or {}), "error": error}
                 
             session.commit()
             return True
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
-    def add_result(self, execution_id, node_id, result):
+    def set_snapshot(self, execution_id, snapshot_id):
+        """Record the graph snapshot an execution runs against"""
+        with self.db_manager.session_scope() as session:
+            updated = session.query(Execution).filter(Execution.id == execution_id).update(
+                {Execution.snapshot_id: snapshot_id}, synchronize_session=False
+            )
+            session.commit()
+            return updated > 0
+    
+    def add_result(self, execution_id, node_id, result, error=None, started_at=None, completed_at=None,
+                   cache_key=None, output_hash=None):
         """Add a result for a node execution"""
-        session = self.db_manager.get_session()
-        try:
+        with self.db_manager.session_scope() as session:
+            completed_at = completed_at or datetime.now()
+            started_at = started_at or completed_at
             execution_result = ExecutionResult(
-                id=str(uuid.uuid4()),
+                id=uuid.uuid4(),
                 execution_id=execution_id,
                 node_id=node_id,
                 result=result,
-                error=None,
-                started_at=datetime.now(),
-                completed_at=datetime.now(),
-                execution_time_ms=0  # Calculate this in a real implementation
+                error=error,
+                started_at=started_at,
+                completed_at=completed_at,
+                execution_time_ms=int((completed_at - started_at).total_seconds() * 1000),
+                cache_key=cache_key,
+                output_hash=output_hash
             )
             session.add(execution_result)
             session.commit()
             return map_to_domain(execution_result)
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
     def get_results(self, execution_id):
         """Get all results for an execution"""
-        session = self.db_manager.get_session()
-        try:
-            results = session.query(ExecutionResult).filter(
+        with self.db_manager.session_scope() as session:
+            result = session.execute(select_columns(ExecutionResult).where(
                 ExecutionResult.execution_id == execution_id
-            ).all()
-            return map_collection(results)
-        finally:
-            session.close()
\ No newline at end of file
+            ))
+            return map_rows(result)
+    
+    def find_latest_result(self, node_id):
+        """The most recent successful result recorded for a node"""
+        with self.db_manager.session_scope() as session:
+            result = session.query(ExecutionResult).filter(
+                ExecutionResult.node_id == node_id,
+                # Rows written before error stored NULL hold a JSON 'null'
+                or_(ExecutionResult.error.is_(None), cast(ExecutionResult.error, Text) == 'null')
+            ).order_by(ExecutionResult.completed_at.desc()).first()
+            return map_to_domain(result)
+    
+    def find_cached_result(self, cache_key):
+        """Find the most recent successful result recorded under a cache key"""
+        with self.db_manager.session_scope() as session:
+            result = session.query(ExecutionResult).filter(
+                ExecutionResult.cache_key == cache_key
+            ).order_by(ExecutionResult.completed_at.desc()).first()
+            return map_to_domain(result)
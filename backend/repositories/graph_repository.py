@@ -1,92 +1,156 @@
 # backend/repositories/graph_repository.py
 from datetime import datetime
-from sqlalchemy.orm import joinedload
-from backend.db.sqlalchemy_manager import get_session
-from backend.db.model_mappers import map_to_domain, map_to_db, map_collection
+from sqlalchemy import select, func, tuple_, update
+from sqlalchemy.orm import selectinload
+from backend.db.sqlalchemy_manager import session_scope
+from backend.db.cascade_deletes import delete_graph
+from backend.db.pagination import encode_cursor, cursor_position
+from backend.db.versioning import versioned_update
+from backend.db.model_mappers import map_to_domain, map_to_db, select_columns, map_rows, map_collection
 from backend.models.graph import Graph
+from backend.models.node import Node
+from backend.repositories.conversation_repository import message_write_buffer
+from backend.repositories.node_repository import position_write_buffer
 
 class GraphRepository:
     def find_all(self, filters=None):
         """Find all graphs, optionally with filters"""
-        session = get_session()
-        try:
-            query = session.query(Graph)
+        with session_scope() as session:
+            query = select_columns(Graph)
             if filters:
                 # Apply filters if provided
                 if 'name' in filters:
-                    query = query.filter(Graph.name.ilike(f"%{filters['name']}%"))
+                    query = query.where(Graph.name.ilike(f"%{filters['name']}%"))
             
-            graphs = query.all()
-            return map_collection(graphs)
-        finally:
-            session.close()
+            return map_rows(session.execute(query))
     
-    def find_by_id(self, graph_id, load_relationships=False):
-        """Find a graph by ID"""
-        session = get_session()
-        try:
-            if load_relationships:
-                graph = session.query(Graph).options(
-                    joinedload(Graph.nodes),
-                    joinedload(Graph.edges)
-                ).get(graph_id)
+    SORT_COLUMNS = {
+        'updated_at': Graph.updated_at,
+        'created_at': Graph.created_at,
+        'name': Graph.name
+    }
+
+    def find_summaries(self, limit, cursor=None, sort='updated_at', descending=True,
+                       name=None, include_layout=False):
+        """
+        One page of graph summaries (id, name, description, timestamps,
+        version and node count) ordered by sort then id, plus the cursor of the next
+        page or None. The layout and metadata JSON are only selected with
+        include_layout. Node counts come from a correlated count per
+        returned graph, served by the nodes.graph_id index.
+        """
+        sort_column = self.SORT_COLUMNS[sort]
+        node_count = select(func.count(Node.id)).where(Node.graph_id == Graph.id).scalar_subquery()
+        columns = [Graph.id, Graph.name, Graph.description, Graph.created_at, Graph.updated_at,
+                   Graph.version, node_count.label('node_count')]
+        if include_layout:
+            columns += [Graph.layout_data, Graph.graph_metadata]
+
+        query = select(*columns)
+        if name:
+            query = query.where(Graph.name.ilike(f"%{name}%"))
+        if cursor:
+            position = tuple_(sort_column, Graph.id)
+            after = cursor_position(cursor, sort_column, Graph.id)
+            query = query.where(position < after if descending else position > after)
+        if descending:
+            query = query.order_by(sort_column.desc(), Graph.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Graph.id.asc())
+
+        with session_scope() as session:
+            graphs = map_rows(session.execute(query.limit(limit + 1)))
+        next_cursor = None
+        if len(graphs) > limit:
+            graphs = graphs[:limit]
+            last = graphs[-1]
+            next_cursor = encode_cursor(last[sort], last['id'])
+        return graphs, next_cursor
+    
+    def find_by_id(self, graph_id, load_relationships=False, as_dict=True):
+        """Find a graph by ID
+
+        With load_relationships=True the dict also carries the graph's
+        nodes and edges. With as_dict=False the detached ORM instance is
+        returned with its nodes and edges already loaded, for callers that
+        walk relationships.
+        """
+        if load_relationships or not as_dict:
+            position_write_buffer.flush(graph_id)
+        with session_scope() as session:
+            if load_relationships or not as_dict:
+                # selectinload issues one IN query per collection instead of
+                # joining both, which would multiply nodes by edges
+                graph = session.get(Graph, graph_id, options=[
+                    selectinload(Graph.nodes),
+                    selectinload(Graph.edges)
+                ])
             else:
                 graph = session.get(Graph, graph_id)
             
+            if not as_dict:
+                return graph
+            if load_relationships and graph is not None:
+                return self._hydrate(graph)
             return map_to_domain(graph)
-        finally:
-            session.close()
+    
+    def _hydrate(self, graph):
+        """Serialize a graph with its nodes and edges, dropping the repeated graph_id"""
+        payload = map_to_domain(graph)
+        payload['nodes'] = map_collection(graph.nodes)
+        payload['edges'] = map_collection(graph.edges)
+        for child in payload['nodes'] + payload['edges']:
+            child.pop('graph_id', None)
+        return payload
+    
+    def get_version(self, graph_id):
+        """The graph's version counter, or None if it does not exist"""
+        with session_scope() as session:
+            return session.query(Graph.version).filter(Graph.id == graph_id).scalar()
+    
+    def touch(self, graph_id):
+        """Bump version and updated_at after a change to the graph's content; returns the new version"""
+        with session_scope() as session:
+            version = self.bump_version(session, graph_id)
+            session.commit()
+            return version
+
+    def bump_version(self, session, graph_id, expected_version=None):
+        """
+        Bump the graph's version in the caller's transaction and return it
+        (None if the graph is gone). With expected_version, raises
+        ConflictError instead when the graph has been changed meanwhile.
+        """
+        if expected_version is not None:
+            graph = versioned_update(session, Graph, graph_id, {'updated_at': datetime.now()}, expected_version)
+            return graph and graph['version']
+        return session.execute(
+            update(Graph).where(Graph.id == graph_id)
+            .values(version=Graph.version + 1, updated_at=datetime.now())
+            .returning(Graph.version),
+            execution_options={'synchronize_session': False}
+        ).scalar()
     
     def create(self, graph_data):
         """Create a new graph"""
-        session = get_session()
-        try:
+        with session_scope() as session:
             db_graph = map_to_db(Graph, graph_data)
             session.add(db_graph)
             session.commit()
             session.refresh(db_graph)
             return map_to_domain(db_graph)
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
-    def update(self, graph_id, updates):
-        """Update a graph"""
-        session = get_session()
-        try:
-            graph = session.get(Graph, graph_id)
-            if not graph:
-                return None
-            
-            for key, value in updates.items():
-                if hasattr(graph, key):
-                    setattr(graph, key, value)
-            
-            graph.updated_at = datetime.now()
+    def update(self, graph_id, updates, expected_version=None):
+        """Update a graph, only if still at expected_version when given (ConflictError otherwise)"""
+        with session_scope() as session:
+            graph = versioned_update(session, Graph, graph_id, {**updates, 'updated_at': datetime.now()}, expected_version)
             session.commit()
-            session.refresh(graph)
-            return map_to_domain(graph)
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+            return graph
     
     def delete(self, graph_id):
-        """Delete a graph"""
-        session = get_session()
-        try:
-            graph = session.get(Graph, graph_id)
-            if not graph:
-                return False
-            
-            session.delete(graph)
+        """Delete a graph with everything in it, one set-based DELETE per table"""
+        message_write_buffer.flush()
+        with session_scope() as session:
+            deleted = delete_graph(session, graph_id)
             session.commit()
-            return True
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
\ No newline at end of file
+            return deleted > 0
@@ -1,68 +1,121 @@
 # backend/repositories/node_repository.py
 from datetime import datetime
-from backend.db.sqlalchemy_manager import get_session
-from backend.db.model_mappers import map_to_domain, map_to_db
+from itertools import groupby
+from operator import itemgetter
+from sqlalchemy import update, values, column, Float
+from sqlalchemy.dialects.postgresql import UUID
+from shared.config import config
+from backend.db.sqlalchemy_manager import session_scope
+from backend.db.model_mappers import map_to_domain, map_to_db, select_columns, map_rows
+from backend.db.bulk_operations import bulk_insert, bulk_update
+from backend.db.cascade_deletes import delete_nodes
+from backend.db.versioning import versioned_update
 from backend.models.node import Node
-from backend.models.conversation import Conversation
-from backend.models.message import Message
+from backend.repositories.conversation_repository import message_write_buffer
+from backend.infrastructure.write_buffer import WriteBuffer
+
+def update_positions(graph_id, positions):
+    """
+    Move many nodes of one graph with a single UPDATE ... FROM (VALUES ...).
+    positions is a list of (node_id, x, y); returns the number of nodes moved.
+    """
+    if not positions:
+        return 0
+    moves = values(
+        column('id', UUID(as_uuid=True)), column('x', Float), column('y', Float),
+        name='moves'
+    ).data([(str(node_id), float(x), float(y)) for node_id, x, y in positions])
+    with session_scope() as session:
+        result = session.execute(
+            update(Node)
+            .where(Node.id == moves.c.id, Node.graph_id == graph_id)
+            .values(position_x=moves.c.x, position_y=moves.c.y, updated_at=datetime.now()),
+            execution_options={'synchronize_session': False}
+        )
+        session.commit()
+        return result.rowcount
+
+def write_positions(rows):
+    rows = sorted(rows, key=itemgetter('graph_id'))
+    for graph_id, moves in groupby(rows, key=itemgetter('graph_id')):
+        update_positions(graph_id, [(move['node_id'], move['x'], move['y']) for move in moves])
+
+# Canvas drags send positions many times a second; only the latest position
+# of each node within the window is written
+position_write_buffer = WriteBuffer(
+    write_positions,
+    max_size=config.get_config('POSITION_BUFFER_MAX_SIZE', 1000),
+    max_delay=config.get_config('POSITION_BUFFER_MAX_DELAY_MS', 100) / 1000,
+    name='position-writer',
+    unique_by='node_id'
+)
 
 class NodeRepository:
     def find_by_graph_id(self, graph_id):
         """Find all nodes for a graph"""
-        with get_session() as session:
-            nodes = session.query(Node).filter(Node.graph_id == graph_id).all()
-            return [map_to_domain(node) for node in nodes]
+        position_write_buffer.flush(graph_id)
+        with session_scope() as session:
+            result = session.execute(select_columns(Node).where(Node.graph_id == graph_id))
+            return map_rows(result)
+    
+    def find_ids_by_graph_id(self, graph_id):
+        """IDs of all nodes in a graph, without loading full rows"""
+        with session_scope() as session:
+            return [row.id for row in session.query(Node.id).filter(Node.graph_id == graph_id).all()]
     
     def find_by_id(self, node_id):
         """Find a node by ID"""
-        with get_session() as session:
+        position_write_buffer.flush()
+        with session_scope() as session:
             node = session.get(Node, node_id)
             return map_to_domain(node)
     
     def create(self, node_data):
         """Create a new node"""
-        with get_session() as session:
+        with session_scope() as session:
             db_node = map_to_db(Node, node_data)
             session.add(db_node)
             session.commit()
             session.refresh(db_node)
             return map_to_domain(db_node)
     
-    def update(self, node_id, updates):
-        """Update a node"""
-        with get_session() as session:
-            node = session.get(Node, node_id)
-            if not node:
-                return None
-                
-            for key, value in updates.items():
-                if hasattr(node, key):
-                    setattr(node, key, value)
-            
+    def update(self, node_id, updates, expected_version=None):
+        """Update a node, only if still at expected_version when given (ConflictError otherwise)"""
+        # A queued drag must not overwrite this update when it lands later
+        position_write_buffer.flush()
+        with session_scope() as session:
+            node = versioned_update(session, Node, node_id, updates, expected_version)
             session.commit()
-            session.refresh(node)
-            return map_to_domain(node)
+            return node
     
     def delete(self, node_id):
-        """Delete a node and its associated conversations"""
-        with get_session() as session:
-            # First, check if the node exists
-            node = session.get(Node, node_id)
-            if not node:
-                return False
-            
-            # Find all conversations for this node
-            conversations = session.query(Conversation).filter(Conversation.node_id == node_id).all()
-            
-            # For each conversation, delete its messages first
-            for conversation in conversations:
-                # Delete all messages for this conversation
-                session.query(Message).filter(Message.conversation_id == conversation.id).delete()
-                
-            # Then delete all conversations for this node
-            session.query(Conversation).filter(Conversation.node_id == node_id).delete()
-            
-            # Now delete the node
-            session.delete(node)
+        """Delete a node with its edges, conversations and messages"""
+        # Queued messages must land before their conversations are removed
+        message_write_buffer.flush()
+        with session_scope() as session:
+            deleted = delete_nodes(session, Node.id == node_id)
             session.commit()
-            return True
\ No newline at end of file
+            return deleted > 0
+    
+    def bulk_create(self, session, nodes_data):
+        """Insert many nodes inside the caller's transaction"""
+        return bulk_insert(session, Node, nodes_data)
+    
+    def queue_positions(self, graph_id, positions):
+        """Queue (node_id, x, y) moves for the next batched position write"""
+        for node_id, x, y in positions:
+            position_write_buffer.add(graph_id, {"graph_id": str(graph_id), "node_id": str(node_id), "x": x, "y": y})
+        return len(positions)
+    
+    def bulk_update(self, session, updates):
+        """Update many nodes by ID inside the caller's transaction"""
+        return bulk_update(session, Node, updates)
+    
+    def bulk_delete(self, session, node_ids):
+        """
+        Delete many nodes, their edges and their conversations inside the
+        caller's transaction. Flush message_write_buffer before opening it.
+        """
+        if not node_ids:
+            return 0
+        return delete_nodes(session, Node.id.in_(node_ids))
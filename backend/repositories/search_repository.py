@@ -0,0 +1,68 @@
+from sqlalchemy import select, literal, func, cast, null, union_all
+from sqlalchemy.dialects.postgresql import UUID
+from backend.db.sqlalchemy_manager import session_scope
+from backend.db.model_mappers import map_rows
+from backend.db.fulltext import SEARCH_CONFIG, search_vector, json_strings
+from backend.models.graph import Graph
+from backend.models.node import Node
+from backend.models.conversation import Conversation
+from backend.models.message import Message
+from backend.repositories.conversation_repository import message_write_buffer
+
+SEARCH_KINDS = ('graph', 'node', 'message')
+HEADLINE_OPTIONS = 'MaxFragments=2, MaxWords=20, MinWords=5'
+
+class SearchRepository:
+    def search(self, text, kinds=SEARCH_KINDS, limit=20, offset=0):
+        """
+        Ranked full-text matches across graphs (name, description), nodes
+        (name, properties) and messages (content), each served by its GIN
+        index. Returns up to limit + 1 hits so callers can tell whether
+        another page exists; snippets are only computed for the page.
+        """
+        message_write_buffer.flush()
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+        no_conversation = cast(null(), UUID(as_uuid=True))
+        selects = []
+
+        if 'graph' in kinds:
+            vector = search_vector(Graph.name, Graph.description)
+            selects.append(select(
+                literal('graph').label('kind'), Graph.id.label('id'), Graph.id.label('graph_id'),
+                no_conversation.label('conversation_id'), Graph.name.label('title'),
+                func.coalesce(Graph.description, '').label('body'),
+                func.ts_rank_cd(vector, query).label('rank')
+            ).where(vector.op('@@')(query)))
+
+        if 'node' in kinds:
+            vector = search_vector(Node.name, Node.properties)
+            selects.append(select(
+                literal('node').label('kind'), Node.id.label('id'), Node.graph_id.label('graph_id'),
+                no_conversation.label('conversation_id'), Node.name.label('title'),
+                json_strings(Node.properties).label('body'),
+                func.ts_rank_cd(vector, query).label('rank')
+            ).where(vector.op('@@')(query)))
+
+        if 'message' in kinds:
+            vector = search_vector(Message.content)
+            selects.append(select(
+                literal('message').label('kind'), Message.id.label('id'), Node.graph_id.label('graph_id'),
+                Message.conversation_id.label('conversation_id'), Message.role.label('title'),
+                Message.content.label('body'),
+                func.ts_rank_cd(vector, query).label('rank')
+            ).join(Conversation, Conversation.id == Message.conversation_id)
+             .join(Node, Node.id == Conversation.node_id)
+             .where(vector.op('@@')(query)))
+
+        if not selects:
+            return []
+
+        hits = union_all(*selects).subquery()
+        statement = select(
+            hits.c.kind, hits.c.id, hits.c.graph_id, hits.c.conversation_id, hits.c.title,
+            func.ts_headline(SEARCH_CONFIG, hits.c.body, query, HEADLINE_OPTIONS).label('snippet'),
+            hits.c.rank
+        ).order_by(hits.c.rank.desc(), hits.c.id).limit(limit + 1).offset(offset)
+
+        with session_scope() as session:
+            return map_rows(session.execute(statement))
@@ -0,0 +1,77 @@
+# backend/repositories/snapshot_repository.py
+from sqlalchemy import select, insert, func
+from backend.db.sqlalchemy_manager import session_scope
+from backend.db.model_mappers import select_columns, map_rows
+from backend.models.graph import Graph
+from backend.models.node import Node
+from backend.models.edge import Edge
+from backend.models.graph_snapshot import GraphSnapshot
+
+# Everything but the (possibly large) data column
+SUMMARY_COLUMNS = (GraphSnapshot.id, GraphSnapshot.graph_id, GraphSnapshot.number,
+                   GraphSnapshot.graph_version, GraphSnapshot.kind, GraphSnapshot.created_at)
+
+class SnapshotRepository:
+    def find_latest(self, graph_id):
+        """Summary of the graph's newest snapshot, or None"""
+        with session_scope() as session:
+            rows = map_rows(session.execute(
+                select(*SUMMARY_COLUMNS).where(GraphSnapshot.graph_id == graph_id)
+                .order_by(GraphSnapshot.number.desc()).limit(1)
+            ))
+            return rows[0] if rows else None
+
+    def find_by_id(self, snapshot_id):
+        with session_scope() as session:
+            rows = map_rows(session.execute(select(*SUMMARY_COLUMNS).where(GraphSnapshot.id == snapshot_id)))
+            return rows[0] if rows else None
+
+    def find_page(self, graph_id, limit, before=None):
+        """Up to limit + 1 summaries, newest first, optionally numbered below before"""
+        query = select(*SUMMARY_COLUMNS).where(GraphSnapshot.graph_id == graph_id)
+        if before is not None:
+            query = query.where(GraphSnapshot.number < before)
+        with session_scope() as session:
+            return map_rows(session.execute(query.order_by(GraphSnapshot.number.desc()).limit(limit + 1)))
+
+    def find_chain(self, graph_id, number=None):
+        """The rows needed to rebuild snapshot number (default: the newest); see chain()"""
+        with session_scope() as session:
+            return self.chain(session, graph_id, number)
+
+    def chain(self, session, graph_id, number=None):
+        """
+        The latest checkpoint at or before number followed by every diff up
+        to number, in order. Empty if there is no such snapshot.
+        """
+        scope = GraphSnapshot.graph_id == graph_id
+        if number is not None:
+            scope = scope & (GraphSnapshot.number <= number)
+        checkpoint = select(func.max(GraphSnapshot.number)).where(
+            scope, GraphSnapshot.kind == 'checkpoint'
+        ).scalar_subquery()
+        return map_rows(session.execute(
+            select_columns(GraphSnapshot).where(scope, GraphSnapshot.number >= checkpoint)
+            .order_by(GraphSnapshot.number)
+        ))
+
+    def lock_graph(self, session, graph_id):
+        """
+        Lock the graph row for the rest of the transaction so snapshots of
+        one graph are numbered one at a time; returns its version or None.
+        """
+        return session.execute(
+            select(Graph.version).where(Graph.id == graph_id).with_for_update()
+        ).scalar()
+
+    def current_rows(self, session, graph_id):
+        """The graph's own row plus its node and edge rows"""
+        graph = map_rows(session.execute(select_columns(Graph).where(Graph.id == graph_id)))
+        nodes = map_rows(session.execute(select_columns(Node).where(Node.graph_id == graph_id)))
+        edges = map_rows(session.execute(select_columns(Edge).where(Edge.graph_id == graph_id)))
+        return (graph[0] if graph else None), nodes, edges
+
+    def create(self, session, snapshot_data):
+        """Insert a snapshot in the caller's transaction; returns its summary"""
+        row = session.execute(insert(GraphSnapshot).values(**snapshot_data).returning(*SUMMARY_COLUMNS)).first()
+        return dict(row._mapping)
@@ -0,0 +1,173 @@
+# backend/services/context_builder.py
+import re
+from shared.config import config
+from shared.utils import estimate_tokens
+from backend.db.pagination import encode_cursor
+from backend.repositories.conversation_repository import ConversationRepository
+from backend.repositories.context_repository import ContextRepository
+from backend.repositories.execution_repository import ExecutionRepository
+from backend.services.llm_service import LLMService, DEFAULT_MAX_TOKENS
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('context_builder')
+
+# Chat formats add a few tokens of role/separator framing per message
+MESSAGE_OVERHEAD_TOKENS = 4
+# When history overflows, fold it down to this share of the history budget so
+# that the next turns fit again without another summary
+SUMMARY_KEEP_RATIO = 0.5
+SUMMARY_PROMPT = (
+    "Summarise the conversation so far for your own future reference. Keep facts, "
+    "decisions, names, numbers and open questions; drop pleasantries. Reply with the summary only."
+)
+
+def context_window(model, properties=None):
+    """
+    Token window of a model: the node's `context_window` property if set,
+    else the size in names like `llama3-8b-8192`, else DEFAULT_CONTEXT_WINDOW.
+    """
+    if properties and properties.get("context_window"):
+        return int(properties["context_window"])
+    match = re.search(r"-(\d{4,6})$", model or "")
+    if match:
+        return int(match.group(1))
+    return config.get_config('DEFAULT_CONTEXT_WINDOW', 4096)
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+class ContextBuilder:
+    """
+    Assembles the prompt for a node's conversation within its model's window.
+
+    Order: system prompt, context sources, rolling summary of older turns,
+    then as many recent messages as fit. The summary lives in the
+    conversation's metadata together with a cursor of the last message it
+    covers, so older rows are never loaded again and each summary only
+    folds in the turns that fell out of the window since the last one.
+    """
+
+    def __init__(self):
+        self.conversation_repo = ConversationRepository()
+        self.context_repo = ContextRepository()
+        self.execution_repo = ExecutionRepository()
+        self.llm_service = LLMService()
+
+    def build(self, conversation, properties):
+        """Chat messages for the conversation's next model call"""
+        model = properties.get("model")
+        budget = (context_window(model, properties)
+                  - properties.get("max_tokens", DEFAULT_MAX_TOKENS)
+                  - MESSAGE_OVERHEAD_TOKENS)
+
+        preamble = []
+        if properties.get("system_prompt"):
+            preamble.append({"role": "system", "content": properties["system_prompt"]})
+        sources = self.render_sources(conversation["id"])
+        if sources:
+            preamble.append({"role": "system", "content": sources})
+        budget -= sum(message_tokens(message) for message in preamble)
+
+        summary = (conversation.get("conversation_metadata") or {}).get("summary") or {}
+        history = self.conversation_repo.find_messages_after(conversation["id"], summary.get("through"))
+        history_budget = budget - config.get_config('SUMMARY_MAX_TOKENS', 512) - MESSAGE_OVERHEAD_TOKENS
+
+        if sum(message_tokens(message) for message in history) > history_budget:
+            keep = self._recent(history, int(history_budget * SUMMARY_KEEP_RATIO))
+            folded = history[:len(history) - len(keep)]
+            summary = self._fold(conversation["id"], properties, summary, folded)
+            history = keep
+
+        messages = list(preamble)
+        if summary.get("text"):
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary['text']}"})
+        messages.extend({"role": message["role"], "content": message["content"]} for message in history)
+        return messages
+
+    def render_sources(self, conversation_id):
+        """Text of the conversation's Context rows: inline text or the latest output of a node"""
+        parts = []
+        for source in self.context_repo.find_by_conversation_id(conversation_id):
+            metadata = source.get("context_metadata") or {}
+            if source["source_type"] == "node_output" and source.get("source_id"):
+                result = self.execution_repo.find_latest_result(source["source_id"])
+                content = ((result or {}).get("result") or {}).get("output")
+            else:
+                content = metadata.get("content")
+            if content:
+                title = metadata.get("title") or source["source_type"]
+                parts.append(f"[{title}]\n{content}")
+        return "\n\n".join(parts)
+
+    def _recent(self, history, budget):
+        """The longest suffix of history that fits in budget (at least the last message)"""
+        used = 0
+        count = 0
+        for message in reversed(history):
+            used += message_tokens(message)
+            if used > budget and count:
+                break
+            count += 1
+        return history[len(history) - count:]
+
+    def _fold(self, conversation_id, properties, summary, messages):
+        """
+        Extend the rolling summary with messages and store it. Messages are
+        folded in chunks that fit the model's window next to the summary so
+        far, and the summary is stored after each chunk; on a failure the
+        summary of the chunks done so far is kept.
+
+        These calls run before the reply starts, so at most
+        SUMMARY_MAX_CHUNKS chunks are folded per call: when more history is
+        waiting (e.g. a long conversation summarised for the first time),
+        only its most recent part is folded and older messages are left out.
+        """
+        summary_max_tokens = config.get_config('SUMMARY_MAX_TOKENS', 512)
+        max_chunks = config.get_config('SUMMARY_MAX_CHUNKS', 2)
+        window = (context_window(properties.get("model"), properties) - summary_max_tokens
+                  - message_tokens({"content": SUMMARY_PROMPT}) - MESSAGE_OVERHEAD_TOKENS)
+
+        # The summary so far takes up to summary_max_tokens of every chunk
+        start = len(messages) - len(self._recent(messages, max_chunks * (window - summary_max_tokens)))
+        if start:
+            logger.info(f"Conversation {conversation_id}: {start} older messages left out of its summary")
+        chunks = 0
+        while start < len(messages) and chunks < max_chunks:
+            chunks += 1
+            preamble = f"Earlier summary:\n{summary['text']}\n\nNewer turns:\n" if summary.get("text") else ""
+            room = max(1, window - estimate_tokens(preamble))
+            lines = []
+            used = 0
+            for message in messages[start:]:
+                line = f"{message['role']}: {message['content']}"
+                cost = estimate_tokens(line) + 1
+                if lines and used + cost > room:
+                    break
+                if cost > room:
+                    # A single message larger than the window is summarised from its beginning
+                    line = line[:room * 4]
+                lines.append(line)
+                used += cost
+            chunk = messages[start:start + len(lines)]
+
+            try:
+                text = self.llm_service.generate_chat_completion(
+                    properties.get("provider"),
+                    properties.get("model"),
+                    [{"role": "system", "content": SUMMARY_PROMPT}, {"role": "user", "content": preamble + "\n".join(lines)}],
+                    temperature=0.2,
+                    max_tokens=summary_max_tokens
+                )
+            except Exception as e:
+                logger.error(f"Summarising conversation {conversation_id} failed: {e}")
+                return summary
+
+            last = chunk[-1]
+            summary = {
+                "text": text,
+                "through": encode_cursor(last["created_at"], last["id"]),
+                "messages": summary.get("messages", 0) + len(chunk)
+            }
+            self.conversation_repo.update_metadata(conversation_id, {"summary": summary})
+            start += len(chunk)
+        return summary
@@ -1,9 +1,15 @@
 # backend/services/conversation_service.py
+import json
 import uuid
 from datetime import datetime
 from backend.repositories.conversation_repository import ConversationRepository
 from backend.repositories.node_repository import NodeRepository
 from backend.infrastructure.logger import get_logger
+from backend.db.pagination import encode_cursor
+from backend.infrastructure.cancellation import CancellationToken
+from backend.services.context_builder import ContextBuilder
+from backend.services.llm_service import LLMService, DEFAULT_PROVIDER, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS
+from shared.errors import OperationCancelledError
 
 logger = get_logger('conversation_service')
 
@@ -11,6 +17,8 @@ class ConversationService:
     def __init__(self):
         self.conversation_repo = ConversationRepository()
         self.node_repo = NodeRepository()
+        self.llm_service = LLMService()
+        self.context_builder = ContextBuilder()
     
     def create_conversation(self, node_id):
         """
@@ -48,9 +56,24 @@ class ConversationService:
         """
         return self.conversation_repo.find_messages(conversation_id)
     
-    def add_message(self, conversation_id, role, content):
+    def get_message_page(self, conversation_id, limit=50, before=None, after=None):
         """
-        Add a message to a conversation
+        Get one page of messages, oldest first. Without a cursor this is the
+        newest page; pass before_cursor/after_cursor from a previous page to
+        move to older or newer messages.
+        """
+        messages, has_more = self.conversation_repo.find_messages_page(
+            conversation_id, limit, before=before, after=after
+        )
+        page = {"messages": messages, "has_more": has_more, "before_cursor": None, "after_cursor": None}
+        if messages:
+            page["before_cursor"] = encode_cursor(messages[0]["created_at"], messages[0]["id"])
+            page["after_cursor"] = encode_cursor(messages[-1]["created_at"], messages[-1]["id"])
+        return page
+    
+    def add_message(self, conversation_id, role, content, metadata=None):
+        """
+        Add a message to a conversation; None if the conversation does not exist
         """
         message_data = {
             "id": str(uuid.uuid4()),
@@ -58,20 +81,78 @@ class ConversationService:
             "role": role,
             "content": content,
             "created_at": datetime.now(),
-            "message_metadata": {}
+            "message_metadata": metadata or {}
         }
         
         return self.conversation_repo.add_message(message_data)
     
     def stream_conversation(self, conversation_id):
         """
-        Stream messages for a conversation
+        Stream the assistant's reply to a conversation as server-sent events.
+
+        The conversation's node model is run in streaming mode and every
+        token chunk is forwarded as a `data: {"content": ...}` event as soon
+        as it arrives. The assembled reply is stored once at the end and
+        announced in a final event before `[DONE]`. If the client disconnects
+        the provider stream is aborted and whatever was generated is kept,
+        marked partial.
         """
-        # This would normally integrate with a real-time message streaming system
-        # For testing purposes, we'll just yield a simple message
-        yield f"data: {{'id': '{uuid.uuid4()}', 'content': 'Streaming test message', 'role': 'assistant'}}\n\n"
+        conversation = self.conversation_repo.find_by_id(conversation_id)
+        if not conversation:
+            yield self._sse({"error": "Conversation not found"}, event="error")
+            return
+        node = self.node_repo.find_by_id(conversation["node_id"]) or {}
+        properties = node.get("properties") or {}
+        model = properties.get("model")
+        if not model:
+            yield self._sse({"error": "The conversation's node has no model configured"}, event="error")
+            return
+        provider = properties.get("provider")
+        messages = self.context_builder.build(conversation, properties)
+
+        cancel_token = CancellationToken()
+        chunks = []
+        completed = False
+        failure = None
+        message = None
+        try:
+            for chunk in self.llm_service.stream_chat_completion(
+                provider,
+                model,
+                messages,
+                temperature=properties.get("temperature", DEFAULT_TEMPERATURE),
+                max_tokens=properties.get("max_tokens", DEFAULT_MAX_TOKENS),
+                cancel_token=cancel_token
+            ):
+                chunks.append(chunk)
+                yield self._sse({"content": chunk})
+            completed = True
+        except OperationCancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Streaming reply for conversation {conversation_id} failed: {e}")
+            failure = str(e)
+        finally:
+            # Also reached through GeneratorExit when the client goes away;
+            # cancelling closes the provider connection mid-generation
+            cancel_token.cancel()
+            if chunks:
+                metadata = {"model": model, "provider": provider or DEFAULT_PROVIDER}
+                if not completed:
+                    metadata["partial"] = True
+                message = self.add_message(conversation_id, "assistant", "".join(chunks), metadata)
+
+        if failure:
+            yield self._sse({"error": failure}, event="error")
+        if message:
+            yield self._sse({"id": str(message["id"]), "role": "assistant", "done": True})
         yield "data: [DONE]\n\n"
 
+    @staticmethod
+    def _sse(payload, event=None):
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {json.dumps(payload)}\n\n"
+
     # backend/services/conversation_service.py
     def delete_conversation(self, conversation_id):
         """Delete a conversation"""
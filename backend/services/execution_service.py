@@ -1,16 +1,64 @@
 # backend/services/execution_service.py
+import hashlib
+import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from shared.config import config
 from backend.infrastructure.logger import get_logger
+from backend.infrastructure.task_queue import task_queue
+from backend.infrastructure.cancellation import cancellation_registry
+from shared.errors import OperationCancelledError
 from backend.repositories.execution_repository import ExecutionRepository
 from backend.repositories.graph_repository import GraphRepository
+from backend.services.graph_analysis_service import GraphAnalysisService
+from backend.services.snapshot_service import SnapshotService
+from backend.services.llm_service import LLMService, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS
 
 logger = get_logger('execution_service')
 
+def group_into_waves(order, predecessors):
+    """
+    Group a topological order into waves of mutually independent nodes.
+
+    A node's wave is one past the deepest wave among its predecessors, so
+    every node in a wave only depends on nodes from earlier waves.
+    """
+    levels = {}
+    waves = []
+    for node_id in order:
+        level = max((levels[p] + 1 for p in predecessors.get(node_id, ())), default=0)
+        levels[node_id] = level
+        if level == len(waves):
+            waves.append([])
+        waves[level].append(node_id)
+    return waves
+
+def hash_output(result):
+    """Content hash of what a node hands to its descendants"""
+    payload = json.dumps(result.get("output"), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def compute_cache_key(node, upstream_hashes):
+    """
+    Content address of a node run: its type and properties (prompt, model,
+    temperature, ...) plus the hashes of its upstream outputs, in edge order.
+    """
+    payload = json.dumps({
+        "node_type": node.get("node_type"),
+        "properties": node.get("properties") or {},
+        "upstream": upstream_hashes
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 class ExecutionService:
     def __init__(self):
         self.execution_repo = ExecutionRepository()
         self.graph_repo = GraphRepository()
+        self.analysis_service = GraphAnalysisService()
+        self.snapshot_service = SnapshotService()
+        self.llm_service = LLMService()
+        self.max_workers = config.get_config('EXECUTION_MAX_WORKERS', 8)
     
     def execute_workflow(self, graph_id, execution_options=None):
         """
@@ -38,21 +86,210 @@ class ExecutionService:
             # Create execution record
             execution = self.execution_repo.create(execution_data)
             
-            # Update status to RUNNING
-            self.execution_repo.update_status(execution["id"], "RUNNING")
-            
-            # In a real implementation, we would now:
-            # 1. Get the execution order using the graph analysis service
-            # 2. Execute each node in order
-            # 3. Update the execution status
-            
-            # For testing purposes, just return the execution info
-            logger.info(f"Created execution {execution['id']} for graph {graph_id}")
+            # Hand the run to a background worker so the caller returns immediately
+            cancellation_registry.create(execution["id"])
+            task_queue.enqueue_task(
+                self.run_execution, execution["id"], graph_id, execution_options or {},
+                task_id=execution["id"]
+            )
+            logger.info(f"Queued execution {execution['id']} for graph {graph_id}")
             return execution
             
         except Exception as e:
             logger.error(f"Failed to execute workflow for graph {graph_id}: {e}")
             raise
+
+    def run_execution(self, execution_id, graph_id, execution_options):
+        """
+        Run every node of the graph wave by wave and record the final status
+        """
+        cancel_token = cancellation_registry.create(execution_id)
+        try:
+            if cancel_token.cancelled:
+                logger.info(f"Execution {execution_id} was stopped before it started")
+                return "STOPPED"
+            # Only a PENDING execution starts: another process may have stopped it meanwhile
+            if not self.execution_repo.update_status(execution_id, "RUNNING", expected_status="PENDING"):
+                logger.warning(f"Execution {execution_id} is no longer pending; not running it")
+                return None
+
+            try:
+                # Validate the cached topology against the stored version so edits
+                # made through another process are never executed stale
+                version = self.graph_repo.get_version(graph_id)
+                # Pin the graph state this run is planned from so it can be reproduced
+                snapshot = self.snapshot_service.ensure_snapshot(graph_id, version)
+                pinned = snapshot and self.snapshot_service.get_snapshot(graph_id, snapshot["number"])
+                if not pinned:
+                    raise ValueError(f"Graph {graph_id} not found")
+                self.execution_repo.set_snapshot(execution_id, snapshot["id"])
+                # Order and predecessors come from one topology under one lock so they agree
+                topology = self.analysis_service.get_topology(graph_id, version)
+                with topology.lock:
+                    order = topology.topological_order()
+                    predecessors = {node_id: list(preds) for node_id, preds in topology.predecessors.items()}
+                # Nodes come from the pinned snapshot; any the topology has beyond it are skipped
+                nodes = {node["id"]: node for node in pinned["state"]["nodes"]}
+                order = [node_id for node_id in order if node_id in nodes]
+                predecessors = {node_id: [p for p in preds if p in nodes]
+                                for node_id, preds in predecessors.items() if node_id in nodes}
+
+                waves = group_into_waves(order, predecessors)
+                failed = self._run_waves(execution_id, waves, nodes, predecessors, execution_options, cancel_token)
+            except Exception as e:
+                logger.error(f"Execution {execution_id} for graph {graph_id} aborted: {e}")
+                return self._finish(execution_id, "FAILED", error=str(e))
+
+            if cancel_token.cancelled:
+                status = "STOPPED"
+            else:
+                status = "FAILED" if failed else "COMPLETED"
+            return self._finish(execution_id, status)
+        finally:
+            cancellation_registry.discard(execution_id)
+
+    def _finish(self, execution_id, status, error=None):
+        """Record the final status unless the execution was stopped meanwhile; returns the stored status"""
+        if not self.execution_repo.update_status(execution_id, status, error=error, expected_status="RUNNING"):
+            status = self.get_execution_status(execution_id)
+        logger.info(f"Execution {execution_id} finished with status {status}")
+        return status
+
+    def _run_waves(self, execution_id, waves, nodes, predecessors, execution_options, cancel_token):
+        """Run each wave on a bounded pool; returns the ids of failed or skipped nodes"""
+        outputs = {}
+        hashes = {}
+        failed = set()
+        widest = max((len(wave) for wave in waves), default=1)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, widest))) as pool:
+            for wave in waves:
+                if self._stop_requested(execution_id, cancel_token):
+                    logger.info(f"Execution {execution_id} stopped; {len(outputs)} node results kept")
+                    break
+
+                futures = {}
+                for node_id in wave:
+                    upstream = predecessors.get(node_id, [])
+                    if failed.intersection(upstream):
+                        # Nothing downstream of a failure can produce a meaningful result
+                        failed.add(node_id)
+                        self.execution_repo.add_result(
+                            execution_id, node_id, {}, error={"message": "Skipped: upstream node failed"}
+                        )
+                        continue
+                    upstream_outputs = [outputs[p] for p in upstream if p in outputs]
+                    upstream_hashes = [hashes[p] for p in upstream if p in hashes]
+                    futures[node_id] = pool.submit(
+                        self._run_node, execution_id, nodes[node_id], upstream_outputs, execution_options,
+                        cancel_token, upstream_hashes
+                    )
+
+                # The next wave needs every result of this one
+                for node_id, future in futures.items():
+                    result = future.result()
+                    if result is None:
+                        failed.add(node_id)
+                    else:
+                        outputs[node_id] = result
+                        hashes[node_id] = hash_output(result)
+
+        return failed
+
+    def _stop_requested(self, execution_id, cancel_token):
+        """
+        True once the execution has been stopped, either in this process
+        through the token or by another process writing STOPPED.
+        """
+        if not cancel_token.cancelled:
+            execution = self.execution_repo.find_by_id(execution_id)
+            if execution and execution["status"] == "STOPPED":
+                cancel_token.cancel()
+        return cancel_token.cancelled
+
+    def _run_node(self, execution_id, node, upstream_outputs, execution_options, cancel_token=None,
+                  upstream_hashes=None):
+        """Execute one node and persist its result; returns None on failure"""
+        started_at = datetime.now()
+        cache_key = None
+        if execution_options.get("use_cache", True) and (node.get("properties") or {}).get("model"):
+            # Model calls are the expensive part; reuse the last result for identical inputs
+            cache_key = compute_cache_key(node, upstream_hashes or [])
+            cached = self.execution_repo.find_cached_result(cache_key)
+            if cached:
+                result = {**(cached["result"] or {}), "cached_from": str(cached["id"])}
+                self.execution_repo.add_result(
+                    execution_id, node["id"], result, started_at=started_at,
+                    cache_key=cache_key, output_hash=cached["output_hash"]
+                )
+                return result
+
+        try:
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            result = self.execute_node(node, upstream_outputs, execution_options, cancel_token)
+        except OperationCancelledError as e:
+            # Keep whatever the model produced before the stop
+            self.execution_repo.add_result(
+                execution_id, node["id"], {"output": e.partial or "", "partial": True},
+                error={"message": "Cancelled"}, started_at=started_at
+            )
+            return None
+        except Exception as e:
+            logger.error(f"Node {node['id']} failed in execution {execution_id}: {e}")
+            self.execution_repo.add_result(
+                execution_id, node["id"], {}, error={"message": str(e)}, started_at=started_at
+            )
+            return None
+
+        self.execution_repo.add_result(
+            execution_id, node["id"], result, started_at=started_at,
+            cache_key=cache_key, output_hash=hash_output(result)
+        )
+        return result
+
+    def execute_node(self, node, upstream_outputs, execution_options=None, cancel_token=None):
+        """
+        Execute a single node given the outputs of its upstream nodes.
+
+        Nodes with a configured model are sent to their provider; any other
+        node passes its own value (or its inputs) through unchanged.
+        """
+        properties = node.get("properties") or {}
+        inputs = (execution_options or {}).get("inputs", {})
+        inputs_text = "\n\n".join(str(output.get("output", "")) for output in upstream_outputs)
+
+        model = properties.get("model")
+        if not model:
+            value = inputs.get(str(node["id"]), properties.get("value"))
+            return {"output": value if value is not None else inputs_text}
+
+        provider = properties.get("provider")
+        content = self.llm_service.generate_chat_completion(
+            provider,
+            model,
+            self.propagate_context(properties, inputs_text),
+            temperature=properties.get("temperature", DEFAULT_TEMPERATURE),
+            max_tokens=properties.get("max_tokens", DEFAULT_MAX_TOKENS),
+            cancel_token=cancel_token
+        )
+        return {"output": content, "model": model, "provider": provider}
+
+    def propagate_context(self, properties, inputs_text):
+        """
+        Build the chat messages for a model node from its prompt and upstream outputs
+        """
+        messages = []
+        if properties.get("system_prompt"):
+            messages.append({"role": "system", "content": properties["system_prompt"]})
+
+        prompt = properties.get("prompt", "")
+        if "{input}" in prompt:
+            content = prompt.replace("{input}", inputs_text)
+        else:
+            content = "\n\n".join(part for part in (prompt, inputs_text) if part)
+        messages.append({"role": "user", "content": content})
+        return messages
     
     def get_execution_status(self, execution_id):
         """
@@ -87,6 +324,12 @@ class ExecutionService:
         if not execution or execution["status"] in ["COMPLETED", "FAILED", "STOPPED"]:
             return False
         
+        # Interrupt in-flight work here; other processes notice the STOPPED row between waves
+        if task_queue.cancel_task(str(execution_id)):
+            # The job never reaches run_execution, which would otherwise drop its token
+            cancellation_registry.discard(execution_id)
+        else:
+            cancellation_registry.cancel(execution_id)
         return self.execution_repo.update_status(execution_id, "STOPPED")
     
     def get_execution_history(self, graph_id):
@@ -1,32 +1,75 @@
+import itertools
 import networkx as nx
 from backend.repositories.graph_repository import GraphRepository
+from backend.repositories.node_repository import NodeRepository
+from backend.repositories.edge_repository import EdgeRepository
+from backend.cache.graph_topology_cache import GraphTopology, graph_topology_cache
 
 class GraphAnalysisService:
 
-    def build_networkx_graph(self, graph_id):
-        graph_repo = GraphRepository()
-        graph = graph_repo.find_by_id(graph_id, as_dict=False)  # fetch ORM instance directly
-        if not graph:
+    def __init__(self):
+        self.graph_repo = GraphRepository()
+        self.node_repo = NodeRepository()
+        self.edge_repo = EdgeRepository()
+
+    def get_topology(self, graph_id, version=None):
+        """
+        Cached adjacency for a graph. Pass the graph's version counter
+        (graph_repo.get_version()) to reject an entry built before a change
+        made by another process.
+        """
+        topology = graph_topology_cache.get(graph_id, version)
+        if topology is None:
+            topology = self.build_topology(graph_id)
+            graph_topology_cache.put(graph_id, topology)
+        return topology
+
+    def build_topology(self, graph_id):
+        version = self.graph_repo.get_version(graph_id)
+        if version is None:
             raise ValueError("Graph not found.")
 
-        G = nx.DiGraph()
+        return GraphTopology(
+            self.node_repo.find_ids_by_graph_id(graph_id),
+            self.edge_repo.find_endpoints_by_graph_id(graph_id),
+            version=version
+        )
 
-        for node in graph.nodes:
-            G.add_node(str(node.id))
+    def build_networkx_graph(self, graph_id):
+        topology = self.get_topology(graph_id, self.graph_repo.get_version(graph_id))
+        return self._networkx_graph(topology)
 
-        for edge in graph.edges:
-            G.add_edge(edge.source_id, edge.target_id)
+    def _networkx_graph(self, topology):
+        G = nx.DiGraph()
+        with topology.lock:
+            G.add_nodes_from(topology.successors)
+            for source_id, target_id in topology.edges.values():
+                G.add_edge(source_id, target_id)
 
         return G
 
-    def detect_cycles(self, graph_id):
-        G = self.build_networkx_graph(graph_id)
-        return list(nx.simple_cycles(G))
+    def detect_cycles(self, graph_id, limit=100, offset=0):
+        """
+        List up to `limit` elementary cycles after skipping `offset`.
+
+        Edge insertion already rejects cycles, so this is a diagnostic for
+        legacy data. Acyclic graphs answer from the cached ordering, and
+        enumeration is confined to strongly connected components with more
+        than one node (or a self-loop) and stops after the requested page.
+        """
+        topology = self.get_topology(graph_id, self.graph_repo.get_version(graph_id))
+        with topology.lock:
+            if topology.is_acyclic:
+                return []
+
+        G = self._networkx_graph(topology)
+        cyclic_nodes = set()
+        for component in nx.strongly_connected_components(G):
+            if len(component) > 1 or any(G.has_edge(node_id, node_id) for node_id in component):
+                cyclic_nodes.update(component)
 
-    def get_topological_sort(self, graph_id):
-        G = self.build_networkx_graph(graph_id)
-        if nx.is_directed_acyclic_graph(G):
-            return list(nx.topological_sort(G))
-        else:
-            raise ValueError("Graph contains cycles, cannot perform topological sort.")
+        cycles = nx.simple_cycles(G.subgraph(cyclic_nodes))
+        return list(itertools.islice(cycles, offset, offset + limit))
 
+    def get_topological_sort(self, graph_id, version=None):
+        return self.get_topology(graph_id, version).topological_order()
@@ -1,15 +1,27 @@
 # backend/services/graph_crud_service.py
 import uuid
 from datetime import datetime
+from backend.db.sqlalchemy_manager import session_scope
 from backend.repositories.graph_repository import GraphRepository
 from backend.repositories.node_repository import NodeRepository
 from backend.repositories.edge_repository import EdgeRepository
+from backend.repositories.conversation_repository import message_write_buffer
+from backend.repositories.node_repository import position_write_buffer
+from backend.cache.graph_topology_cache import CycleError, graph_topology_cache
+from backend.cache.known_ids import known_graphs
+from backend.services.graph_analysis_service import GraphAnalysisService
+from shared.errors import ValidationError, ConflictError
+
+# Structural writes validated against a cached topology are retried this many
+# times when another process changed the graph between the check and the commit
+STRUCTURE_WRITE_ATTEMPTS = 3
 
 class GraphCRUDService:
     def __init__(self):
         self.graph_repo = GraphRepository()
         self.node_repo = NodeRepository()
         self.edge_repo = EdgeRepository()
+        self.analysis_service = GraphAnalysisService()
         
     # Graph operations
     def create_graph(self, graph_data):
@@ -28,44 +40,49 @@ class GraphCRUDService:
             
         return self.graph_repo.create(graph_data)
         
-    def get_graph(self, graph_id):
-        """Get a graph by ID"""
-        return self.graph_repo.find_by_id(graph_id)
+    def get_graph(self, graph_id, include_content=False):
+        """Get a graph by ID, optionally with its nodes and edges"""
+        return self.graph_repo.find_by_id(graph_id, load_relationships=include_content)
         
     def get_all_graphs(self, filters=None):
         """Get all graphs, optionally filtered"""
         return self.graph_repo.find_all(filters)
         
-    def update_graph(self, graph_id, updates):
-        """Update a graph"""
-        updates['updated_at'] = datetime.now()
-        return self.graph_repo.update(graph_id, updates)
+    def list_graphs(self, limit=50, cursor=None, sort='updated_at', order='desc', name=None, include_layout=False):
+        """Get one page of graph summaries and the cursor of the next page"""
+        if sort not in self.graph_repo.SORT_COLUMNS:
+            raise ValidationError(f"Cannot sort graphs by '{sort}'")
+        if order not in ('asc', 'desc'):
+            raise ValidationError(f"Sort order must be 'asc' or 'desc', not '{order}'")
+        graphs, next_cursor = self.graph_repo.find_summaries(
+            limit, cursor=cursor, sort=sort, descending=order == 'desc',
+            name=name, include_layout=include_layout
+        )
+        return {"graphs": graphs, "next_cursor": next_cursor}
+        
+    def update_graph(self, graph_id, updates, expected_version=None):
+        """
+        Update a graph. With expected_version the write only applies if the
+        graph is still at that version, else ConflictError is raised.
+        """
+        graph = self.graph_repo.update(graph_id, updates, expected_version)
+        if graph:
+            # Metadata edits don't change the structure; keep the cached topology valid
+            graph_topology_cache.patch(graph_id, version=graph['version'])
+        return graph
         
     def delete_graph(self, graph_id):
         """Delete a graph"""
-        return self.graph_repo.delete(graph_id)
+        deleted = self.graph_repo.delete(graph_id)
+        graph_topology_cache.invalidate(graph_id)
+        return deleted
         
     # Node operations - ADD THIS MISSING METHOD
     def create_node(self, graph_id, node_data):
         """Create a new node in a graph"""
-        # Ensure required fields are present
-        if 'id' not in node_data:
-            node_data['id'] = str(uuid.uuid4())
-        node_data['graph_id'] = graph_id
-        if 'created_at' not in node_data:
-            node_data['created_at'] = datetime.now()
-        if 'updated_at' not in node_data:
-            node_data['updated_at'] = datetime.now()
-        if 'position_x' not in node_data:
-            node_data['position_x'] = 0.0
-        if 'position_y' not in node_data:
-            node_data['position_y'] = 0.0
-        if 'properties' not in node_data:
-            node_data['properties'] = {}
-        if 'node_metadata' not in node_data:
-            node_data['node_metadata'] = {}
-            
-        return self.node_repo.create(node_data)
+        node = self.node_repo.create(self._prepare_node(graph_id, node_data))
+        self._structure_changed(graph_id, lambda topology: topology.add_node(node['id']))
+        return node
         
     def get_node(self, node_id):
         """Get a node by ID"""
@@ -75,28 +92,249 @@ class GraphCRUDService:
         """Get all nodes for a graph"""
         return self.node_repo.find_by_graph_id(graph_id)
         
-    def update_node(self, node_id, updates):
-        """Update a node"""
+    def update_node(self, node_id, updates, expected_version=None):
+        """
+        Update a node. With expected_version the write only applies if the
+        node is still at that version, else ConflictError is raised. The
+        graph's version is bumped too, since its content changed.
+        """
         updates['updated_at'] = datetime.now()
-        return self.node_repo.update(node_id, updates)
+        node = self.node_repo.update(node_id, updates, expected_version)
+        if node:
+            self._structure_changed(node['graph_id'])
+        return node
+        
+    def move_nodes(self, graph_id, positions):
+        """
+        Queue node moves for a batched write. positions holds [node_id, x, y]
+        lists or {"id", "x", "y"} dicts; the latest move of each node within
+        the write window wins. Layout changes don't bump the graph version.
+        Returns the number of queued moves, or None if the graph does not exist.
+        """
+        if not graph_id:
+            raise ValidationError("Node positions need a graph_id")
+        if graph_id not in known_graphs:
+            try:
+                uuid.UUID(str(graph_id))
+            except ValueError:
+                return None
+            if self.graph_repo.get_version(graph_id) is None:
+                return None
+            known_graphs.add(graph_id)
+        moves = []
+        for position in positions or []:
+            if isinstance(position, dict):
+                position = (position.get('id'), position.get('x'), position.get('y'))
+            if not isinstance(position, (list, tuple)) or len(position) != 3:
+                raise ValidationError("Each position must be [node_id, x, y] or {id, x, y}")
+            node_id, x, y = position
+            if not node_id or not all(isinstance(value, (int, float)) for value in (x, y)):
+                raise ValidationError(f"Invalid position for node {node_id}")
+            moves.append((node_id, x, y))
+        return self.node_repo.queue_positions(graph_id, moves)
         
     def delete_node(self, node_id):
         """Delete a node"""
-        return self.node_repo.delete(node_id)
+        node = self.node_repo.find_by_id(node_id)
+        deleted = self.node_repo.delete(node_id)
+        if deleted and node:
+            self._structure_changed(node['graph_id'], lambda topology: topology.remove_node(node_id))
+        return deleted
         
     # Edge operations
-    def create_edge(self, source_id, target_id, edge_type):
-        """Create a new edge between nodes"""
-        edge_data = {
-            'id': str(uuid.uuid4()),
+    def create_edge(self, source_id, target_id, edge_type, graph_id=None):
+        """
+        Create a new edge between nodes. The edge only commits if the graph
+        is still at the version of the topology it was checked against, so
+        two processes cannot each add one half of a cycle; after a conflict
+        the check is repeated on the current structure.
+        """
+        if graph_id is None:
+            source = self.node_repo.find_by_id(source_id)
+            if not source:
+                raise ValueError(f"Node {source_id} not found")
+            graph_id = source['graph_id']
+
+        edge_data = self._prepare_edge(graph_id, {
             'source_id': source_id,
             'target_id': target_id,
-            'edge_type': edge_type,
-            'edge_metadata': {},
-            'created_at': datetime.now()
-        }
-        return self.edge_repo.create(edge_data)
+            'edge_type': edge_type
+        })
+        for attempt in range(STRUCTURE_WRITE_ATTEMPTS):
+            # Validate against the current version so the check never runs on stale structure
+            topology = self.analysis_service.get_topology(graph_id, self.graph_repo.get_version(graph_id))
+            with topology.lock:
+                for node_id in (source_id, target_id):
+                    if str(node_id) not in topology.successors:
+                        raise ValidationError(f"Node {node_id} is not part of graph {graph_id}")
+                try:
+                    topology.insert_edge(edge_data['id'], source_id, target_id)
+                except CycleError as e:
+                    raise ValidationError(str(e))
+
+                try:
+                    with session_scope() as session:
+                        edge = self.edge_repo.bulk_create(session, [edge_data])[0]
+                        version = self.graph_repo.bump_version(session, graph_id, topology.version)
+                        if version is None:
+                            raise ValueError(f"Graph {graph_id} not found")
+                        session.commit()
+                except ConflictError:
+                    topology.remove_edge(edge_data['id'])
+                    if attempt == STRUCTURE_WRITE_ATTEMPTS - 1:
+                        raise
+                    continue
+                except Exception:
+                    topology.remove_edge(edge_data['id'])
+                    raise
+                topology.version = version
+            return edge
         
     def delete_edge(self, edge_id):
         """Delete an edge"""
-        return self.edge_repo.delete(edge_id)
\ No newline at end of file
+        edge = self.edge_repo.find_by_id(edge_id)
+        deleted = self.edge_repo.delete(edge_id)
+        if deleted and edge:
+            self._structure_changed(edge['graph_id'], lambda topology: topology.remove_edge(edge_id))
+        return deleted
+
+    # Batch operations
+    def apply_batch(self, graph_id, batch, expected_version=None):
+        """
+        Apply many node and edge changes to a graph in one transaction.
+
+        batch has optional 'nodes' and 'edges' sections, each with 'create'
+        (list of dicts), 'update' (list of dicts with 'id') and 'delete'
+        (list of IDs). Everything is validated against a copy of the cached
+        topology first (membership and acyclicity), then written with bulk
+        statements and committed once; nothing is written if any change is
+        invalid. Deleting a node also removes its edges and conversations.
+        With expected_version the batch is only committed if the graph is
+        still at that version, else ConflictError is raised. Without it the
+        batch commits against the version it was validated at, and is
+        validated again on the current structure after a conflict.
+        """
+        nodes = batch.get('nodes') or {}
+        edges = batch.get('edges') or {}
+        node_creates = [self._prepare_node(graph_id, dict(node_data)) for node_data in nodes.get('create', [])]
+        node_updates = [self._prepare_update(node_data, ('graph_id', 'created_at')) for node_data in nodes.get('update', [])]
+        node_deletes = [str(node_id) for node_id in nodes.get('delete', [])]
+        edge_creates = [self._prepare_edge(graph_id, dict(edge_data)) for edge_data in edges.get('create', [])]
+        edge_updates = [self._prepare_update(edge_data, ('graph_id', 'source_id', 'target_id', 'created_at'))
+                        for edge_data in edges.get('update', [])]
+        edge_deletes = [str(edge_id) for edge_id in edges.get('delete', [])]
+        for node_update in node_updates:
+            node_update['updated_at'] = datetime.now()
+
+        changes = (node_creates, node_updates, node_deletes, edge_creates, edge_updates, edge_deletes)
+        for attempt in range(STRUCTURE_WRITE_ATTEMPTS):
+            try:
+                return self._apply_batch(graph_id, changes, expected_version)
+            except ConflictError:
+                if expected_version is not None or attempt == STRUCTURE_WRITE_ATTEMPTS - 1:
+                    raise
+
+    def _apply_batch(self, graph_id, changes, expected_version):
+        """One validate-and-commit pass of apply_batch; raises ConflictError if the graph moved on"""
+        node_creates, node_updates, node_deletes, edge_creates, edge_updates, edge_deletes = changes
+        topology = self.analysis_service.get_topology(graph_id, self.graph_repo.get_version(graph_id))
+        with topology.lock:
+            candidate = topology.copy()
+            for node_data in node_creates:
+                candidate.add_node(node_data['id'])
+            self._require_known(candidate.successors, [node_update['id'] for node_update in node_updates] + node_deletes, 'Node', graph_id)
+            self._require_known(candidate.edges, edge_deletes, 'Edge', graph_id)
+            for edge_id in edge_deletes:
+                candidate.remove_edge(edge_id)
+            for node_id in node_deletes:
+                candidate.remove_node(node_id)
+            self._require_known(candidate.edges, [edge_update['id'] for edge_update in edge_updates], 'Edge', graph_id)
+            for edge_data in edge_creates:
+                self._require_known(candidate.successors, [edge_data['source_id'], edge_data['target_id']], 'Node', graph_id)
+                try:
+                    candidate.insert_edge(edge_data['id'], edge_data['source_id'], edge_data['target_id'])
+                except CycleError as e:
+                    raise ValidationError(str(e))
+
+            if node_deletes:
+                message_write_buffer.flush()
+            if node_updates:
+                position_write_buffer.flush(graph_id)
+            with session_scope() as session:
+                result = {
+                    'nodes': {
+                        'created': self.node_repo.bulk_create(session, node_creates),
+                        'updated': self.node_repo.bulk_update(session, node_updates),
+                    },
+                    'edges': {}
+                }
+                self.edge_repo.bulk_delete(session, edge_deletes)
+                self.node_repo.bulk_delete(session, node_deletes)
+                result['edges']['created'] = self.edge_repo.bulk_create(session, edge_creates)
+                result['edges']['updated'] = self.edge_repo.bulk_update(session, edge_updates)
+                # Bumped in the same transaction so a change made since validation rolls the batch back
+                if expected_version is None:
+                    expected_version = topology.version
+                candidate.version = self.graph_repo.bump_version(session, graph_id, expected_version)
+                session.commit()
+            result['nodes']['deleted'] = node_deletes
+            result['edges']['deleted'] = edge_deletes
+            result['version'] = candidate.version
+
+            graph_topology_cache.put(graph_id, candidate)
+        return result
+
+    def _prepare_node(self, graph_id, node_data):
+        """Fill in the defaults every new node row needs"""
+        if 'id' not in node_data:
+            node_data['id'] = str(uuid.uuid4())
+        node_data['graph_id'] = graph_id
+        if 'created_at' not in node_data:
+            node_data['created_at'] = datetime.now()
+        if 'updated_at' not in node_data:
+            node_data['updated_at'] = datetime.now()
+        if 'position_x' not in node_data:
+            node_data['position_x'] = 0.0
+        if 'position_y' not in node_data:
+            node_data['position_y'] = 0.0
+        if 'properties' not in node_data:
+            node_data['properties'] = {}
+        if 'node_metadata' not in node_data:
+            node_data['node_metadata'] = {}
+        return node_data
+
+    def _prepare_edge(self, graph_id, edge_data):
+        """Fill in the defaults every new edge row needs"""
+        for field in ('source_id', 'target_id', 'edge_type'):
+            if not edge_data.get(field):
+                raise ValidationError(f"Edge is missing '{field}'")
+        if 'id' not in edge_data:
+            edge_data['id'] = str(uuid.uuid4())
+        edge_data['graph_id'] = graph_id
+        if 'edge_metadata' not in edge_data:
+            edge_data['edge_metadata'] = {}
+        if 'created_at' not in edge_data:
+            edge_data['created_at'] = datetime.now()
+        return edge_data
+
+    def _prepare_update(self, updates, immutable_fields):
+        if not updates.get('id'):
+            raise ValidationError("Every update needs an 'id'")
+        updates = {key: value for key, value in updates.items() if key not in immutable_fields}
+        updates['id'] = str(updates['id'])
+        return updates
+
+    def _require_known(self, members, ids, kind, graph_id):
+        for member_id in ids:
+            if str(member_id) not in members:
+                raise ValidationError(f"{kind} {member_id} is not part of graph {graph_id}")
+
+    def _structure_changed(self, graph_id, mutate=None):
+        """
+        Record a node/edge change: bump the graph version so other processes
+        drop their cached topology, and patch this process's copy in place.
+        """
+        if graph_id is None:
+            return
+        version = self.graph_repo.touch(graph_id)
+        graph_topology_cache.patch(graph_id, mutate, version=version)
\ No newline at end of file
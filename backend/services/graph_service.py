@@ -13,17 +13,21 @@ class GraphService:
         """Create a new graph"""
         return self.crud_service.create_graph(graph_data)
     
-    def get_graph_by_id(self, graph_id):
-        """Get a graph by ID"""
-        return self.crud_service.get_graph(graph_id)
+    def get_graph_by_id(self, graph_id, include_content=False):
+        """Get a graph by ID, optionally with its nodes and edges"""
+        return self.crud_service.get_graph(graph_id, include_content)
     
     def get_graphs(self, filters=None):
         """Get all graphs, optionally filtered"""
         return self.crud_service.get_all_graphs(filters)
     
-    def update_graph(self, graph_id, updates):
-        """Update a graph"""
-        return self.crud_service.update_graph(graph_id, updates)
+    def list_graphs(self, limit=50, cursor=None, sort='updated_at', order='desc', name=None, include_layout=False):
+        """Get one page of graph summaries"""
+        return self.crud_service.list_graphs(limit, cursor, sort, order, name, include_layout)
+    
+    def update_graph(self, graph_id, updates, expected_version=None):
+        """Update a graph, optionally only if still at expected_version"""
+        return self.crud_service.update_graph(graph_id, updates, expected_version)
     
     def delete_graph(self, graph_id):
         """Delete a graph"""
@@ -42,19 +46,28 @@ class GraphService:
         """Get all nodes for a graph"""
         return self.crud_service.get_nodes_by_graph(graph_id)
     
-    def update_node(self, node_id, updates):
-        """Update a node"""
-        return self.crud_service.update_node(node_id, updates)
+    def update_node(self, node_id, updates, expected_version=None):
+        """Update a node, optionally only if still at expected_version"""
+        return self.crud_service.update_node(node_id, updates, expected_version)
+    
+    def move_nodes(self, graph_id, positions):
+        """Queue a batch of node position changes"""
+        return self.crud_service.move_nodes(graph_id, positions)
     
     def delete_node(self, node_id):
         """Delete a node"""
         return self.crud_service.delete_node(node_id)
     
     # Edge operations
-    def create_edge(self, source_id, target_id, edge_type):
+    def create_edge(self, source_id, target_id, edge_type, graph_id=None):
         """Create a new edge between nodes"""
-        return self.crud_service.create_edge(source_id, target_id, edge_type)
+        return self.crud_service.create_edge(source_id, target_id, edge_type, graph_id)
     
     def delete_edge(self, edge_id):
         """Delete an edge"""
-        return self.crud_service.delete_edge(edge_id)
\ No newline at end of file
+        return self.crud_service.delete_edge(edge_id)
+    
+    # Batch operations
+    def apply_batch(self, graph_id, batch, expected_version=None):
+        """Apply many node and edge changes in one transaction"""
+        return self.crud_service.apply_batch(graph_id, batch, expected_version)
\ No newline at end of file
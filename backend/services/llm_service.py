@@ -0,0 +1,108 @@
+# backend/services/llm_service.py
+from backend.integrations.ollama_client import OllamaClient
+from backend.integrations.groq_client import GroqClient
+from backend.infrastructure.logger import get_logger
+from shared.errors import OperationCancelledError
+
+logger = get_logger('llm_service')
+
+DEFAULT_PROVIDER = 'ollama'
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_MAX_TOKENS = 1024
+
+class LLMService:
+    """Provider-neutral entry point for chat completions"""
+
+    CLIENTS = {
+        'ollama': OllamaClient,
+        'groq': GroqClient
+    }
+
+    def get_client(self, provider):
+        client = self.CLIENTS.get(provider or DEFAULT_PROVIDER)
+        if not client:
+            raise ValueError(f"Unknown model provider '{provider}'")
+        return client
+
+    def generate_chat_completion(self, provider, model, messages, temperature=DEFAULT_TEMPERATURE,
+                                 max_tokens=DEFAULT_MAX_TOKENS, cancel_token=None):
+        """
+        Run a chat completion and return the assistant's text.
+
+        With a cancel token the reply is streamed so it can be abandoned
+        mid-generation; the text produced so far rides on the raised
+        OperationCancelledError as `partial`.
+        """
+        if cancel_token:
+            chunks = []
+            try:
+                for chunk in self.stream_chat_completion(provider, model, messages, temperature, max_tokens, cancel_token):
+                    chunks.append(chunk)
+            except OperationCancelledError:
+                raise OperationCancelledError(f"{provider} chat with model '{model}' was cancelled", partial="".join(chunks))
+            return "".join(chunks)
+
+        client = self.get_client(provider)
+        response = client.chat(model, messages, temperature, max_tokens)
+        if 'error' in response:
+            raise RuntimeError(f"{provider} chat with model '{model}' failed: {response['error']}")
+        return self.extract_content(provider, response)
+
+    def stream_chat_completion(self, provider, model, messages, temperature=DEFAULT_TEMPERATURE,
+                               max_tokens=DEFAULT_MAX_TOKENS, cancel_token=None):
+        """
+        Yield the assistant's text chunk by chunk as the provider produces it.
+        Raises OperationCancelledError once the token fires.
+        """
+        client = self.get_client(provider)
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+
+        lines = client.chat(model, messages, temperature, max_tokens, stream=True, cancel_token=cancel_token)
+        if isinstance(lines, dict):
+            raise RuntimeError(f"{provider} chat with model '{model}' failed: {lines.get('error')}")
+
+        for line in lines:
+            content = client.parse_stream_line(line)
+            if content:
+                yield content
+
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+
+    async def agenerate_chat_completion(self, provider, model, messages, temperature=DEFAULT_TEMPERATURE,
+                                        max_tokens=DEFAULT_MAX_TOKENS):
+        """generate_chat_completion for asyncio callers; cancel by cancelling the task"""
+        client = self.get_client(provider)
+        response = await client.achat(model, messages, temperature, max_tokens)
+        if 'error' in response:
+            raise RuntimeError(f"{provider} chat with model '{model}' failed: {response['error']}")
+        return self.extract_content(provider, response)
+
+    async def astream_chat_completion(self, provider, model, messages, temperature=DEFAULT_TEMPERATURE,
+                                      max_tokens=DEFAULT_MAX_TOKENS, cancel_token=None):
+        """
+        Async iterator over the assistant's text chunks. Stops with
+        OperationCancelledError once cancel_token fires; cancelling the
+        consuming task closes the upstream request as well.
+        """
+        client = self.get_client(provider)
+        try:
+            async for line in client.astream_chat(model, messages, temperature, max_tokens):
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                content = client.parse_stream_line(line)
+                if content:
+                    yield content
+        except RuntimeError as e:
+            raise RuntimeError(f"{provider} chat with model '{model}' failed: {e}")
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+
+    @staticmethod
+    def extract_content(provider, response):
+        """Pull the assistant text out of a provider's non-streaming response"""
+        if provider == 'groq':
+            choices = response.get('choices') or [{}]
+            return (choices[0].get('message') or {}).get('content', '')
+        return (response.get('message') or {}).get('content', '')
@@ -0,0 +1,28 @@
+# backend/services/search_service.py
+from backend.repositories.search_repository import SearchRepository, SEARCH_KINDS
+from shared.errors import ValidationError
+
+class SearchService:
+    def __init__(self):
+        self.search_repo = SearchRepository()
+
+    def search(self, text, kinds=None, limit=20, offset=0):
+        """
+        Full-text search over graphs, nodes and messages, best matches first.
+        text uses web search syntax: quoted phrases, OR, and -excluded words.
+        """
+        text = (text or "").strip()
+        if not text:
+            raise ValidationError("Search text is required")
+        kinds = tuple(kinds or SEARCH_KINDS)
+        unknown = set(kinds) - set(SEARCH_KINDS)
+        if unknown:
+            raise ValidationError(f"Unknown search types: {', '.join(sorted(unknown))}")
+
+        hits = self.search_repo.search(text, kinds, limit=limit, offset=offset)
+        return {
+            "results": hits[:limit],
+            "offset": offset,
+            "limit": limit,
+            "has_more": len(hits) > limit
+        }
@@ -0,0 +1,174 @@
+# backend/services/snapshot_service.py
+import json
+from shared.config import config
+from backend.db.sqlalchemy_manager import session_scope
+from backend.repositories.snapshot_repository import SnapshotRepository
+from backend.repositories.node_repository import position_write_buffer
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('snapshot_service')
+
+GRAPH_FIELDS = ('name', 'description', 'layout_data', 'graph_metadata')
+NODE_FIELDS = ('name', 'node_type', 'properties', 'position_x', 'position_y', 'node_metadata')
+EDGE_FIELDS = ('source_id', 'target_id', 'edge_type', 'edge_metadata')
+
+def graph_state(graph, nodes, edges):
+    """
+    JSON-safe structural state of a graph:
+    {"graph": {field: value}, "nodes": {id: {field: value}}, "edges": {id: {field: value}}}
+    """
+    return {
+        "graph": {field: graph.get(field) for field in GRAPH_FIELDS},
+        "nodes": {str(node["id"]): _fields(node, NODE_FIELDS) for node in nodes},
+        "edges": {str(edge["id"]): _fields(edge, EDGE_FIELDS) for edge in edges}
+    }
+
+def _fields(row, fields):
+    return {field: str(row[field]) if field.endswith('_id') and row.get(field) is not None else row.get(field)
+            for field in fields}
+
+def diff_states(old, new):
+    """
+    Changes that turn state old into state new. Graph fields and node/edge
+    members only appear when they changed, and changed members only carry
+    their changed fields, so an edit to one node costs one small entry:
+    {"graph": {...}, "nodes": {"set": {id: {...}}, "delete": [ids]}, "edges": {...}}
+    """
+    diff = {}
+    graph = {field: value for field, value in new["graph"].items() if old["graph"].get(field) != value}
+    if graph:
+        diff["graph"] = graph
+    for section in ("nodes", "edges"):
+        changes = _diff_members(old[section], new[section])
+        if changes:
+            diff[section] = changes
+    return diff
+
+def _diff_members(old, new):
+    changes = {}
+    changed = {}
+    for member_id, fields in new.items():
+        previous = old.get(member_id)
+        if previous is None:
+            changed[member_id] = fields
+        elif previous != fields:
+            changed[member_id] = {field: value for field, value in fields.items() if previous.get(field) != value}
+    if changed:
+        changes["set"] = changed
+    deleted = [member_id for member_id in old if member_id not in new]
+    if deleted:
+        changes["delete"] = deleted
+    return changes
+
+def apply_diff(state, diff):
+    """Apply a diff from diff_states to state in place and return it"""
+    state["graph"].update(diff.get("graph", {}))
+    for section in ("nodes", "edges"):
+        members = state[section]
+        changes = diff.get(section, {})
+        for member_id in changes.get("delete", ()):
+            members.pop(member_id, None)
+        for member_id, fields in changes.get("set", {}).items():
+            members[member_id] = {**members.get(member_id, {}), **fields}
+    return state
+
+def rebuild_state(chain):
+    """State of the last snapshot in chain (a checkpoint followed by its diffs)"""
+    if not chain:
+        return None
+    # The checkpoint row is owned by this call, so its data can be patched in place
+    state = chain[0]["data"]
+    for snapshot in chain[1:]:
+        apply_diff(state, snapshot["data"])
+    return state
+
+def render_state(state):
+    """A rebuilt state in the shape of a hydrated graph: nodes and edges as lists with ids"""
+    return {
+        **state["graph"],
+        "nodes": [{"id": member_id, **fields} for member_id, fields in state["nodes"].items()],
+        "edges": [{"id": member_id, **fields} for member_id, fields in state["edges"].items()]
+    }
+
+def _size(data):
+    return len(json.dumps(data, default=str))
+
+class SnapshotService:
+    """
+    Immutable version history of graphs.
+
+    Snapshots are numbered per graph. Most store only the diff against the
+    previous snapshot; every SNAPSHOT_CHECKPOINT_INTERVAL-th one, and any
+    whose diff would be larger than the full state, stores the full state
+    as a checkpoint. Rebuilding a snapshot reads its nearest checkpoint and
+    at most that many diffs, however long the history grows.
+    """
+
+    def __init__(self):
+        self.snapshot_repo = SnapshotRepository()
+        self.checkpoint_interval = max(1, config.get_config('SNAPSHOT_CHECKPOINT_INTERVAL', 20))
+
+    def create_snapshot(self, graph_id):
+        """
+        Record the graph's current state, or return the newest snapshot if
+        nothing changed since. Returns None if the graph does not exist.
+        """
+        position_write_buffer.flush(graph_id)
+        with session_scope() as session:
+            version = self.snapshot_repo.lock_graph(session, graph_id)
+            if version is None:
+                return None
+            graph, nodes, edges = self.snapshot_repo.current_rows(session, graph_id)
+            state = graph_state(graph, nodes, edges)
+            chain = self.snapshot_repo.chain(session, graph_id)
+            latest = chain[-1] if chain else None
+
+            if latest is None:
+                kind, data = 'checkpoint', state
+            else:
+                diff = diff_states(rebuild_state(chain), state)
+                if not diff and latest["graph_version"] == version:
+                    return {key: value for key, value in latest.items() if key != 'data'}
+                if len(chain) >= self.checkpoint_interval or _size(diff) >= _size(state):
+                    kind, data = 'checkpoint', state
+                else:
+                    kind, data = 'diff', diff
+
+            snapshot = self.snapshot_repo.create(session, {
+                "graph_id": graph_id,
+                "number": latest["number"] + 1 if latest else 1,
+                "graph_version": version,
+                "kind": kind,
+                "data": data
+            })
+            session.commit()
+        logger.info(f"Stored snapshot {snapshot['number']} ({kind}) of graph {graph_id} at version {version}")
+        return snapshot
+
+    def ensure_snapshot(self, graph_id, version):
+        """The newest snapshot if it was taken at version, else a new one"""
+        latest = self.snapshot_repo.find_latest(graph_id)
+        if latest and latest["graph_version"] == version:
+            return latest
+        return self.create_snapshot(graph_id)
+
+    def list_snapshots(self, graph_id, limit=50, before=None):
+        """Newest-first page of snapshot summaries; before is a snapshot number"""
+        snapshots = self.snapshot_repo.find_page(graph_id, limit, before)
+        return {"snapshots": snapshots[:limit], "has_more": len(snapshots) > limit}
+
+    def get_snapshot(self, graph_id, number):
+        """A snapshot's summary with the graph state it recorded, or None"""
+        chain = self.snapshot_repo.find_chain(graph_id, number)
+        if not chain or chain[-1]["number"] != number:
+            return None
+        snapshot = {key: value for key, value in chain[-1].items() if key != 'data'}
+        snapshot["state"] = render_state(rebuild_state(chain))
+        return snapshot
+
+    def get_snapshot_by_id(self, snapshot_id):
+        """As get_snapshot, addressed by ID (e.g. an execution's snapshot_id)"""
+        summary = self.snapshot_repo.find_by_id(snapshot_id)
+        if not summary:
+            return None
+        return self.get_snapshot(summary["graph_id"], summary["number"])
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path='.env', override=True)  # Explicit reload
@@ -8,8 +9,41 @@ class ConfigManager:
         self.config = {
             'ENVIRONMENT': os.getenv('ENVIRONMENT', 'development'),
             'DATABASE_URL': os.getenv('DATABASE_URL'),
+            'DB_POOL_SIZE': int(os.getenv('DB_POOL_SIZE', '10')),
+            'DB_MAX_OVERFLOW': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+            'DB_POOL_TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+            'DB_POOL_RECYCLE': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+            'DB_POOL_PRE_PING': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+            'DB_STATEMENT_TIMEOUT_MS': int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000')),
             'REDIS_URL': os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
-            'DEBUG_MODE': os.getenv('DEBUG_MODE', 'true').lower() == 'true'
+            'DEBUG_MODE': os.getenv('DEBUG_MODE', 'true').lower() == 'true',
+            'EXECUTION_MAX_WORKERS': int(os.getenv('EXECUTION_MAX_WORKERS', '8')),
+            'TASK_QUEUE_WORKERS': int(os.getenv('TASK_QUEUE_WORKERS', '4')),
+            'DEFAULT_CONTEXT_WINDOW': int(os.getenv('DEFAULT_CONTEXT_WINDOW', '4096')),
+            'SUMMARY_MAX_TOKENS': int(os.getenv('SUMMARY_MAX_TOKENS', '512')),
+            'SUMMARY_MAX_CHUNKS': int(os.getenv('SUMMARY_MAX_CHUNKS', '2')),
+            'MESSAGE_BUFFER_MAX_SIZE': int(os.getenv('MESSAGE_BUFFER_MAX_SIZE', '200')),
+            'MESSAGE_BUFFER_MAX_DELAY_MS': int(os.getenv('MESSAGE_BUFFER_MAX_DELAY_MS', '50')),
+            'POSITION_BUFFER_MAX_SIZE': int(os.getenv('POSITION_BUFFER_MAX_SIZE', '1000')),
+            'POSITION_BUFFER_MAX_DELAY_MS': int(os.getenv('POSITION_BUFFER_MAX_DELAY_MS', '100')),
+            'SNAPSHOT_CHECKPOINT_INTERVAL': int(os.getenv('SNAPSHOT_CHECKPOINT_INTERVAL', '20')),
+            'HTTP_POOL_CONNECTIONS': int(os.getenv('HTTP_POOL_CONNECTIONS', '10')),
+            'HTTP_POOL_MAXSIZE': int(os.getenv('HTTP_POOL_MAXSIZE', '32')),
+            'HTTP_CONNECT_TIMEOUT': float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+            'HTTP_READ_TIMEOUT': float(os.getenv('HTTP_READ_TIMEOUT', '300')),
+            'ASYNC_HTTP_MAX_CONNECTIONS': int(os.getenv('ASYNC_HTTP_MAX_CONNECTIONS', '256')),
+            'ASYNC_HTTP_MAX_PER_HOST': int(os.getenv('ASYNC_HTTP_MAX_PER_HOST', '64')),
+            # JSON object, e.g. {"groq:llama3-70b-8192": {"rpm": 30, "tpm": 6000}, "ollama:*": {"concurrency": 2}}
+            'RATE_LIMITS': json.loads(os.getenv('RATE_LIMITS', '{}')),
+            'RETRY_MAX_ATTEMPTS': int(os.getenv('RETRY_MAX_ATTEMPTS', '3')),
+            'RETRY_BASE_DELAY': float(os.getenv('RETRY_BASE_DELAY', '0.5')),
+            'RETRY_MAX_DELAY': float(os.getenv('RETRY_MAX_DELAY', '20')),
+            'CIRCUIT_FAILURE_THRESHOLD': int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5')),
+            'CIRCUIT_RESET_TIMEOUT': float(os.getenv('CIRCUIT_RESET_TIMEOUT', '30')),
+            'LLM_CACHE_ENABLED': os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true',
+            'LLM_CACHE_TTL': int(os.getenv('LLM_CACHE_TTL', '86400')),
+            'LLM_CACHE_MAX_BYTES': int(os.getenv('LLM_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+            'LLM_CACHE_REDIS_TIMEOUT': float(os.getenv('LLM_CACHE_REDIS_TIMEOUT', '1'))
         }
 
     def get_config(self, key, default_value=None):
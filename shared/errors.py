@@ -12,4 +12,19 @@ class AuthorizationError(BaseCanvasError):
     pass
 
 class ResourceNotFoundError(BaseCanvasError):
-    pass
\ No newline at end of file
+    pass
+
+class ConflictError(BaseCanvasError):
+    def __init__(self, message="The resource was modified concurrently.", current_version=None):
+        super().__init__(message)
+        self.current_version = current_version
+
+class CircuitOpenError(BaseCanvasError):
+    def __init__(self, message="The endpoint is temporarily unavailable.", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class OperationCancelledError(BaseCanvasError):
+    def __init__(self, message="The operation was cancelled.", partial=None):
+        super().__init__(message)
+        self.partial = partial
@@ -24,3 +24,9 @@ def validate_schema(data, schema):
 
 def generate_unique_id(prefix='id'):
     return f"{prefix}_{uuid.uuid4().hex}"
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text with BPE tokenizers
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
@@ -0,0 +1,41 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+from backend.services.context_builder import ContextBuilder, SUMMARY_PROMPT
+from backend.db.pagination import encode_cursor
+from shared.utils import estimate_tokens
+
+class TestContextBuilder(unittest.TestCase):
+
+    def test_long_history_is_folded_in_chunks_that_fit_the_window(self):
+        builder = ContextBuilder()
+        builder.conversation_repo = MagicMock()
+        builder.llm_service = MagicMock()
+        prompts = []
+
+        def summarise(provider, model, messages, temperature, max_tokens):
+            prompts.append(messages)
+            return f"summary {len(prompts)}"
+
+        builder.llm_service.generate_chat_completion.side_effect = summarise
+        messages = [{"id": str(index), "role": "user", "content": "word " * 200, "created_at": datetime(2024, 1, 1)}
+                    for index in range(40)]
+        properties = {"model": "m", "context_window": 2048}
+
+        summary = builder._fold("c", properties, {}, messages)
+
+        self.assertGreater(len(prompts), 1)
+        for prompt in prompts:
+            self.assertEqual(prompt[0]["content"], SUMMARY_PROMPT)
+            self.assertLessEqual(sum(estimate_tokens(message["content"]) for message in prompt), 2048 - 512)
+        self.assertIn(f"summary {len(prompts) - 1}", prompts[-1][1]["content"])
+        self.assertEqual(builder.conversation_repo.update_metadata.call_count, len(prompts))
+        # Only the most recent history is folded within SUMMARY_MAX_CHUNKS calls
+        self.assertLessEqual(len(prompts), 2)
+        self.assertLess(summary["messages"], 40)
+        self.assertIn(messages[-1]["content"].strip(), prompts[-1][1]["content"])
+        self.assertEqual(summary["through"], encode_cursor(messages[-1]["created_at"], messages[-1]["id"]))
+        self.assertEqual(summary, builder.conversation_repo.update_metadata.call_args.args[1]["summary"])
+
+if __name__ == '__main__':
+    unittest.main()
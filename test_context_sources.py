@@ -0,0 +1,41 @@
+import unittest
+import uuid
+from backend.db.sqlalchemy_manager import init_db, get_session
+from backend.models.graph import Graph
+from backend.models.node import Node
+from backend.models.execution import Execution
+from backend.models.conversation import Conversation
+from backend.models.context import Context
+from backend.repositories.execution_repository import ExecutionRepository
+from backend.services.context_builder import ContextBuilder
+
+class TestContextSources(unittest.TestCase):
+
+    def setUp(self):
+        init_db()
+        session = get_session()
+        self.graph = Graph(id=uuid.uuid4(), name="g")
+        self.node = Node(id=uuid.uuid4(), graph_id=self.graph.id, name="writer", node_type="llm")
+        self.execution = Execution(id=uuid.uuid4(), graph_id=self.graph.id, status="RUNNING")
+        self.conversation = Conversation(id=uuid.uuid4(), node_id=self.node.id)
+        session.add(self.graph)
+        session.flush()
+        session.add_all([self.node, self.execution])
+        session.flush()
+        session.add(self.conversation)
+        session.flush()
+        session.add(Context(conversation_id=self.conversation.id, source_type="node_output",
+                            source_id=self.node.id, context_metadata={"title": "Draft"}))
+        session.commit()
+        session.close()
+
+    def test_latest_successful_node_output_is_rendered(self):
+        repository = ExecutionRepository()
+        repository.add_result(self.execution.id, self.node.id, {"output": "first draft"})
+        repository.add_result(self.execution.id, self.node.id, None, error="model unavailable")
+
+        self.assertEqual(repository.find_latest_result(self.node.id)["result"], {"output": "first draft"})
+        self.assertEqual(ContextBuilder().render_sources(self.conversation.id), "[Draft]\nfirst draft")
+
+if __name__ == '__main__':
+    unittest.main()
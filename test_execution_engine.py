@@ -0,0 +1,143 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from backend.infrastructure.cancellation import CancellationToken
+from backend.cache.graph_topology_cache import GraphTopology
+from backend.services.execution_service import ExecutionService, group_into_waves, compute_cache_key
+from shared.errors import OperationCancelledError
+
+class TestExecutionEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.service = ExecutionService()
+        self.service.execution_repo = MagicMock()
+
+    def test_group_into_waves(self):
+        predecessors = {"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"], "e": []}
+        waves = group_into_waves(["a", "e", "b", "c", "d"], predecessors)
+        self.assertEqual(waves, [["a", "e"], ["b", "c"], ["d"]])
+
+    def test_independent_nodes_run_concurrently(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_node(node, upstream_outputs, execution_options=None, cancel_token=None):
+            with lock:
+                running.append(node["id"])
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(node["id"])
+            return {"output": node["id"]}
+
+        self.service.execute_node = slow_node
+        nodes = {node_id: {"id": node_id, "properties": {}} for node_id in ("a", "b", "c", "d")}
+        predecessors = {"a": [], "b": [], "c": [], "d": ["a", "b", "c"]}
+
+        failed = self.service._run_waves("exec", [["a", "b", "c"], ["d"]], nodes, predecessors, {}, CancellationToken())
+
+        self.assertEqual(failed, set())
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(self.service.execution_repo.add_result.call_count, 4)
+
+    def test_failure_skips_descendants(self):
+        def node_runner(node, upstream_outputs, execution_options=None, cancel_token=None):
+            if node["id"] == "a":
+                raise RuntimeError("model unavailable")
+            return {"output": node["id"]}
+
+        self.service.execute_node = node_runner
+        nodes = {node_id: {"id": node_id, "properties": {}} for node_id in ("a", "b", "c")}
+        predecessors = {"a": [], "b": ["a"], "c": []}
+
+        failed = self.service._run_waves("exec", [["a", "c"], ["b"]], nodes, predecessors, {}, CancellationToken())
+
+        self.assertEqual(failed, {"a", "b"})
+
+    def test_cancellation_stops_remaining_waves_and_keeps_partial_output(self):
+        token = CancellationToken()
+
+        def node_runner(node, upstream_outputs, execution_options=None, cancel_token=None):
+            if node["id"] == "b":
+                cancel_token.cancel()
+                raise OperationCancelledError(partial="half an answ")
+            return {"output": node["id"]}
+
+        self.service.execute_node = node_runner
+        nodes = {node_id: {"id": node_id, "properties": {}} for node_id in ("a", "b", "c")}
+        predecessors = {"a": [], "b": ["a"], "c": ["b"]}
+
+        self.service._run_waves("exec", [["a"], ["b"], ["c"]], nodes, predecessors, {}, token)
+
+        recorded = [call.args[1] for call in self.service.execution_repo.add_result.call_args_list]
+        self.assertEqual(recorded, ["a", "b"])
+        partial = self.service.execution_repo.add_result.call_args_list[1].args[2]
+        self.assertEqual(partial, {"output": "half an answ", "partial": True})
+
+    def test_token_callbacks_run_once_on_cancel(self):
+        token = CancellationToken()
+        closed = []
+        token.register(lambda: closed.append(True))
+        token.cancel()
+        token.cancel()
+        self.assertEqual(closed, [True])
+        token.register(lambda: closed.append(True))
+        self.assertEqual(len(closed), 2)
+
+    def test_unchanged_model_node_reuses_cached_result(self):
+        node = {"id": "n", "node_type": "processor", "properties": {"model": "llama3.2:1b", "prompt": "Summarise"}}
+        self.service.execution_repo.find_cached_result.return_value = {
+            "id": "old-result", "result": {"output": "summary"}, "output_hash": "abc"
+        }
+        self.service.execute_node = MagicMock()
+
+        result = self.service._run_node("exec", node, [], {}, CancellationToken(), ["upstream-hash"])
+
+        self.service.execute_node.assert_not_called()
+        self.assertEqual(result["output"], "summary")
+        self.service.execution_repo.find_cached_result.assert_called_once_with(
+            compute_cache_key(node, ["upstream-hash"])
+        )
+
+    def test_cache_key_changes_with_prompt_and_upstream(self):
+        node = {"node_type": "processor", "properties": {"model": "m", "prompt": "a"}}
+        edited = {"node_type": "processor", "properties": {"model": "m", "prompt": "b"}}
+        self.assertEqual(compute_cache_key(node, ["h1"]), compute_cache_key(dict(node), ["h1"]))
+        self.assertNotEqual(compute_cache_key(node, ["h1"]), compute_cache_key(edited, ["h1"]))
+        self.assertNotEqual(compute_cache_key(node, ["h1"]), compute_cache_key(node, ["h2"]))
+
+    def test_passthrough_node_joins_upstream_outputs(self):
+        result = self.service.execute_node({"id": "n", "properties": {}}, [{"output": "x"}, {"output": "y"}])
+        self.assertEqual(result, {"output": "x\n\ny"})
+
+    def test_execution_stopped_elsewhere_is_not_run_or_overwritten(self):
+        self.service.graph_repo = MagicMock()
+        self.service.execution_repo.update_status.return_value = False
+        self.assertIsNone(self.service.run_execution("exec", "graph", {}))
+        self.service.execution_repo.update_status.assert_called_once_with("exec", "RUNNING", expected_status="PENDING")
+        self.service.graph_repo.get_version.assert_not_called()
+
+        self.service.execution_repo.find_by_id.return_value = {"status": "STOPPED"}
+        self.assertEqual(self.service._finish("exec", "COMPLETED"), "STOPPED")
+
+    def test_plan_skips_nodes_missing_from_the_pinned_snapshot(self):
+        self.service.graph_repo = MagicMock()
+        self.service.snapshot_service = MagicMock()
+        self.service.analysis_service = MagicMock()
+        self.service.execution_repo.update_status.return_value = True
+        # "c" and its edge were added after the snapshot was taken
+        self.service.analysis_service.get_topology.return_value = GraphTopology(
+            ["a", "b", "c"], [("e1", "a", "b"), ("e2", "c", "b")], version=2)
+        self.service.snapshot_service.get_snapshot.return_value = {"state": {"nodes": [
+            {"id": "a", "node_type": "input", "properties": {"value": "x"}},
+            {"id": "b", "node_type": "output", "properties": {}}
+        ]}}
+
+        self.assertEqual(self.service.run_execution("exec", "graph", {}), "COMPLETED")
+        recorded = [call.args[1] for call in self.service.execution_repo.add_result.call_args_list]
+        self.assertEqual(recorded, ["a", "b"])
+
+if __name__ == '__main__':
+    unittest.main()
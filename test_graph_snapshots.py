@@ -0,0 +1,40 @@
+import unittest
+from backend.services.snapshot_service import graph_state, diff_states, apply_diff, rebuild_state
+
+def state(nodes, edges, name="g"):
+    return graph_state(
+        {"name": name, "description": None, "layout_data": {}, "graph_metadata": {}},
+        [{"id": node_id, "name": node_id, "node_type": "llm", "properties": properties,
+          "position_x": 0.0, "position_y": 0.0, "node_metadata": {}} for node_id, properties in nodes.items()],
+        [{"id": edge_id, "source_id": source_id, "target_id": target_id, "edge_type": "data",
+          "edge_metadata": {}} for edge_id, (source_id, target_id) in edges.items()]
+    )
+
+class TestGraphSnapshots(unittest.TestCase):
+
+    def test_diff_only_carries_changed_fields(self):
+        old = state({"a": {"model": "m1"}, "b": {}}, {"e1": ("a", "b")})
+        new = state({"a": {"model": "m2"}, "c": {}}, {}, name="renamed")
+        diff = diff_states(old, new)
+        self.assertEqual(diff["graph"], {"name": "renamed"})
+        self.assertEqual(diff["nodes"]["set"]["a"], {"properties": {"model": "m2"}})
+        self.assertEqual(set(diff["nodes"]["set"]), {"a", "c"})
+        self.assertEqual(diff["nodes"]["delete"], ["b"])
+        self.assertEqual(diff["edges"], {"delete": ["e1"]})
+        self.assertEqual(diff_states(new, new), {})
+
+    def test_rebuild_replays_diffs_from_checkpoint(self):
+        versions = [
+            state({"a": {}}, {}),
+            state({"a": {}, "b": {}}, {"e1": ("a", "b")}),
+            state({"a": {"temperature": 0}, "b": {}}, {"e1": ("a", "b")}),
+            state({"b": {}}, {}, name="last"),
+        ]
+        chain = [{"data": state({"a": {}}, {})}]
+        for old, new in zip(versions, versions[1:]):
+            chain.append({"data": diff_states(old, new)})
+        self.assertEqual(rebuild_state(chain), versions[-1])
+        self.assertEqual(apply_diff(state({"a": {}}, {}), chain[1]["data"]), versions[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import random
+import unittest
+import networkx as nx
+from unittest.mock import MagicMock, patch
+from backend.cache.graph_topology_cache import CycleError, GraphTopology, GraphTopologyCache
+from backend.services.graph_crud_service import GraphCRUDService
+from shared.errors import ValidationError, ConflictError
+
+class TestGraphTopology(unittest.TestCase):
+
+    def assertValidOrder(self, topology):
+        position = {node_id: index for index, node_id in enumerate(topology.topological_order())}
+        for source_id, target_id in topology.edges.values():
+            self.assertLess(position[source_id], position[target_id])
+
+    def test_insert_edge_rejects_cycles(self):
+        topology = GraphTopology(["a", "b", "c"], [("e1", "a", "b"), ("e2", "b", "c")])
+        with self.assertRaises(CycleError) as raised:
+            topology.insert_edge("e3", "c", "a")
+        self.assertEqual(raised.exception.path, ["a", "b", "c", "a"])
+        self.assertNotIn("e3", topology.edges)
+        with self.assertRaises(CycleError):
+            topology.insert_edge("e4", "b", "b")
+
+    def test_insert_edge_reorders_affected_region(self):
+        topology = GraphTopology(["a", "b", "c", "d"], [("e1", "a", "b")])
+        topology.insert_edge("e2", "d", "a")
+        topology.insert_edge("e3", "c", "d")
+        self.assertValidOrder(topology)
+        self.assertEqual(topology.topological_order()[:3], ["c", "d", "a"])
+
+    def test_random_insertions_match_networkx(self):
+        rng = random.Random(7)
+        node_ids = [f"n{i}" for i in range(40)]
+        topology = GraphTopology(node_ids, [])
+        reference = nx.DiGraph()
+        reference.add_nodes_from(node_ids)
+
+        for index in range(300):
+            source_id, target_id = rng.sample(node_ids, 2)
+            creates_cycle = nx.has_path(reference, target_id, source_id)
+            try:
+                topology.insert_edge(f"e{index}", source_id, target_id)
+                self.assertFalse(creates_cycle)
+                reference.add_edge(source_id, target_id)
+            except CycleError:
+                self.assertTrue(creates_cycle)
+            self.assertValidOrder(topology)
+
+    def test_removal_restores_ordering_of_cyclic_graph(self):
+        topology = GraphTopology(["a", "b"], [("e1", "a", "b"), ("e2", "b", "a")])
+        self.assertFalse(topology.is_acyclic)
+        topology.remove_edge("e2")
+        self.assertEqual(topology.topological_order(), ["a", "b"])
+
+    def test_cache_rejects_other_versions(self):
+        cache = GraphTopologyCache(max_graphs=1)
+        topology = GraphTopology([], [], version=1)
+        cache.put("g1", topology)
+        self.assertIs(cache.get("g1"), topology)
+        self.assertIsNone(cache.get("g1", version=2))
+        cache.patch("g1", lambda t: t.add_node("x"), version=2)
+        self.assertEqual(cache.get("g1", version=2).node_ids(), ["x"])
+        # A patch that skips a version means another process changed the graph
+        cache.patch("g1", lambda t: t.add_node("y"), version=4)
+        self.assertIsNone(cache.get("g1"))
+        cache.put("g1", topology)
+        cache.put("g2", GraphTopology([], []))
+        self.assertIsNone(cache.get("g1"))
+
+    def test_batch_with_cycle_is_rejected_before_writing(self):
+        topology = GraphTopology(["a", "b"], [("e1", "a", "b")], version=1)
+        service = GraphCRUDService()
+        service.graph_repo = MagicMock()
+        service.node_repo = MagicMock()
+        service.edge_repo = MagicMock()
+        service.analysis_service = MagicMock()
+        service.analysis_service.get_topology.return_value = topology
+
+        batch = {
+            "nodes": {"create": [{"id": "c", "name": "c", "node_type": "processor"}]},
+            "edges": {"create": [
+                {"source_id": "b", "target_id": "c", "edge_type": "data"},
+                {"source_id": "c", "target_id": "a", "edge_type": "data"}
+            ]}
+        }
+        with self.assertRaises(ValidationError):
+            service.apply_batch("g", batch)
+
+        service.node_repo.bulk_create.assert_not_called()
+        self.assertEqual(topology.node_ids(), ["a", "b"])
+        self.assertEqual(list(topology.edges), ["e1"])
+
+    def test_edge_is_revalidated_when_graph_changed_concurrently(self):
+        stale = GraphTopology(["a", "b"], [], version=1)
+        # Another process committed b -> a after this one cached version 1
+        current = GraphTopology(["a", "b"], [("e1", "b", "a")], version=2)
+        service = GraphCRUDService()
+        service.graph_repo = MagicMock()
+        service.edge_repo = MagicMock()
+        service.analysis_service = MagicMock()
+        service.analysis_service.get_topology.side_effect = [stale, current]
+        service.graph_repo.bump_version.side_effect = ConflictError(current_version=2)
+
+        with patch('backend.services.graph_crud_service.session_scope'):
+            with self.assertRaises(ValidationError):
+                service.create_edge("a", "b", "data", graph_id="g")
+
+        service.graph_repo.bump_version.assert_called_once()
+        self.assertEqual(service.graph_repo.bump_version.call_args.args[2], 1)
+        self.assertEqual(list(stale.edges), [])
+
+if __name__ == '__main__':
+    unittest.main()
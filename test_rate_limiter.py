@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+import unittest
+from backend.integrations.rate_limiter import TokenBucket, ConcurrencyGate, RateLimiter
+from backend.infrastructure.cancellation import CancellationToken
+from shared.errors import OperationCancelledError
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_bucket_goes_into_debt_in_arrival_order(self):
+        bucket = TokenBucket(60)  # one token per second, sixty in the bucket
+        self.assertEqual(bucket.reserve(60), 0.0)
+        first = bucket.reserve(2)
+        second = bucket.reserve(1)
+        self.assertAlmostEqual(first, 2.0, places=1)
+        self.assertAlmostEqual(second, 3.0, places=1)
+        bucket.refund(3)
+        self.assertAlmostEqual(bucket.reserve(0), 0.0, places=1)
+
+    def test_gate_admits_waiters_first_come_first_served(self):
+        gate = ConcurrencyGate(1)
+        gate.acquire()
+        admitted = []
+
+        def worker(index):
+            gate.acquire()
+            admitted.append(index)
+            gate.release()
+
+        threads = []
+        for index in range(5):
+            thread = threading.Thread(target=worker, args=(index,))
+            thread.start()
+            threads.append(thread)
+            while len(gate.waiters) <= index:
+                time.sleep(0.001)
+        gate.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(admitted, [0, 1, 2, 3, 4])
+        self.assertEqual(gate.active, 0)
+
+    def test_cancelled_async_waiter_does_not_leak_its_slot(self):
+        limiter = RateLimiter({'ollama:*': {'concurrency': 1}})
+
+        async def scenario():
+            permit = await limiter.acquire_async('ollama', 'm')
+            waiter = asyncio.create_task(limiter.acquire_async('ollama', 'm'))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            permit.release()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            second = await asyncio.wait_for(limiter.acquire_async('ollama', 'm'), 1)
+            second.release()
+
+        asyncio.run(scenario())
+        self.assertEqual(limiter.gates['ollama:m'].active, 0)
+
+    def test_cancelled_waiter_gives_back_its_reservations(self):
+        limiter = RateLimiter({'groq:*': {'rpm': 1, 'concurrency': 1}})
+        permit = limiter.acquire('groq', 'm')
+        token = CancellationToken()
+        errors = []
+
+        def waiter():
+            try:
+                limiter.acquire('groq', 'm', cancel_token=token)
+            except OperationCancelledError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=waiter)
+        started = time.monotonic()
+        thread.start()
+        time.sleep(0.05)
+        token.cancel()
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertLess(time.monotonic() - started, 1)
+        permit.release()
+        gate = limiter.gates['groq:m']
+        self.assertEqual((gate.active, len(gate.waiters)), (0, 0))
+        self.assertAlmostEqual(limiter.buckets[('groq:m', 'rpm')].reserve(0), 0.0, places=1)
+
+        gate = ConcurrencyGate(1)
+        gate.acquire()
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+        with self.assertRaises(OperationCancelledError):
+            gate.acquire(token)
+        gate.release()
+        self.assertEqual((gate.active, len(gate.waiters)), (0, 0))
+
+    def test_cancelled_async_sleeper_gives_back_its_reservations(self):
+        limiter = RateLimiter({'groq:*': {'rpm': 1, 'tpm': 100}})
+
+        async def scenario():
+            limiter.acquire('groq', 'm', tokens=100).release()
+            sleeper = asyncio.create_task(limiter.acquire_async('groq', 'm', tokens=100))
+            await asyncio.sleep(0.05)
+            sleeper.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await asyncio.wait_for(sleeper, 1)
+
+        asyncio.run(scenario())
+        self.assertAlmostEqual(limiter.buckets[('groq:m', 'rpm')].reserve(0), 0.0, places=1)
+        self.assertAlmostEqual(limiter.buckets[('groq:m', 'tpm')].reserve(0), 0.0, places=1)
+
+if __name__ == '__main__':
+    unittest.main()
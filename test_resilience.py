@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch
+import requests
+from backend.integrations.resilience import RetryPolicy, classify, retry_after_seconds
+from shared.errors import CircuitOpenError
+
+def http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"{status} error", response=response)
+
+class TestResilience(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, base_delay=0, max_delay=5, failure_threshold=3, reset_timeout=60)
+
+    def failing(self, errors, result="ok"):
+        calls = []
+        def func():
+            calls.append(1)
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return result
+        return func, calls
+
+    def test_retries_transient_failures_only(self):
+        func, calls = self.failing([requests.ConnectionError("refused"), http_error(503)])
+        self.assertEqual(self.policy.call("http://ollama:11434/api/chat", func), "ok")
+        self.assertEqual(len(calls), 3)
+
+        func, calls = self.failing([http_error(400)])
+        with self.assertRaises(requests.HTTPError):
+            self.policy.call("http://ollama:11434/api/chat", func)
+        self.assertEqual(len(calls), 1)
+
+    def test_honours_retry_after(self):
+        self.assertEqual(retry_after_seconds({"Retry-After": "2"}), 2.0)
+        self.assertEqual(retry_after_seconds({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}), 0.0)
+        self.assertEqual(classify(http_error(429, {"Retry-After": "1.5"})), (True, False, 1.5))
+
+        func, calls = self.failing([http_error(429, {"Retry-After": "1.5"})])
+        with patch("backend.integrations.resilience.time.sleep") as sleep:
+            self.policy.call("https://api.groq.com/openai/v1/chat/completions", func)
+        sleep.assert_called_once_with(1.5)
+
+        func, calls = self.failing([http_error(429, {"Retry-After": "3600"})])
+        with self.assertRaises(requests.HTTPError):
+            self.policy.call("https://api.groq.com/openai/v1/chat/completions", func)
+        self.assertEqual(len(calls), 1)
+
+    def test_circuit_opens_and_fails_fast(self):
+        url = "http://dead-host:11434/api/chat"
+        func, calls = self.failing([requests.ConnectTimeout("timeout")] * 10)
+        with self.assertRaises(requests.ConnectTimeout):
+            self.policy.call(url, func)
+        self.assertEqual(self.policy.breaker(url).state, "open")
+        with self.assertRaises(CircuitOpenError):
+            self.policy.call(url, func)
+        self.assertEqual(len(calls), 3)
+
+        # After the reset timeout one trial call decides
+        self.policy.breaker(url).opened_at -= 60
+        self.assertEqual(self.policy.call(url, lambda: "back"), "back")
+        self.assertEqual(self.policy.breaker(url).state, "closed")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+import unittest
+from backend.integrations.ollama_client import OllamaClient
+from backend.integrations.response_cache import ResponseCache
+from backend.infrastructure.cancellation import CancellationToken
+
+class MemoryStore:
+    """Stands in for RedisCache's LRU calls"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get_lru(self, index, key, expiry):
+        return self.entries.get(key)
+
+    def set_lru(self, index, key, value, expiry, max_bytes):
+        self.entries[key] = value
+        return 0
+
+class FakeOllama(OllamaClient):
+    calls = 0
+    reply = "hello"
+
+    @classmethod
+    def _chat(cls, model, messages, temperature, max_tokens, stream=False, cancel_token=None):
+        cls.calls += 1
+        time.sleep(0.2)
+        if stream:
+            return iter(json.dumps({"message": {"content": word}}).encode('utf-8') for word in ("hel", "lo"))
+        return {"message": {"role": "assistant", "content": cls.reply}, "done": True}
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        FakeOllama.calls = 0
+        self.store = MemoryStore()
+        self.cache = ResponseCache(self.store, ttl=60, max_bytes=1024, max_wait=5)
+        self.messages = [{"role": "user", "content": "hi"}]
+
+    def chat(self, stream=False, cancel_token=None):
+        return self.cache.chat(FakeOllama, 'ollama', 'llama3', self.messages, 0, 64, stream, cancel_token)
+
+    def test_identical_calls_share_one_upstream_call(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.chat())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(FakeOllama.calls, 1)
+        self.assertEqual([OllamaClient.text_from_response(result) for result in results], ["hello"] * 5)
+        self.assertEqual(len(self.store.entries), 1)
+
+    def test_streamed_reply_is_cached_and_replayed(self):
+        lines = list(self.chat(stream=True))
+        self.assertEqual("".join(OllamaClient.parse_stream_line(line) for line in lines), "hello")
+
+        replay = list(self.chat(stream=True))
+        self.assertEqual(FakeOllama.calls, 1)
+        self.assertEqual("".join(OllamaClient.parse_stream_line(line) for line in replay), "hello")
+        self.assertEqual(OllamaClient.text_from_response(self.chat()), "hello")
+
+    def test_cancelled_stream_is_not_cached(self):
+        token = CancellationToken()
+        stream = self.chat(stream=True, cancel_token=token)
+        next(stream)
+        token.cancel()
+        list(stream)
+        self.assertEqual(self.store.entries, {})
+        self.chat()
+        self.assertEqual(FakeOllama.calls, 2)
+
+    def test_only_deterministic_calls_apply(self):
+        self.assertTrue(self.cache.applies(0))
+        self.assertFalse(self.cache.applies(0.7))
+        self.assertFalse(ResponseCache(None, 60, 1024, 5).applies(0))
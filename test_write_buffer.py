@@ -0,0 +1,82 @@
+import time
+import unittest
+from sqlalchemy.exc import OperationalError, IntegrityError
+from backend.infrastructure.write_buffer import WriteBuffer
+
+class TestWriteBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+
+    def make_buffer(self, **kwargs):
+        # A long delay keeps the background flusher out of the way
+        return WriteBuffer(self.batches.append, max_size=1000, max_delay=60, **kwargs)
+
+    def test_flush_by_key_writes_only_that_key(self):
+        buffer = self.make_buffer()
+        buffer.add("c1", {"id": 1})
+        buffer.add("c2", {"id": 2})
+        buffer.add("c1", {"id": 3})
+
+        buffer.flush("c1")
+        self.assertEqual(self.batches, [[{"id": 1}, {"id": 3}]])
+
+        buffer.flush()
+        self.assertEqual(self.batches[-1], [{"id": 2}])
+        self.assertEqual(buffer.count, 0)
+
+    def test_unique_by_keeps_latest_row(self):
+        buffer = self.make_buffer(unique_by="node_id")
+        for x in range(5):
+            buffer.add("g", {"node_id": "a", "x": x})
+        buffer.add("g", {"node_id": "b", "x": 9})
+
+        buffer.flush()
+        self.assertEqual(self.batches, [[{"node_id": "a", "x": 4}, {"node_id": "b", "x": 9}]])
+
+    def test_failed_batch_is_retried_row_by_row(self):
+        written = []
+
+        def write(rows):
+            if len(rows) > 1 or rows[0]["id"] == 2:
+                raise RuntimeError("constraint violation")
+            written.extend(rows)
+
+        buffer = WriteBuffer(write, max_size=1000, max_delay=60)
+        for row_id in (1, 2, 3):
+            buffer.add("c", {"id": row_id})
+        buffer.flush()
+        self.assertEqual(written, [{"id": 1}, {"id": 3}])
+
+    def test_transient_failure_is_retried_and_permanent_one_dropped(self):
+        written = []
+        failures = [OperationalError("INSERT", {}, Exception("server closed the connection"))]
+
+        def write(rows):
+            if failures:
+                raise failures.pop()
+            if any(row["id"] == 2 for row in rows):
+                raise IntegrityError("INSERT", {}, Exception("foreign key violation"))
+            written.extend(rows)
+
+        buffer = WriteBuffer(write, max_size=1000, max_delay=0.01, retry_delay=0.01)
+        for row_id in (1, 2, 3):
+            buffer.add("c", {"id": row_id})
+        deadline = time.monotonic() + 2
+        while len(written) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(written, [{"id": 1}, {"id": 3}])
+        self.assertEqual((buffer.count, buffer.attempts), (0, {}))
+
+    def test_rows_are_dropped_after_max_attempts(self):
+        def write(rows):
+            raise OperationalError("INSERT", {}, Exception("database is down"))
+
+        buffer = WriteBuffer(write, max_size=1000, max_delay=60, max_attempts=3, retry_delay=0)
+        buffer.add("c", {"id": 1})
+        for attempt in range(3):
+            buffer.flush()
+        self.assertEqual((buffer.count, buffer.attempts), (0, {}))
+
+if __name__ == '__main__':
+    unittest.main()